@@ -0,0 +1,336 @@
+"""
+构建流水线的基准测试。
+
+生成合成项目后，分别测量ignored_files()、copy_source_tree()、cleanup_dependency()的耗时，
+以及ZipAppCreator._on_run()中每个阶段的耗时（从构建报告中读取），并与基线进行比较。
+
+用法：
+
+    python -m benchmarks.run --profile small --repeat 5
+    python -m benchmarks.run --profile small --save-baseline
+    python -m benchmarks.run --profile medium --threshold 0.2 --output result.json
+
+整个过程完全离线：依赖以本地wheel的形式提供，pip通过--no-index/--find-links安装。
+若当前结果中某一项指标比基线慢了超过threshold（且绝对差值超过min-delta），则以返回码1退出。
+"""
+
+import argparse
+import builtins
+import contextlib
+import io
+import json
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from zipapp_creator.common import default_tr, default_ntr
+from zipapp_creator.consts import (
+    GLOBAL_VARNAME_TR_FUNC,
+    GLOBAL_VARNAME_NTR_FUNC,
+    DEFAULT_COPY_EXCLUDE_PATTERNS,
+    DEFAULT_PACKAGING_EXCLUDE_PATTERNS,
+    DIST_DIR,
+)
+from .synthetic import PROFILES, generate_project, generate_wheelhouse
+
+DEFAULT_BASELINE_FILE = Path(__file__).with_name("baseline.json")
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_MIN_DELTA = 0.02
+PROJECT_NAME = "benchproj"
+
+
+def _setup_i18n():
+    # 基准测试不需要翻译，直接使用默认的翻译函数，避免输出“i18n not prepared”的提示
+    if not hasattr(builtins, GLOBAL_VARNAME_TR_FUNC):
+        setattr(builtins, GLOBAL_VARNAME_TR_FUNC, default_tr)
+    if not hasattr(builtins, GLOBAL_VARNAME_NTR_FUNC):
+        setattr(builtins, GLOBAL_VARNAME_NTR_FUNC, default_ntr)
+
+
+class BenchmarkRunner(object):
+    def __init__(self, workdir: Path, profile: str, repeat: int, verbose: bool = False):
+        self._workdir = workdir
+        self._profile = profile
+        self._spec = PROFILES[profile]
+        self._repeat = repeat
+        self._verbose = verbose
+        self._samples: Dict[str, List[float]] = {}
+        self.source_dir = workdir / PROJECT_NAME
+        self.wheel_dir = workdir / "wheelhouse"
+        self.requirements: Optional[Path] = None
+
+    def _quiet(self):
+        if self._verbose:
+            return contextlib.nullcontext()
+        return contextlib.redirect_stdout(io.StringIO())
+
+    def _record(self, name: str, seconds: float):
+        self._samples.setdefault(name, []).append(seconds)
+
+    def _timeit(
+        self,
+        name: str,
+        func: Callable[[], object],
+        setup: Optional[Callable[[], object]] = None,
+    ):
+        for _ in range(self._repeat):
+            if setup is not None:
+                with self._quiet():
+                    setup()
+            with self._quiet():
+                start = time.perf_counter()
+                func()
+                self._record(name, time.perf_counter() - start)
+
+    def prepare(self):
+        print(f"generating synthetic project ({self._profile})...", file=sys.stderr)
+        generate_project(self.source_dir, self._spec)
+        self.requirements = generate_wheelhouse(
+            self.source_dir, self.wheel_dir, self._spec
+        )
+
+    def bench_copy_source_tree(self):
+        from zipapp_creator.app.utils import copy_source_tree
+
+        dist_dir = self._workdir / "copy_bench"
+        patterns = [*DEFAULT_COPY_EXCLUDE_PATTERNS, DIST_DIR]
+        self._timeit(
+            "copy_source_tree",
+            lambda: copy_source_tree(self.source_dir, dist_dir, patterns),
+        )
+
+    def bench_ignored_files(self):
+        from zipapp_creator.app.utils import ignored_files
+
+        staged_dir = self._workdir / "copy_bench"
+        self._timeit(
+            "ignored_files",
+            lambda: ignored_files(
+                staged_dir,
+                DEFAULT_PACKAGING_EXCLUDE_PATTERNS,
+                path_type="relative",
+                posix=True,
+            ),
+        )
+
+    def bench_ignored_files_snapshot(self):
+        from zipapp_creator.app.utils import ignored_files
+        from zipapp_creator.snapshot import TreeSnapshot
+
+        staged_dir = self._workdir / "copy_bench"
+        self._timeit(
+            "snapshot.capture",
+            lambda: TreeSnapshot.capture(staged_dir),
+        )
+        snapshot = TreeSnapshot.capture(staged_dir)
+        self._timeit(
+            "ignored_files.snapshot",
+            lambda: ignored_files(
+                staged_dir,
+                DEFAULT_PACKAGING_EXCLUDE_PATTERNS,
+                path_type="relative",
+                posix=True,
+                snapshot=snapshot,
+            ),
+        )
+
+    def bench_cleanup_dependency(self):
+        if self.requirements is None:
+            return
+        from zipapp_creator.app.utils import pip_install, cleanup_dependency
+
+        template_dir = self._workdir / "deps_template"
+        work_dir = self._workdir / "deps_work"
+        with self._quiet():
+            pip_install(sys.executable, self.requirements, template_dir)
+
+        def _setup():
+            shutil.rmtree(work_dir, ignore_errors=True)
+            shutil.copytree(template_dir, work_dir)
+
+        self._timeit(
+            "cleanup_dependency", lambda: cleanup_dependency(work_dir), setup=_setup
+        )
+
+    def bench_pipeline(self):
+        from zipapp_creator.app import ZipAppCreator
+        from zipapp_creator.appsettings import AppSettings
+
+        creator = ZipAppCreator(appsettings=AppSettings.default())
+        report_file = self.source_dir / DIST_DIR / f"{PROJECT_NAME}.build.json"
+        for _ in range(self._repeat):
+            start = time.perf_counter()
+            with self._quiet():
+                # noinspection PyProtectedMember
+                creator._on_run(
+                    source=self.source_dir.as_posix(),
+                    entry="main:main",
+                    target="{SOURCE}.pyz",
+                    shebang="/usr/bin/env python3",
+                    compressed=True,
+                    exclude_from_copy=list(DEFAULT_COPY_EXCLUDE_PATTERNS),
+                    exclude_from_packaging=list(DEFAULT_PACKAGING_EXCLUDE_PATTERNS),
+                    host_py=sys.executable,
+                    requirements="",
+                    pip_index_url="",
+                    cleanup_dependencies=True,
+                    self_extract=False,
+                    build_report=True,
+                )
+            self._record("pipeline.total", time.perf_counter() - start)
+            with open(report_file, "r", encoding="utf-8") as f:
+                report = json.load(f)
+            for stage in report["stages"]:
+                name = stage["name"].split(":", 1)[0]
+                self._record(f"pipeline.{name}", stage["wall_time"])
+
+    def run(self) -> dict:
+        self.prepare()
+        for bench in (
+            self.bench_copy_source_tree,
+            self.bench_ignored_files,
+            self.bench_ignored_files_snapshot,
+            self.bench_cleanup_dependency,
+            self.bench_pipeline,
+        ):
+            print(f"running {bench.__name__}...", file=sys.stderr)
+            bench()
+        return {
+            "profile": self._profile,
+            "repeat": self._repeat,
+            "environment": {
+                "python": sys.version,
+                "platform": platform.platform(),
+                "machine": platform.machine(),
+            },
+            "metrics": {
+                name: {
+                    "median": statistics.median(samples),
+                    "min": min(samples),
+                    "max": max(samples),
+                    "samples": samples,
+                }
+                for name, samples in self._samples.items()
+            },
+        }
+
+
+def compare(
+    result: dict, baseline: dict, threshold: float, min_delta: float
+) -> List[str]:
+    """返回所有出现性能退化的指标的描述"""
+    regressions = []
+    base_metrics = (
+        baseline.get("profiles", {}).get(result["profile"], {}).get("metrics", {})
+    )
+    for name, metric in sorted(result["metrics"].items()):
+        base = base_metrics.get(name, None)
+        if base is None:
+            continue
+        current, previous = metric["median"], base["median"]
+        if current > previous * (1 + threshold) and current - previous > min_delta:
+            regressions.append(
+                f"{name}: {previous:.4f}s -> {current:.4f}s "
+                f"(+{(current / previous - 1) * 100 if previous else float('inf'):.1f}%)"
+            )
+    return regressions
+
+
+def print_result(result: dict, baseline: Optional[dict]):
+    base_metrics = {}
+    if baseline:
+        base_metrics = (
+            baseline.get("profiles", {}).get(result["profile"], {}).get("metrics", {})
+        )
+    print(f"{'metric':<36}{'median':>12}{'min':>12}{'baseline':>12}")
+    for name, metric in sorted(result["metrics"].items()):
+        base = base_metrics.get(name, {}).get("median", None)
+        base_text = f"{base:.4f}" if base is not None else "-"
+        print(
+            f"{name:<36}{metric['median']:>12.4f}{metric['min']:>12.4f}{base_text:>12}"
+        )
+
+
+def load_baseline(baseline_file: Path) -> Optional[dict]:
+    if not baseline_file.is_file():
+        return None
+    with open(baseline_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(baseline_file: Path, result: dict):
+    baseline = load_baseline(baseline_file) or {"profiles": {}}
+    baseline.setdefault("profiles", {})[result["profile"]] = {
+        "environment": result["environment"],
+        "metrics": {
+            name: {"median": metric["median"], "min": metric["min"]}
+            for name, metric in result["metrics"].items()
+        },
+    }
+    with open(baseline_file, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, ensure_ascii=False)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run",
+        description="Benchmark the zipapp-creator build pipeline.",
+    )
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="small")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE_FILE)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--min-delta", type=float, default=DEFAULT_MIN_DELTA)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--workdir", type=Path, default=None)
+    parser.add_argument("--keep", action="store_true", help="keep the work directory")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    _setup_i18n()
+
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="zipapp-creator-bench-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    try:
+        runner = BenchmarkRunner(workdir, args.profile, args.repeat, args.verbose)
+        result = runner.run()
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+
+    baseline = load_baseline(args.baseline)
+    print_result(result, baseline)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, result)
+        print(f"baseline saved: {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print(
+            f"no baseline found at {args.baseline}, use --save-baseline to create one"
+        )
+        return 0
+
+    regressions = compare(result, baseline, args.threshold, args.min_delta)
+    if regressions:
+        print("performance regressions detected:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print("no performance regressions detected")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
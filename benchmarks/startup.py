@@ -0,0 +1,278 @@
+"""
+测量zipapp压缩包的启动延迟。
+
+对每个压缩包分别在“冷缓存”与“热缓存”条件下运行N次，报告启动耗时的百分位数，
+并通过`-X importtime`（PYTHONPROFILEIMPORTTIME）统计模块导入耗时。自解压模式下，
+启动脚本所启动的子进程同样会继承该环境变量，因此导入耗时中同时包含两个进程。
+
+冷缓存：每次运行前通过posix_fadvise(POSIX_FADV_DONTNEED)将压缩包从页缓存中移除；
+若指定了--drop-caches且拥有权限（Linux root），则清空整个页缓存。
+
+用法：
+
+    python -m benchmarks.startup app.pyz app-selfextract.pyz --runs 20
+    python -m benchmarks.startup app.pyz --mode cold --drop-caches --output startup.json
+    python -m benchmarks.startup app.pyz --args -- --help
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+PERCENTILES = (50, 90, 95, 99)
+_IMPORTTIME_REGEX = re.compile(
+    r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$", re.MULTILINE
+)
+_DROP_CACHES_FILE = "/proc/sys/vm/drop_caches"
+
+
+def archive_mode(archive: Path) -> str:
+    """判断压缩包为普通模式（zipimport）还是自解压模式（__startup__.py）"""
+    with zipfile.ZipFile(archive) as z:
+        names = z.namelist()
+        if "__main__.py" not in names:
+            return "unknown"
+        main_py = z.read("__main__.py").decode("utf-8", errors="replace")
+    for name in names:
+        if re.fullmatch(r"__startup\w*__\.py", name) and Path(name).stem in main_py:
+            return "self-extract"
+    return "zipimport"
+
+
+def evict_file(path: Path) -> bool:
+    """将文件从页缓存中移除，返回是否成功"""
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return False
+    try:
+        os.fdatasync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        return True
+    except OSError:
+        return False
+    finally:
+        os.close(fd)
+
+
+def drop_page_cache() -> bool:
+    """清空整个系统的页缓存（需要root权限），返回是否成功"""
+    if not os.path.exists(_DROP_CACHES_FILE):
+        return False
+    try:
+        os.sync()
+        with open(_DROP_CACHES_FILE, "w") as f:
+            f.write("3\n")
+        return True
+    except OSError:
+        return False
+
+
+def percentile(samples: List[float], p: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    summary = {
+        "runs": len(samples),
+        "mean": statistics.fmean(samples) if samples else 0.0,
+        "min": min(samples, default=0.0),
+        "max": max(samples, default=0.0),
+    }
+    for p in PERCENTILES:
+        summary[f"p{p}"] = percentile(samples, p)
+    return summary
+
+
+def parse_importtime(stderr: str) -> Dict[str, Dict[str, int]]:
+    """
+    解析-X importtime的输出，返回 模块名 -> {"self": 自身耗时(us), "cumulative": 累计耗时(us)}。
+    同一模块被多次导入（例如父进程与子进程）时累加。
+    """
+    result = {}
+    for self_us, cumulative_us, _, name in _IMPORTTIME_REGEX.findall(stderr):
+        entry = result.setdefault(name, {"self": 0, "cumulative": 0})
+        entry["self"] += int(self_us)
+        entry["cumulative"] += int(cumulative_us)
+    return result
+
+
+def _run_once(
+    python: str, archive: Path, args: List[str], env: dict, timeout: float
+) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [python, archive.as_posix(), *args],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        env=env,
+        timeout=timeout,
+        text=True,
+    )
+
+
+def measure(
+    archive: Path,
+    python: str,
+    args: List[str],
+    runs: int,
+    cold: bool,
+    drop_caches: bool,
+    timeout: float,
+) -> dict:
+    env = dict(os.environ)
+    env.pop("PYTHONPROFILEIMPORTTIME", None)
+    samples = []
+    failures = 0
+    eviction = "none"
+    if not cold:
+        # 预热一次，确保压缩包与解释器都已在页缓存中
+        _run_once(python, archive, args, env, timeout)
+    for _ in range(runs):
+        if cold:
+            if drop_caches and drop_page_cache():
+                eviction = "drop_caches"
+            elif evict_file(archive):
+                eviction = "fadvise"
+        start = time.perf_counter()
+        proc = _run_once(python, archive, args, env, timeout)
+        samples.append(time.perf_counter() - start)
+        if proc.returncode != 0:
+            failures += 1
+    summary = summarize(samples)
+    summary.update(samples=samples, failures=failures, eviction=eviction)
+    return summary
+
+
+def measure_imports(
+    archive: Path, python: str, args: List[str], runs: int, timeout: float, top: int
+) -> List[dict]:
+    env = dict(os.environ)
+    env["PYTHONPROFILEIMPORTTIME"] = "1"
+    totals: Dict[str, Dict[str, int]] = {}
+    for _ in range(runs):
+        proc = _run_once(python, archive, args, env, timeout)
+        for name, entry in parse_importtime(proc.stderr).items():
+            total = totals.setdefault(name, {"self": 0, "cumulative": 0})
+            total["self"] += entry["self"]
+            total["cumulative"] += entry["cumulative"]
+    runs = max(runs, 1)
+    ranked = sorted(totals.items(), key=lambda item: item[1]["self"], reverse=True)
+    return [
+        {
+            "module": name,
+            "self_us": entry["self"] / runs,
+            "cumulative_us": entry["cumulative"] / runs,
+        }
+        for name, entry in ranked[:top]
+    ]
+
+
+def print_report(results: List[dict]):
+    header = f"{'archive':<32}{'mode':<14}{'cache':<7}"
+    header += "".join(f"{f'p{p}(ms)':>10}" for p in PERCENTILES)
+    header += f"{'mean(ms)':>10}{'fail':>6}"
+    print(header)
+    for result in results:
+        for cache in ("cold", "warm"):
+            summary = result.get(cache, None)
+            if summary is None:
+                continue
+            line = f"{Path(result['archive']).name:<32}{result['mode']:<14}{cache:<7}"
+            line += "".join(f"{summary[f'p{p}'] * 1000:>10.1f}" for p in PERCENTILES)
+            line += f"{summary['mean'] * 1000:>10.1f}{summary['failures']:>6}"
+            print(line)
+    for result in results:
+        imports = result.get("imports", None)
+        if not imports:
+            continue
+        print()
+        print(f"slowest imports of {Path(result['archive']).name} ({result['mode']}):")
+        print(f"  {'module':<48}{'self(ms)':>10}{'cumul.(ms)':>12}")
+        for entry in imports:
+            print(
+                f"  {entry['module']:<48}{entry['self_us'] / 1000:>10.2f}"
+                f"{entry['cumulative_us'] / 1000:>12.2f}"
+            )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.startup",
+        description="Measure the startup latency of zipapp archives.",
+    )
+    parser.add_argument("archives", nargs="+", type=Path)
+    parser.add_argument("--python", default=sys.executable)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--mode", choices=("cold", "warm", "both"), default="both")
+    parser.add_argument(
+        "--drop-caches",
+        action="store_true",
+        help="drop the whole page cache before each cold run (requires root)",
+    )
+    parser.add_argument("--importtime-runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument(
+        "--args",
+        nargs=argparse.REMAINDER,
+        default=[],
+        help="arguments passed to the archive",
+    )
+    args = parser.parse_args(argv)
+    app_args = [a for a in args.args if a != "--"]
+
+    results = []
+    for archive in args.archives:
+        archive = archive.absolute()
+        print(f"measuring {archive.name}...", file=sys.stderr)
+        result = {"archive": archive.as_posix(), "mode": archive_mode(archive)}
+        for cache in ("cold", "warm"):
+            if args.mode not in (cache, "both"):
+                continue
+            result[cache] = measure(
+                archive,
+                args.python,
+                app_args,
+                args.runs,
+                cold=cache == "cold",
+                drop_caches=args.drop_caches,
+                timeout=args.timeout,
+            )
+        if args.importtime_runs > 0:
+            result["imports"] = measure_imports(
+                archive,
+                args.python,
+                app_args,
+                args.importtime_runs,
+                args.timeout,
+                args.top,
+            )
+        results.append(result)
+
+    print_report(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"python": args.python, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,293 @@
+"""
+超大文件与zip64压缩包的压力测试。
+
+生成包含超大文件（默认为稀疏文件，不占用磁盘空间）与大量小文件的合成项目，在子进程中以指定的内存上限
+打包（与流水线相同，使用archive.plan_memory()决定每次读取的字节数），记录子进程的峰值内存，然后：
+
+- 像自解压模式的启动脚本一样，用zipfile.ZipFile读取压缩包，流式读取每个条目并校验CRC
+  （指定--extract时执行与启动脚本完全相同的extractall()）；
+- 用--python指定的每个解释器运行压缩包。zip64压缩包只能由Python 3.13及以上版本运行（zipimport的限制）。
+
+峰值内存超过“内存上限 + 每个条目的元数据开销”时以返回码1退出。
+
+用法：
+
+    python -m benchmarks.stress --large-size 5G --entries 70000 --memory-limit 16M
+    python -m benchmarks.stress --large-size 1G --data random --compressed --python python3.13
+    python -m benchmarks.stress --large-size 5G --self-extract --extract --python python3.13
+"""
+
+import argparse
+import json
+import os
+import re
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from zipapp_creator.archive import create_archive, plan_memory, ZIP64_MIN_PYTHON
+from zipapp_creator.selfextracting import create_startup_script
+
+# 每个条目的元数据（ZipInfo、快照等）始终保存在内存中，不受内存上限的约束
+ENTRY_OVERHEAD = 1024
+_SIZE_REGEX = re.compile(r"^(\d+(?:\.\d+)?)([KMGT]?)B?$", re.IGNORECASE)
+_SIZE_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+_WRITE_CHUNK = 4 * 1024 * 1024
+_READ_CHUNK = 1024 * 1024
+MAIN_MODULE = "stressmain"
+MAIN_OUTPUT = "stress ok"
+
+
+def parse_size(value: str) -> int:
+    m = _SIZE_REGEX.match(value.strip())
+    if m is None:
+        raise argparse.ArgumentTypeError(f"invalid size: {value}")
+    return int(float(m.group(1)) * _SIZE_UNITS[m.group(2).upper()])
+
+
+def generate_stress_project(
+    project_dir: Path, large_files: int, large_size: int, entries: int, data: str
+):
+    """生成压力测试项目。data为zeros时超大文件为稀疏文件，为random时写入随机（不可压缩）数据"""
+    project_dir.mkdir(parents=True, exist_ok=True)
+    (project_dir / f"{MAIN_MODULE}.py").write_text(
+        f"def main():\n    print({MAIN_OUTPUT!r})\n", encoding="utf-8"
+    )
+    data_dir = project_dir / "data"
+    data_dir.mkdir(exist_ok=True)
+    for i in range(large_files):
+        large_file = data_dir / f"large{i}.bin"
+        with open(large_file, "wb") as f:
+            if data == "zeros":
+                f.truncate(large_size)
+                continue
+            remaining = large_size
+            while remaining > 0:
+                chunk = os.urandom(min(remaining, _WRITE_CHUNK))
+                f.write(chunk)
+                remaining -= len(chunk)
+    for i in range(entries):
+        small_dir = project_dir / "small" / f"d{i // 1000:03d}"
+        if i % 1000 == 0:
+            small_dir.mkdir(parents=True, exist_ok=True)
+        (small_dir / f"f{i:06d}.txt").write_text(f"entry {i}\n", encoding="utf-8")
+
+
+def _peak_rss() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux上的单位为KB，macOS上为字节
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def build_child(args: argparse.Namespace) -> int:
+    """在子进程中打包，以便单独测量打包过程的峰值内存"""
+    baseline_rss = _peak_rss()
+    _, chunk_size = plan_memory(args.memory_limit, 1)
+    extra_files = {}
+    main = f"{MAIN_MODULE}:main"
+    if args.self_extract:
+        script_name, script_content = create_startup_script(
+            args.project, f"{MAIN_MODULE}.py"
+        )
+        # 自解压模式下运行的是主模块本身，因此需要调用main()
+        with open(args.project / f"{MAIN_MODULE}.py", "a", encoding="utf-8") as f:
+            f.write("\nif __name__ == '__main__':\n    main()\n")
+        extra_files[script_name] = script_content
+        main = f"{Path(script_name).stem}:main"
+    start = time.perf_counter()
+    stats = create_archive(
+        source=args.project,
+        target=args.target,
+        interpreter="/usr/bin/env python3",
+        main=main,
+        compressed=args.compressed,
+        extra_files=extra_files,
+        chunk_size=chunk_size,
+    )
+    elapsed = time.perf_counter() - start
+    result = {
+        "seconds": elapsed,
+        "chunk_size": chunk_size,
+        "entries": stats.entries,
+        "file_size": stats.file_size,
+        "archive_size": stats.archive_size,
+        "zip64": stats.zip64,
+        "baseline_rss": baseline_rss,
+        "peak_rss": _peak_rss(),
+    }
+    print(json.dumps(result))
+    return 0
+
+
+def verify_archive(archive: Path, extract_dir: Optional[Path] = None) -> Dict:
+    """
+    与自解压模式的启动脚本一样使用zipfile.ZipFile读取压缩包。流式读取每个条目（zipfile会在读到末尾时
+    校验CRC）；指定了extract_dir时改为执行extractall()。
+    """
+    start = time.perf_counter()
+    with zipfile.ZipFile(archive, "r") as z:
+        infos = z.infolist()
+        if extract_dir is not None:
+            z.extractall(extract_dir)
+        else:
+            for zinfo in infos:
+                if zinfo.is_dir():
+                    continue
+                with z.open(zinfo) as f:
+                    while f.read(_READ_CHUNK):
+                        pass
+    return {"entries": len(infos), "seconds": time.perf_counter() - start}
+
+
+def _python_version(python: str) -> Optional[tuple]:
+    try:
+        output = subprocess.run(
+            [python, "-c", "import sys; print(*sys.version_info[:2])"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return tuple(int(part) for part in output.split())
+
+
+def run_archive(archive: Path, python: str, timeout: float) -> Dict:
+    version = _python_version(python)
+    result = {"python": python, "version": ".".join(map(str, version or ()))}
+    try:
+        proc = subprocess.run(
+            [python, archive.as_posix()],
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        result.update(ok=False, error=str(e))
+        return result
+    result["ok"] = proc.returncode == 0 and MAIN_OUTPUT in proc.stdout
+    if not result["ok"]:
+        result["error"] = (proc.stderr.strip().splitlines() or [""])[-1]
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.stress",
+        description="Stress test streaming, memory limits and Zip64 archives.",
+    )
+    parser.add_argument("--workdir", type=Path, default=None)
+    parser.add_argument("--large-files", type=int, default=1)
+    parser.add_argument("--large-size", type=parse_size, default=parse_size("5G"))
+    parser.add_argument("--entries", type=int, default=70000)
+    parser.add_argument("--data", choices=("zeros", "random"), default="zeros")
+    parser.add_argument("--memory-limit", type=parse_size, default=parse_size("16M"))
+    parser.add_argument("--compressed", action="store_true")
+    parser.add_argument("--self-extract", action="store_true")
+    parser.add_argument(
+        "--extract",
+        action="store_true",
+        help="verify with extractall() like the self-extracting runtime (needs disk space)",
+    )
+    parser.add_argument(
+        "--python",
+        action="append",
+        default=[],
+        help="interpreters used to run the archive (may be repeated)",
+    )
+    parser.add_argument("--timeout", type=float, default=600.0)
+    parser.add_argument("--keep", action="store_true")
+    parser.add_argument("--output", type=Path, default=None)
+    # 内部使用：在子进程中打包
+    parser.add_argument("--build-child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--project", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--target", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.build_child:
+        return build_child(args)
+
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="zipapp-stress-"))
+    project = workdir / "stressproj"
+    target = workdir / "stressproj.pyz"
+    try:
+        print(f"generating project in {project}...", file=sys.stderr)
+        generate_stress_project(
+            project, args.large_files, args.large_size, args.entries, args.data
+        )
+        print("building archive...", file=sys.stderr)
+        cmd = [
+            sys.executable,
+            "-m",
+            "benchmarks.stress",
+            "--build-child",
+            "--project",
+            project.as_posix(),
+            "--target",
+            target.as_posix(),
+            "--memory-limit",
+            str(args.memory_limit),
+        ]
+        if args.compressed:
+            cmd.append("--compressed")
+        if args.self_extract:
+            cmd.append("--self-extract")
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(proc.stderr, file=sys.stderr)
+            return 1
+        build = json.loads(proc.stdout.strip().splitlines()[-1])
+        rss_delta = build["peak_rss"] - build["baseline_rss"]
+        rss_budget = args.memory_limit + build["entries"] * ENTRY_OVERHEAD
+
+        print("verifying archive...", file=sys.stderr)
+        extract_dir = workdir / "extracted" if args.extract else None
+        verify = verify_archive(target, extract_dir)
+        if extract_dir is not None:
+            shutil.rmtree(extract_dir, ignore_errors=True)
+        runs = [run_archive(target, python, args.timeout) for python in args.python]
+    finally:
+        if not args.keep:
+            shutil.rmtree(project, ignore_errors=True)
+
+    print(
+        f"archive: {build['archive_size']} bytes, {build['entries']} entries, "
+        f"zip64: {build['zip64']}, chunk size: {build['chunk_size']}"
+    )
+    print(
+        f"build: {build['seconds']:.2f}s, "
+        f"{build['file_size'] / max(build['seconds'], 1e-9) / (1 << 20):.1f}MB/s, "
+        f"peak memory +{rss_delta / (1 << 20):.1f}MB "
+        f"(budget {rss_budget / (1 << 20):.1f}MB)"
+    )
+    print(f"zipfile read: {verify['entries']} entries, {verify['seconds']:.2f}s")
+    failed = False
+    for run in runs:
+        status = "ok" if run["ok"] else f"failed: {run.get('error', '')}"
+        print(f"run with python {run['version']} ({run['python']}): {status}")
+        if run["ok"]:
+            continue
+        version = tuple(int(v) for v in run["version"].split(".") if v)
+        if build["zip64"] and version and version < ZIP64_MIN_PYTHON:
+            print("  (expected: zipimport cannot read Zip64 archives before 3.13)")
+        else:
+            failed = True
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"build": build, "verify": verify, "runs": runs}, f, indent=2)
+    if not args.keep:
+        target.unlink(missing_ok=True)
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return 0 if rss_delta <= rss_budget and not failed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+"""
+生成用于基准测试的合成项目：可配置文件数量、目录深度、文件大小分布、不可压缩的二进制文件，
+以及以本地wheel形式提供的“伪造”第三方依赖（无需访问PyPI）。
+"""
+
+import base64
+import dataclasses
+import hashlib
+import random
+import zipfile
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+_WORDS = (
+    "alpha beta gamma delta epsilon zeta eta theta iota kappa lambda mu nu xi "
+    "omicron pi rho sigma tau upsilon phi chi psi omega"
+).split()
+
+
+@dataclasses.dataclass
+class SyntheticProjectSpec(object):
+    files: int = 500
+    depth: int = 4
+    fanout: int = 4
+    # 文本文件大小服从对数正态分布（中位数 median_size 字节），并限制在[min_size, max_size]之间
+    median_size: int = 2048
+    size_sigma: float = 1.0
+    min_size: int = 64
+    max_size: int = 256 * 1024
+    # 不可压缩二进制文件（随机字节）
+    binary_files: int = 10
+    binary_size: int = 512 * 1024
+    # 伪造的第三方依赖包
+    vendored_packages: int = 5
+    vendored_modules: int = 20
+    # 源目录中需要被排除的噪音目录（.git、venv等）中的文件数量
+    noise_files: int = 50
+    seed: int = 20251125
+
+
+PROFILES = {
+    "tiny": SyntheticProjectSpec(
+        files=50,
+        depth=2,
+        binary_files=1,
+        binary_size=64 * 1024,
+        vendored_packages=1,
+        vendored_modules=5,
+        noise_files=10,
+    ),
+    "small": SyntheticProjectSpec(),
+    "medium": SyntheticProjectSpec(
+        files=3000,
+        depth=6,
+        binary_files=30,
+        binary_size=2 * 1024 * 1024,
+        vendored_packages=15,
+        vendored_modules=60,
+        noise_files=500,
+    ),
+    "large": SyntheticProjectSpec(
+        files=20000,
+        depth=8,
+        fanout=6,
+        binary_files=100,
+        binary_size=4 * 1024 * 1024,
+        vendored_packages=40,
+        vendored_modules=120,
+        noise_files=3000,
+    ),
+}
+
+
+def _text(rng: random.Random, size: int) -> str:
+    lines = []
+    total = 0
+    while total < size:
+        line = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(4, 12)))
+        line = f"# {line}\n"
+        lines.append(line)
+        total += len(line)
+    return "".join(lines)[:size]
+
+
+def _python_module(rng: random.Random, size: int, index: int) -> str:
+    header = (
+        f'"""synthetic module {index}"""\n\n\n'
+        f"def func_{index}(x):\n"
+        f'    """{" ".join(rng.choice(_WORDS) for _ in range(8))}"""\n'
+        f"    assert x is not None\n"
+        f"    return x * {index}\n\n\n"
+    )
+    return header + _text(rng, max(size - len(header), 0))
+
+
+def _text_size(rng: random.Random, spec: SyntheticProjectSpec) -> int:
+    size = int(rng.lognormvariate(0, spec.size_sigma) * spec.median_size)
+    return max(spec.min_size, min(size, spec.max_size))
+
+
+def _directories(root: Path, spec: SyntheticProjectSpec) -> List[Path]:
+    dirs = [root]
+    frontier = [root]
+    for level in range(spec.depth):
+        next_frontier = []
+        for parent in frontier:
+            for i in range(spec.fanout):
+                child = parent / f"pkg_{level}_{i}"
+                dirs.append(child)
+                next_frontier.append(child)
+        frontier = next_frontier
+        # 控制目录数量，避免深度较大时目录数量爆炸
+        if len(dirs) > max(spec.files // 4, 1):
+            break
+    return dirs
+
+
+def generate_project(root: Union[str, Path], spec: SyntheticProjectSpec) -> Path:
+    """在root下生成一个合成项目，返回项目目录。项目入口为`main:main`或`main.py`"""
+    rng = random.Random(spec.seed)
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+
+    (root / "main.py").write_text(
+        "import sys\n\n\ndef main():\n    print('ok')\n\n\n"
+        "if __name__ == '__main__':\n    main()\n",
+        encoding="utf-8",
+    )
+
+    dirs = _directories(root, spec)
+    for d in dirs:
+        d.mkdir(parents=True, exist_ok=True)
+        if d != root:
+            (d / "__init__.py").write_text("", encoding="utf-8")
+
+    for i in range(spec.files):
+        d = dirs[i % len(dirs)]
+        size = _text_size(rng, spec)
+        if i % 5 == 4:
+            (d / f"data_{i}.txt").write_text(_text(rng, size), encoding="utf-8")
+        else:
+            (d / f"mod_{i}.py").write_text(
+                _python_module(rng, size, i), encoding="utf-8"
+            )
+
+    assets_dir = root / "assets"
+    assets_dir.mkdir(exist_ok=True)
+    for i in range(spec.binary_files):
+        (assets_dir / f"blob_{i}.bin").write_bytes(rng.randbytes(spec.binary_size))
+
+    # 应被exclude_from_copy排除的噪音文件
+    for noise_dir in (".git/objects", ".venv/lib", "build/tmp"):
+        (root / noise_dir).mkdir(parents=True, exist_ok=True)
+    for i in range(spec.noise_files):
+        noise_dir = (".git/objects", ".venv/lib", "build/tmp")[i % 3]
+        (root / noise_dir / f"noise_{i}").write_text(
+            _text(rng, spec.min_size), encoding="utf-8"
+        )
+    return root
+
+
+def _record_line(arcname: str, data: bytes) -> str:
+    digest = base64.urlsafe_b64encode(hashlib.sha256(data).digest()).rstrip(b"=")
+    return f"{arcname},sha256={digest.decode('ascii')},{len(data)}"
+
+
+def build_fake_wheel(
+    wheel_dir: Union[str, Path], name: str, modules: int, seed: int
+) -> Path:
+    """生成一个纯Python的wheel文件，pip可以在离线状态下从本地目录安装它"""
+    rng = random.Random(seed)
+    version = "1.0.0"
+    dist_info = f"{name}-{version}.dist-info"
+    files: List[Tuple[str, bytes]] = [(f"{name}/__init__.py", b"")]
+    for i in range(modules):
+        size = rng.randint(512, 16 * 1024)
+        files.append((f"{name}/m_{i}.py", _python_module(rng, size, i).encode("utf-8")))
+    files.append(
+        (
+            f"{dist_info}/METADATA",
+            f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n".encode(),
+        )
+    )
+    files.append(
+        (
+            f"{dist_info}/WHEEL",
+            b"Wheel-Version: 1.0\nGenerator: zipapp-creator-bench\n"
+            b"Root-Is-Purelib: true\nTag: py3-none-any\n",
+        )
+    )
+    record = [_record_line(arcname, data) for arcname, data in files]
+    record.append(f"{dist_info}/RECORD,,")
+    files.append((f"{dist_info}/RECORD", ("\n".join(record) + "\n").encode()))
+
+    wheel_dir = Path(wheel_dir)
+    wheel_dir.mkdir(parents=True, exist_ok=True)
+    wheel_file = wheel_dir / f"{name}-{version}-py3-none-any.whl"
+    with zipfile.ZipFile(wheel_file, "w", compression=zipfile.ZIP_DEFLATED) as z:
+        for arcname, data in files:
+            z.writestr(arcname, data)
+    return wheel_file
+
+
+def generate_wheelhouse(
+    project_dir: Union[str, Path],
+    wheel_dir: Union[str, Path],
+    spec: SyntheticProjectSpec,
+) -> Optional[Path]:
+    """
+    生成伪造依赖的wheelhouse，并在项目目录中写入requirements.txt。requirements.txt中带有
+    --no-index与--find-links选项，因此pip install会完全离线执行。返回requirements.txt路径，
+    若不需要任何依赖则返回None。
+    """
+    if spec.vendored_packages <= 0:
+        return None
+    wheel_dir = Path(wheel_dir).absolute()
+    names = []
+    for i in range(spec.vendored_packages):
+        name = f"fakedep{i}"
+        build_fake_wheel(wheel_dir, name, spec.vendored_modules, spec.seed + i)
+        names.append(name)
+    requirements = Path(project_dir) / "requirements.txt"
+    lines = ["--no-index", f"--find-links {wheel_dir.as_posix()}", *names]
+    requirements.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return requirements
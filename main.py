@@ -1,12 +1,21 @@
 if __name__ == "__main__":
+    import time
+
+    _STARTED_AT = time.perf_counter()
+
+    import argparse
     import builtins
+    import contextlib
     import json
+    import os
+    import sys
     from pathlib import Path
 
     from zipapp_creator.consts import (
         APP_SETTINGS_FILE,
         APP_DATADIR,
         APP_LOCALES_DIR,
+        ENV_DEBUG_MODE,
         GLOBAL_VARNAME_DEBUG_FUNC,
         GLOBAL_VARNAME_ERROR_FUNC,
         GLOBAL_VARNAME_TR_FUNC,
@@ -14,7 +23,37 @@ if __name__ == "__main__":
         GLOBAL_VARNAME_APPSETTINGS,
     )
 
-    _DEBUG_MODE = True
+    _arg_parser = argparse.ArgumentParser()
+    _arg_parser.add_argument(
+        "--debug",
+        action="store_true",
+        help=f"enable debug mode (same as setting {ENV_DEBUG_MODE}=1)",
+    )
+    _arg_parser.add_argument(
+        "--profile-build",
+        action="store_true",
+        help="profile every build with cProfile (overrides the app settings)",
+    )
+    _arg_parser.add_argument(
+        "--startup-timing",
+        action="store_true",
+        help="print the time spent in each startup step once the window is shown",
+    )
+    _args = _arg_parser.parse_args()
+
+    _debug_env = os.environ.get(ENV_DEBUG_MODE, "").strip().lower()
+    _DEBUG_MODE = _args.debug or _debug_env in ("1", "true", "yes", "on")
+
+    _startup_report = None
+    if _args.startup_timing:
+        from zipapp_creator.instrument import BuildReport
+
+        _startup_report = BuildReport()
+
+    def _startup_step(name: str):
+        if _startup_report is None:
+            return contextlib.nullcontext()
+        return _startup_report.stage(name)
 
     def _debug(msg):
         if not _DEBUG_MODE:
@@ -31,7 +70,6 @@ if __name__ == "__main__":
     setattr(builtins, GLOBAL_VARNAME_ERROR_FUNC, _error)
 
     def _setup_app_locale():
-        import os
         from zipapp_creator.i18n import ZipappCreatorI18N, DEFAULT_LOCALE_CODE
         from zipapp_creator import assets
 
@@ -49,11 +87,9 @@ if __name__ == "__main__":
             _debug(f"Creating app locale directory: {app_locale_dir.as_posix()}")
             app_locale_dir.mkdir(parents=True)
 
-        if not os.listdir(app_locale_dir.as_posix()):
-            _debug(f"No locale files found in {app_locale_dir.as_posix()}")
-            _debug(f"Copying default locale files to {app_locale_dir.as_posix()}")
-
-            assets.export_builtin_locales(app_locale_dir.as_posix(), overwrite=True)
+        # 只有在内置的locale文件发生变化时才重新导出
+        if assets.export_builtin_locales_if_outdated(app_locale_dir.as_posix()):
+            _debug(f"Default locale files copied to {app_locale_dir.as_posix()}")
 
         lang = DEFAULT_LOCALE_CODE
         if os.path.exists(APP_SETTINGS_FILE):
@@ -87,7 +123,8 @@ if __name__ == "__main__":
         setattr(builtins, GLOBAL_VARNAME_TR_FUNC, gettext)
         setattr(builtins, GLOBAL_VARNAME_NTR_FUNC, ngettext)
 
-    _setup_app_locale()
+    with _startup_step("setup_app_locale"):
+        _setup_app_locale()
 
     def _load_appsettings():
         from zipapp_creator.appsettings import AppSettings
@@ -114,7 +151,8 @@ if __name__ == "__main__":
             return appsettings
 
     # Load app settings
-    _appsettings = _load_appsettings()
+    with _startup_step("load_appsettings"):
+        _appsettings = _load_appsettings()
     # add appsettings to builtins namespace,
     # so that it can be accessed from anywhere
     setattr(builtins, GLOBAL_VARNAME_APPSETTINGS, _appsettings)
@@ -129,7 +167,8 @@ if __name__ == "__main__":
         pyguiadapterlite.set_locale_code(_appsettings.locale)
         pyguiadapterlite.set_default_parameter_label_justify("left")
 
-    _pyguiadapter_init()
+    with _startup_step("pyguiadapter_init"):
+        _pyguiadapter_init()
 
     def _check_dirs():
         _debug(f"Checking app data directories...")
@@ -143,13 +182,36 @@ if __name__ == "__main__":
             _debug(f"Creating app locale directory: {app_locale_dir.as_posix()}")
             app_locale_dir.mkdir(parents=True)
 
-    _check_dirs()
+    with _startup_step("check_dirs"):
+        _check_dirs()
+
+    def _print_startup_timing(window):
+        _ = window
+        _show_window_step.close()
+        print("Startup timing:", file=sys.stderr)
+        for line in _startup_report.summary_lines():
+            print(f"  {line}", file=sys.stderr)
+        print(
+            f"  total: {time.perf_counter() - _STARTED_AT:.3f}s "
+            f"(since main.py started)",
+            file=sys.stderr,
+        )
 
     def main():
-        from zipapp_creator.app import ZipAppCreator
+        with _startup_step("import_app"):
+            from zipapp_creator.app import ZipAppCreator
 
         _debug("Starting ZipAppCreator")
-        creator = ZipAppCreator(appsettings=_appsettings)
+        creator = ZipAppCreator(
+            appsettings=_appsettings,
+            profile_build=_args.profile_build,
+            window_created_callback=(
+                _print_startup_timing if _startup_report is not None else None
+            ),
+        )
+        # 窗口显示出来之后（after_window_create回调中）结束计时
+        _show_window_step.enter_context(_startup_step("show_window"))
         creator.run()
 
+    _show_window_step = contextlib.ExitStack()
     main()
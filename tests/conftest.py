@@ -0,0 +1,10 @@
+import builtins
+
+from zipapp_creator.common import default_tr, default_ntr
+from zipapp_creator.consts import GLOBAL_VARNAME_TR_FUNC, GLOBAL_VARNAME_NTR_FUNC
+
+# 测试不需要翻译，直接使用默认的翻译函数
+if not hasattr(builtins, GLOBAL_VARNAME_TR_FUNC):
+    setattr(builtins, GLOBAL_VARNAME_TR_FUNC, default_tr)
+if not hasattr(builtins, GLOBAL_VARNAME_NTR_FUNC):
+    setattr(builtins, GLOBAL_VARNAME_NTR_FUNC, default_ntr)
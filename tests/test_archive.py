@@ -0,0 +1,170 @@
+import os
+import subprocess
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from zipapp_creator import archive
+from zipapp_creator.archive import _write_file, create_archive
+
+
+@pytest.fixture
+def source(tmp_path: Path) -> Path:
+    source = tmp_path / "src"
+    (source / "pkg").mkdir(parents=True)
+    (source / "pkg" / "__init__.py").write_text("", encoding="utf-8")
+    (source / "pkg" / "app.py").write_text("def main():\n    print('v1')\n")
+    (source / "pkg" / "cli.py").write_text(
+        "import sys\n\n\n"
+        "def hello():\n    print('hello', sys.argv[1:])\n\n\n"
+        "def bye():\n    print('bye', sys.argv[1:])\n"
+    )
+    (source / "data.bin").write_bytes(bytes(range(256)) * 64)
+    return source
+
+
+def read_entries(archive: Path) -> dict:
+    with zipfile.ZipFile(archive) as z:
+        assert z.testzip() is None
+        return {info.filename: z.read(info) for info in z.infolist()}
+
+
+def test_write_file_in_chunks(tmp_path, source):
+    path = source / "data.bin"
+    chunks = []
+    with zipfile.ZipFile(tmp_path / "out.zip", "w", zipfile.ZIP_DEFLATED) as z:
+        zinfo = _write_file(
+            z,
+            path,
+            "data.bin",
+            bytearray(1000),
+            progress=lambda files, n: chunks.append((files, n)),
+        )
+    assert zinfo.compress_type == zipfile.ZIP_DEFLATED
+    # 文件按缓冲区大小分块写入，每块报告一次字节数
+    size = path.stat().st_size
+    assert chunks == [(0, 1000)] * (size // 1000) + [(0, size % 1000)]
+    assert read_entries(tmp_path / "out.zip") == {"data.bin": path.read_bytes()}
+
+
+def test_reuse_raw_entries_from_previous(tmp_path, source):
+    target = tmp_path / "app.pyz"
+    stats = create_archive(source, target, main="pkg.app:main", compressed=True)
+    assert stats.reused_entries == 0
+    first = read_entries(target)
+
+    # 未列在stale中的条目直接从上一次的压缩包中拷贝，即使源文件已经改变
+    (source / "pkg" / "app.py").write_text("def main():\n    print('v2')\n")
+    stats = create_archive(
+        source, target, main="pkg.app:main", compressed=True, previous=target
+    )
+    assert stats.reused_entries == stats.entries - 1
+    assert read_entries(target) == first
+
+    stats = create_archive(
+        source,
+        target,
+        main="pkg.app:main",
+        compressed=True,
+        previous=target,
+        stale=["pkg/app.py"],
+    )
+    assert stats.reused_entries == stats.entries - 2
+    assert b"v2" in read_entries(target)["pkg/app.py"]
+
+
+def test_reuse_entries_without_zipfile_internals(tmp_path, source, monkeypatch):
+    target = tmp_path / "app.pyz"
+    create_archive(source, target, main="pkg.app:main", compressed=True)
+    with zipfile.ZipFile(target) as z:
+        assert archive._can_copy_raw(z)
+    first = read_entries(target)
+
+    # 不支持原样拷贝的Python版本中，复用的条目解压后重新写入，结果相同
+    monkeypatch.setattr(archive, "_can_copy_raw", lambda dst: False)
+    (source / "pkg" / "app.py").write_text("def main():\n    print('v2')\n")
+    stats = create_archive(
+        source, target, main="pkg.app:main", compressed=True, previous=target
+    )
+    assert stats.reused_entries == stats.entries - 1
+    assert read_entries(target) == first
+    with zipfile.ZipFile(target) as z:
+        assert z.getinfo("pkg/").is_dir()
+        assert z.getinfo("data.bin").compress_type == zipfile.ZIP_DEFLATED
+
+
+def test_compression_change_is_not_reused(tmp_path, source):
+    target = tmp_path / "app.pyz"
+    create_archive(source, target, main="pkg.app:main", compressed=True)
+    stats = create_archive(
+        source, target, main="pkg.app:main", compressed=False, previous=target
+    )
+    # 只有目录条目可以复用
+    assert stats.reused_entries == 1
+    with zipfile.ZipFile(target) as z:
+        assert {i.compress_type for i in z.infolist()} == {zipfile.ZIP_STORED}
+
+
+def test_zip64_threshold(tmp_path, source, monkeypatch):
+    target = tmp_path / "app.pyz"
+    stats = create_archive(source, target, main="pkg.app:main")
+    assert not stats.zip64
+    expected = read_entries(target)
+
+    # 降低zip64的阈值，使data.bin（16KB）超过它，而不需要生成4GB的文件
+    monkeypatch.setattr(zipfile, "ZIP64_LIMIT", 8 * 1024)
+    stats = create_archive(source, target, main="pkg.app:main")
+    assert stats.zip64
+    assert read_entries(target) == expected
+
+    # 原样拷贝的条目同样需要zip64的本地文件头
+    stats = create_archive(source, target, main="pkg.app:main", previous=target)
+    assert stats.zip64
+    assert stats.reused_entries == stats.entries - 1
+    assert read_entries(target) == expected
+
+
+def test_zip64_entry_count_threshold(tmp_path, source, monkeypatch):
+    monkeypatch.setattr(zipfile, "ZIP_FILECOUNT_LIMIT", 4)
+    stats = create_archive(source, tmp_path / "app.pyz", main="pkg.app:main")
+    assert stats.entries >= 4
+    assert stats.zip64
+
+
+def run_archive(archive: Path, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, str(archive), *args],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+
+
+def test_dispatcher_entry_point(tmp_path, source):
+    target = tmp_path / "tools.pyz"
+    commands = {"hello": "pkg.cli:hello", "bye": "pkg.cli:bye"}
+    create_archive(source, target, commands=commands)
+
+    result = run_archive(target, "hello", "x")
+    assert result.returncode == 0
+    assert result.stdout.strip() == "hello ['x']"
+    assert run_archive(target, "bye").stdout.strip() == "bye []"
+
+    # 没有默认入口时列出可用的命令
+    result = run_archive(target)
+    assert result.returncode == 2
+    assert "bye" in result.stderr and "hello" in result.stderr
+
+    create_archive(source, target, main="pkg.app:main", commands=commands)
+    assert run_archive(target, "x").stdout.strip() == "v1"
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="requires symlinks")
+def test_dispatcher_uses_program_name(tmp_path, source):
+    target = tmp_path / "tools.pyz"
+    create_archive(source, target, commands={"hello": "pkg.cli:hello"})
+    link = tmp_path / "hello.pyz"
+    os.symlink(target, link)
+    assert run_archive(link, "hello").stdout.strip() == "hello ['hello']"
@@ -0,0 +1,18 @@
+from zipapp_creator import assets
+
+
+def test_export_builtin_locales_if_outdated(tmp_path, monkeypatch):
+    target = tmp_path / "locales"
+    assert assets.export_builtin_locales_if_outdated(target.as_posix())
+    mo_file = target / "zh_CN" / "LC_MESSAGES" / "zc.mo"
+    assert mo_file.read_bytes() == assets.load_locale_file("zc", "zh_CN")
+
+    # 内置的翻译没有变化时不会重复导出
+    mo_file.write_bytes(b"modified")
+    assert not assets.export_builtin_locales_if_outdated(target.as_posix())
+    assert mo_file.read_bytes() == b"modified"
+
+    # 内置的翻译变化后（例如升级后）重新导出，与程序的版本号无关
+    monkeypatch.setattr(assets, "builtin_locales_digest", lambda: "changed")
+    assert assets.export_builtin_locales_if_outdated(target.as_posix())
+    assert mo_file.read_bytes() != b"modified"
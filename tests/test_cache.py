@@ -0,0 +1,45 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from zipapp_creator.cache import ContentCache
+from zipapp_creator.cancellation import OperationCancelled, wait_cancellable
+
+
+def test_content_cache(tmp_path):
+    cache = ContentCache(tmp_path / "cache")
+    key = ContentCache.key(b"content", "v1:strip")
+    # 处理方式不同的结果互不影响
+    assert ContentCache.key(b"content", "v1:objcopy") != key
+    assert cache.get(key) is None
+    cache.put(key, b"result")
+    assert cache.get(key) == b"result"
+    assert ContentCache(tmp_path / "cache").get(key) == b"result"
+
+
+def test_content_cache_ignores_write_errors(tmp_path):
+    (tmp_path / "cache").write_text("not a directory")
+    cache = ContentCache(tmp_path / "cache")
+    key = ContentCache.key(b"content", "v1")
+    cache.put(key, b"result")
+    assert cache.get(key) is None
+
+
+def test_wait_cancellable():
+    release = threading.Event()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        fast = executor.submit(lambda: 1)
+        slow = executor.submit(lambda: release.wait(5) and 2)
+        done = []
+        for future in wait_cancellable([slow, fast], None):
+            done.append(future)
+            release.set()
+        assert done == [fast, slow]
+
+        release.clear()
+        slow = executor.submit(release.wait, 5)
+        with pytest.raises(OperationCancelled):
+            for _ in wait_cancellable([slow], lambda: True):
+                pass
+        release.set()
@@ -0,0 +1,51 @@
+from pathlib import Path
+
+import pytest
+
+from zipapp_creator.archive import create_archive
+from zipapp_creator.delta import DeltaError, apply_delta, make_delta
+
+
+@pytest.fixture
+def archives(tmp_path: Path):
+    source = tmp_path / "src"
+    (source / "pkg").mkdir(parents=True)
+    (source / "pkg" / "__init__.py").write_text("", encoding="utf-8")
+    (source / "pkg" / "app.py").write_text("def main():\n    print('v1')\n")
+    (source / "pkg" / "data.bin").write_bytes(bytes(range(256)) * 256)
+    old = tmp_path / "old.pyz"
+    create_archive(source, old, "/usr/bin/env python3", "pkg.app:main", compressed=True)
+
+    (source / "pkg" / "app.py").write_text("def main():\n    print('v2')\n")
+    (source / "pkg" / "extra.py").write_text("VALUE = 1\n")
+    new = tmp_path / "new.pyz"
+    create_archive(source, new, "/usr/bin/env python3", "pkg.app:main", compressed=True)
+    return old, new
+
+
+def test_apply_delta_reproduces_new_archive(tmp_path, archives):
+    old, new = archives
+    delta = tmp_path / "update.delta"
+    stats = make_delta(old, new, delta)
+    # 未变化的data.bin等条目引用旧压缩包中的数据
+    assert stats.reused_entries >= 2
+    assert stats.reused_bytes > 0
+    assert stats.delta_size < new.stat().st_size
+
+    target = tmp_path / "updated.pyz"
+    apply_delta(old, delta, target)
+    assert target.read_bytes() == new.read_bytes()
+
+    # target可以与old为同一文件
+    apply_delta(old, delta, old)
+    assert old.read_bytes() == new.read_bytes()
+
+
+def test_apply_delta_rejects_other_archive(tmp_path, archives):
+    old, new = archives
+    delta = tmp_path / "update.delta"
+    make_delta(old, new, delta)
+    target = tmp_path / "updated.pyz"
+    with pytest.raises(DeltaError):
+        apply_delta(new, delta, target)
+    assert not target.exists()
@@ -0,0 +1,100 @@
+import os
+import threading
+from pathlib import Path
+
+import pytest
+
+from zipapp_creator.entrypoints import (
+    ENTRY_MISSING_FUNCTION,
+    ENTRY_OK,
+    EntryPointIndex,
+    EntryPointIndexer,
+)
+
+
+@pytest.fixture
+def source(tmp_path: Path) -> Path:
+    source = tmp_path / "src"
+    (source / "pkg").mkdir(parents=True)
+    (source / "main.py").write_text("def main():\n    pass\n")
+    (source / "pkg" / "__init__.py").write_text("")
+    return source
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    """记录EntryPointIndex.build()的调用次数，并可以让它阻塞，模拟很慢的网络驱动器"""
+    calls = []
+    release = threading.Event()
+    release.set()
+    original = EntryPointIndex.build.__func__
+
+    def build(cls, *args, **kwargs):
+        calls.append(args[0])
+        release.wait(5)
+        return original(cls, *args, **kwargs)
+
+    monkeypatch.setattr(EntryPointIndex, "build", classmethod(build))
+    return calls, release
+
+
+def touch(path: Path):
+    # 确保修改时间一定发生变化（某些文件系统的时间精度较低）
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+
+def test_is_stale(source):
+    index = EntryPointIndex.build(source)
+    assert not index.is_stale()
+    (source / "main.py").write_text(
+        "def main():\n    pass\n\n\ndef other():\n    pass\n"
+    )
+    touch(source / "main.py")
+    assert index.is_stale()
+
+    index = EntryPointIndex.build(source)
+    (source / "pkg" / "cli.py").write_text("def main():\n    pass\n")
+    touch(source / "pkg")
+    assert index.is_stale()
+
+
+def test_cached_index_is_returned_without_waiting(source, builds):
+    calls, release = builds
+    indexer = EntryPointIndexer()
+    index = indexer.get(source, timeout=5)
+    assert index.check_entry("main:main") == ENTRY_OK
+    assert len(calls) == 1
+
+    # 源目录没有变化时不会重新建立索引
+    assert indexer.get(source, timeout=5) is index
+    indexer.request(source).result(5)
+    assert len(calls) == 1
+
+    # 源目录发生变化后，即使重新建立索引很慢，也立即返回缓存的索引
+    (source / "main.py").write_text("def other():\n    pass\n")
+    touch(source / "main.py")
+    release.clear()
+    assert indexer.get(source, timeout=0.01) is index
+    release.set()
+    refreshed = indexer.request(source).result(5)
+    assert len(calls) == 2
+    assert refreshed.check_entry("main:main") == ENTRY_MISSING_FUNCTION
+    assert indexer.get(source, timeout=0) is refreshed
+
+
+def test_ignore_patterns_are_cached_separately(source, builds):
+    calls, _ = builds
+    indexer = EntryPointIndexer()
+    assert indexer.get(source, timeout=5).module("pkg") is not None
+    assert indexer.get(source, ["pkg"], timeout=5).module("pkg") is None
+    assert len(calls) == 2
+
+
+def test_first_request_times_out(source, builds):
+    _, release = builds
+    release.clear()
+    indexer = EntryPointIndexer()
+    assert indexer.get(source, timeout=0.01) is None
+    release.set()
+    assert indexer.request(source).result(5) is not None
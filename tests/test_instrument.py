@@ -0,0 +1,24 @@
+import pytest
+
+from zipapp_creator.instrument import BuildReport, peak_rss
+
+
+@pytest.mark.skipif(peak_rss() == 0, reason="peak RSS is not available")
+def test_stage_reports_peak_rss_increase():
+    report = BuildReport()
+    # 分配的内存超过之前的峰值，因此峰值一定会增长
+    size = max(64 * 1024 * 1024, peak_rss())
+    with report.stage("allocate"):
+        data = b"x" * size
+        del data
+    with report.stage("idle"):
+        pass
+    allocate, idle = report.stages
+    assert allocate.peak_rss_increase > 0
+    # 峰值是整个进程的，之后的阶段没有超过它
+    assert idle.peak_rss_increase == 0
+
+    data = report.to_dict()
+    assert data["peak_rss"] >= size
+    assert data["stages"][0]["peak_rss_increase"] == allocate.peak_rss_increase
+    assert "peak_rss" not in data["stages"][0]
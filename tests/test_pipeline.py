@@ -0,0 +1,106 @@
+import shutil
+import threading
+from pathlib import Path
+
+import pytest
+
+from zipapp_creator.app import pipeline
+from zipapp_creator.app.pipeline import BuildPlan, stage_dependencies, stage_source
+from zipapp_creator.instrument import BuildReport
+from zipapp_creator.scheduler import StageGraph
+
+
+def make_plan(source: Path, **kwargs) -> BuildPlan:
+    options = dict(
+        source=source,
+        entry="main:main",
+        target="{SOURCE}.pyz",
+        shebang="",
+        compressed=False,
+        exclude_from_copy=[],
+        exclude_from_packaging=[],
+        host_py="python",
+        requirements="",
+        pip_index_url="",
+        cleanup_dependencies=False,
+        self_extract=False,
+    )
+    options.update(kwargs)
+    return BuildPlan(**options)
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Path:
+    source = tmp_path / "proj"
+    source.mkdir()
+    (source / "main.py").write_text("def main():\n    pass\n")
+    (source / "requirements.txt").write_text("somepackage\n")
+    return source
+
+
+def test_requirements_file_found_in_source(project: Path):
+    plan = make_plan(project)
+    # dist_proj_dir还不存在（或正在被重新创建）时也能找到
+    assert not plan.dist_proj_dir.exists()
+    assert plan.requirements_file() == project / "requirements.txt"
+    assert plan.requirements_relpath() == "requirements.txt"
+
+
+def test_requirements_file_explicit_and_excluded(project: Path):
+    other = project / "reqs" / "prod.txt"
+    other.parent.mkdir()
+    other.write_text("x\n")
+    assert make_plan(project, requirements=str(other)).requirements_file() == other
+    plan = make_plan(project, exclude_from_copy=["requirements.txt"])
+    assert plan.requirements_file() is None
+    (project / "requirements.txt").unlink()
+    assert make_plan(project).requirements_file() is None
+
+
+def test_dependencies_installed_concurrently_with_source(project, monkeypatch):
+    installed = []
+    copying = threading.Event()
+    original_copy = pipeline.copy_source_tree
+
+    def fake_pip_install(py, requirements, target_dir, index_url=None, extra_args=None):
+        # 在拷贝源文件的过程中安装依赖
+        copying.wait(5)
+        installed.append(Path(requirements))
+        package = Path(target_dir) / "somepackage"
+        package.mkdir(parents=True)
+        (package / "__init__.py").write_text("")
+
+    def slow_copy(*args, **kwargs):
+        copying.set()
+        return original_copy(*args, **kwargs)
+
+    monkeypatch.setattr(pipeline, "pip_install", fake_pip_install)
+    monkeypatch.setattr(pipeline, "copy_source_tree", slow_copy)
+    plan = make_plan(project)
+    report = BuildReport()
+    graph = StageGraph()
+    graph.add("source", lambda _: stage_source(plan, report))
+    graph.add("dependencies", lambda _: stage_dependencies(plan, report))
+    results = graph.run()
+
+    assert installed == [project / "requirements.txt"]
+    assert results["dependencies"].top_level() == ["somepackage"]
+    shutil.rmtree(plan.dist_root_dir)
+
+
+def test_stage_file_counts_exclude_directories(project, monkeypatch):
+    def fake_pip_install(py, requirements, target_dir, index_url=None, extra_args=None):
+        package = Path(target_dir) / "somepackage"
+        (package / "__pycache__").mkdir(parents=True)
+        (package / "__init__.py").write_text("")
+        (package / "__pycache__" / "__init__.cpython-311.pyc").write_bytes(b"")
+
+    monkeypatch.setattr(pipeline, "pip_install", fake_pip_install)
+    plan = make_plan(project, cleanup_dependencies=True)
+    report = BuildReport()
+    stage_dependencies(plan, report)
+    files = {record.name: record.files for record in report.stages}
+    assert files["snapshot:dependencies"] == 2
+    # 删除了整个__pycache__目录，其中只有一个文件
+    assert files["cleanup_dependency"] == 1
+    shutil.rmtree(plan.dist_root_dir)
@@ -0,0 +1,83 @@
+import threading
+
+import pytest
+
+from zipapp_creator.cancellation import OperationCancelled
+from zipapp_creator.scheduler import StageFailed, StageGraph
+
+
+def test_stages_run_in_dependency_order():
+    order = []
+    lock = threading.Lock()
+
+    def stage(name, value):
+        def _run(results):
+            with lock:
+                order.append(name)
+            return value(results)
+
+        return _run
+
+    graph = StageGraph()
+    graph.add("a", stage("a", lambda r: 1))
+    graph.add("b", stage("b", lambda r: 2))
+    graph.add("c", stage("c", lambda r: r["a"] + r["b"]), after=["a", "b"])
+    graph.add("d", stage("d", lambda r: r["c"] * 10), after=["c"])
+    results = graph.run()
+
+    assert results == {"a": 1, "b": 2, "c": 3, "d": 30}
+    assert set(order[:2]) == {"a", "b"}
+    assert order[2:] == ["c", "d"]
+
+
+def test_independent_stages_run_concurrently():
+    # 两个阶段互相等待对方开始，只有同时执行时才能完成
+    barrier = threading.Barrier(2, timeout=5)
+    graph = StageGraph()
+    graph.add("source", lambda _: barrier.wait())
+    graph.add("dependencies", lambda _: barrier.wait())
+    assert set(graph.run()) == {"source", "dependencies"}
+
+
+def test_failure_stops_dependent_stages():
+    ran = []
+    graph = StageGraph()
+    graph.add("ok", lambda _: ran.append("ok"))
+    graph.add("bad", lambda _: 1 / 0)
+    graph.add("after", lambda _: ran.append("after"), after=["ok", "bad"])
+    with pytest.raises(StageFailed) as info:
+        graph.run()
+    assert info.value.stage == "bad"
+    assert isinstance(info.value.error, ZeroDivisionError)
+    assert info.value.__cause__ is info.value.error
+    assert ran == ["ok"]
+
+
+def test_cancellation_takes_precedence():
+    failed = threading.Event()
+
+    def bad(_):
+        try:
+            raise ValueError("bad")
+        finally:
+            failed.set()
+
+    def cancelled(_):
+        # 在另一个阶段失败之后才被取消
+        failed.wait(5)
+        raise OperationCancelled()
+
+    graph = StageGraph()
+    graph.add("bad", bad)
+    graph.add("cancelled", cancelled)
+    with pytest.raises(OperationCancelled):
+        graph.run()
+
+
+def test_invalid_graph():
+    graph = StageGraph()
+    graph.add("a", lambda _: None)
+    with pytest.raises(ValueError):
+        graph.add("a", lambda _: None)
+    with pytest.raises(ValueError):
+        graph.add("b", lambda _: None, after=["missing"])
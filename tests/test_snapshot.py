@@ -0,0 +1,80 @@
+from pathlib import Path
+
+import pytest
+
+from zipapp_creator.snapshot import TreeSnapshot
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    root = tmp_path / "tree"
+    for path in (
+        "main.py",
+        "main.pyc",
+        "x",
+        "pkg/__init__.py",
+        "pkg/__pycache__/__init__.cpython-311.pyc",
+        "pkg/x/b",
+        "pkg/build/out.txt",
+        "build/lib/pkg.pyc",
+        "a/b",
+        "a/x/b",
+        "a/x/y/b/x",
+        "a/b.txt",
+    ):
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_text(path, encoding="utf-8")
+    (root / "a" / "empty").mkdir()
+    return root
+
+
+@pytest.mark.parametrize(
+    "pattern", ["*.pyc", "build/", "build", "**/x", "a/**/b", "x/b", "__pycache__/"]
+)
+def test_glob_matches_rglob(tree, pattern):
+    snapshot = TreeSnapshot.capture(tree)
+    expected = {path.relative_to(tree).as_posix() for path in tree.rglob(pattern)}
+    assert set(snapshot.glob(pattern)) == expected
+
+
+def test_entries_are_preorder(tree):
+    snapshot = TreeSnapshot.capture(tree)
+    paths = list(snapshot)
+    for path in paths:
+        if "/" in path:
+            assert paths.index(path.rsplit("/", 1)[0]) < paths.index(path)
+    assert [path for path, _, _ in snapshot.files()] == sorted(
+        path.relative_to(tree).as_posix() for path in tree.rglob("*") if path.is_file()
+    )
+
+
+def test_without_removes_subtrees(tree):
+    snapshot = TreeSnapshot.capture(tree)
+    reduced = snapshot.without(["a/x", "main.py"])
+    assert "a/x" not in reduced and "a/x/y/b/x" not in reduced
+    assert "main.py" not in reduced
+    # 名称以被移除的路径开头的条目不受影响
+    assert "a/b" in reduced and "a/b.txt" in reduced
+    assert snapshot.totals()[0] - reduced.totals()[0] == 3
+    assert snapshot.without([]) is snapshot
+
+
+def test_merge(tmp_path, tree):
+    other_root = tmp_path / "deps"
+    (other_root / "dep").mkdir(parents=True)
+    (other_root / "dep" / "__init__.py").write_text("")
+    (other_root / "zzz.py").write_text("")
+    (other_root / "pkg").mkdir()
+    (other_root / "pkg" / "other.py").write_text("")
+
+    snapshot = TreeSnapshot.capture(tree)
+    merged = snapshot.merge(TreeSnapshot.capture(other_root))
+    assert merged.root == snapshot.root
+    assert "dep/__init__.py" in merged and "zzz.py" in merged
+    # 两者都有的顶层条目保留本快照中的版本
+    assert "pkg/other.py" not in merged
+    # 合并后仍按先序遍历的顺序存储，与重新扫描的结果相同
+    (tree / "dep").mkdir()
+    (tree / "dep" / "__init__.py").write_text("")
+    (tree / "zzz.py").write_text("")
+    assert list(merged) == list(TreeSnapshot.capture(tree))
@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from zipapp_creator.telemetry import (
+    ENV_TELEMETRY,
+    ENV_TELEMETRY_DIR,
+    telemetry_module,
+)
+
+
+def run_app(tmp_path: Path, telemetry: str) -> Path:
+    """用telemetry_module()生成的模块与__main__.py运行一个最小的程序，返回遥测输出目录"""
+    name, content, prologue = telemetry_module()
+    app_dir = tmp_path / "app"
+    app_dir.mkdir()
+    (app_dir / name).write_text(content, encoding="utf-8")
+    (app_dir / "__main__.py").write_text(prologue + "print('ok')\n", encoding="utf-8")
+    out_dir = tmp_path / "telemetry"
+    env = dict(os.environ)
+    env[ENV_TELEMETRY] = telemetry
+    env[ENV_TELEMETRY_DIR] = str(out_dir)
+    result = subprocess.run(
+        [sys.executable, str(app_dir)],
+        cwd=tmp_path,
+        env=env,
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    assert result.returncode == 0
+    assert result.stdout.strip() == "ok"
+    return out_dir
+
+
+@pytest.mark.parametrize("value", ["", "0", "false", "No", "OFF"])
+def test_telemetry_disabled_by_false_values(tmp_path, value):
+    out_dir = run_app(tmp_path, value)
+    assert not out_dir.exists()
+    # 变量的值不再被当作输出目录
+    assert not value or not (tmp_path / value).exists()
+
+
+def test_telemetry_written_to_telemetry_dir(tmp_path):
+    out_dir = run_app(tmp_path, "1")
+    suffixes = sorted(path.suffix for path in out_dir.iterdir())
+    assert suffixes == [".json", ".prof"]
@@ -0,0 +1,129 @@
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from zipapp_creator.app import utils
+from zipapp_creator.app.utils import copy_source_tree, output_prefix
+from zipapp_creator.cancellation import OperationCancelled
+from zipapp_creator.staging import PARALLEL_COPY_THRESHOLD, STAGING_COPY, Stager
+
+
+class RecordingStager(Stager):
+    """记录拷贝每个文件的线程，可以在拷贝指定的文件时失败。每个文件额外等待1ms，模拟高延迟的文件系统"""
+
+    def __init__(self, fail_on: str = ""):
+        super().__init__(STAGING_COPY)
+        self.fail_on = fail_on
+        self.threads = set()
+        self.staged = []
+
+    def stage(self, src, dst, *args, **kwargs):
+        self.threads.add(threading.get_ident())
+        time.sleep(0.001)
+        if self.fail_on and Path(src).name == self.fail_on:
+            raise OSError(f"cannot copy {src}")
+        super().stage(src, dst, *args, **kwargs)
+        self.staged.append(Path(src).name)
+
+
+@pytest.fixture
+def source(tmp_path: Path) -> Path:
+    source = tmp_path / "src"
+    for i in range(PARALLEL_COPY_THRESHOLD * 2):
+        path = source / f"pkg{i % 4}" / f"module{i}.py"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"VALUE = {i}\n" * (i + 1))
+    (source / "pkg0" / "__pycache__").mkdir()
+    (source / "pkg0" / "__pycache__" / "module0.pyc").write_bytes(b"\0")
+    return source
+
+
+def relative_files(root: Path) -> dict:
+    return {
+        path.relative_to(root).as_posix(): path.read_bytes()
+        for path in root.rglob("*")
+        if path.is_file()
+    }
+
+
+@pytest.mark.parametrize("workers", [1, 8])
+def test_copy_source_tree(tmp_path, source, workers):
+    dist = tmp_path / "dist"
+    progress = []
+    lock = threading.Lock()
+
+    def _progress(files, n):
+        with lock:
+            progress.append((files, n))
+
+    stager = RecordingStager()
+    files, total_bytes = copy_source_tree(
+        source,
+        dist,
+        ["__pycache__"],
+        progress=_progress,
+        stager=stager,
+        workers=workers,
+    )
+
+    expected = {
+        path: content
+        for path, content in relative_files(source).items()
+        if "__pycache__" not in path
+    }
+    assert relative_files(dist) == expected
+    assert files == len(expected)
+    assert total_bytes == sum(len(content) for content in expected.values())
+    assert sum(files for files, _ in progress) == files
+    assert sum(n for _, n in progress) == total_bytes
+    if workers > 1:
+        assert len(stager.threads) > 1
+    else:
+        assert stager.threads == {threading.get_ident()}
+
+
+def test_copy_source_tree_propagates_errors(tmp_path, source):
+    stager = RecordingStager(fail_on="module10.py")
+    with pytest.raises(OSError, match="module10.py"):
+        copy_source_tree(source, tmp_path / "dist", [], stager=stager, workers=8)
+
+
+def test_copy_source_tree_cancelled(tmp_path, source):
+    stager = RecordingStager()
+    with pytest.raises(OperationCancelled):
+        copy_source_tree(
+            source,
+            tmp_path / "dist",
+            [],
+            cancelled=lambda: len(stager.staged) >= 10,
+            stager=stager,
+            workers=8,
+        )
+    # 取消后不再开始新的拷贝
+    assert len(stager.staged) < PARALLEL_COPY_THRESHOLD * 2
+
+
+def test_output_prefix_is_per_thread(monkeypatch):
+    lines = []
+    monkeypatch.setattr(utils, "uprint", lambda msg="", end="\n": lines.append(msg))
+    ready = threading.Barrier(2, timeout=5)
+
+    def _stage(name):
+        with output_prefix(f"[{name}] "):
+            ready.wait()
+            utils.info(name)
+            utils._print("first\nsecond\n", end="")
+
+    threads = [threading.Thread(target=_stage, args=(n,)) for n in ("a", "b")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    utils._print("done")
+
+    for name in ("a", "b"):
+        assert f"[{name}] first\n[{name}] second\n" in lines
+        assert f"[{name}] \033[1mINFO    {name}\033[0m" in lines
+    assert lines[-1] == "done"
@@ -0,0 +1,226 @@
+import dataclasses
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from .instrument import format_size
+
+ANALYSIS_VERSION = 1
+
+# 压缩后大小不低于原始大小的该比例时，认为该条目无法被有效压缩（例如.so、图片、已压缩的数据）
+INCOMPRESSIBLE_RATIO = 0.9
+INCOMPRESSIBLE_MIN_SIZE = 64 * 1024
+# 小于该大小的“运行时可能用不到”的条目不单独列出
+UNUSED_MIN_SIZE = 4 * 1024
+# 运行时通常用不到的目录与文件类型
+UNUSED_DIR_NAMES = frozenset(("tests", "test", "docs", "examples", "__pycache__"))
+UNUSED_DIR_SUFFIXES = (".dist-info", ".egg-info")
+UNUSED_SUFFIXES = frozenset((".pyi", ".pyx", ".pxd", ".c", ".h", ".cpp", ".md", ".rst"))
+
+NO_SUFFIX = "(none)"
+
+
+@dataclasses.dataclass
+class SizeGroup(object):
+    name: str
+    files: int = 0
+    size: int = 0
+    compressed_size: int = 0
+
+    def add(self, size: int, compressed_size: int):
+        self.files += 1
+        self.size += size
+        self.compressed_size += compressed_size
+
+    @property
+    def ratio(self) -> float:
+        """压缩后大小与原始大小之比，越小表示压缩效果越好"""
+        return self.compressed_size / self.size if self.size else 1.0
+
+    def to_dict(self) -> dict:
+        return {**dataclasses.asdict(self), "ratio": self.ratio}
+
+
+@dataclasses.dataclass
+class FlaggedEntry(object):
+    name: str
+    size: int
+    compressed_size: int
+    reason: str
+
+    def to_dict(self) -> dict:
+        return dataclasses.asdict(self)
+
+
+REASON_INCOMPRESSIBLE = "incompressible"
+REASON_UNUSED = "likely_unused"
+
+
+@dataclasses.dataclass
+class GroupDelta(object):
+    name: str
+    compressed_size: int
+    previous_compressed_size: int
+
+    @property
+    def delta(self) -> int:
+        return self.compressed_size - self.previous_compressed_size
+
+
+def _is_likely_unused(name: str) -> bool:
+    parts = name.split("/")
+    for part in parts[:-1]:
+        if part in UNUSED_DIR_NAMES or part.endswith(UNUSED_DIR_SUFFIXES):
+            return True
+    return Path(parts[-1]).suffix.lower() in UNUSED_SUFFIXES
+
+
+def _sorted_groups(groups: Dict[str, SizeGroup]) -> List[SizeGroup]:
+    return sorted(groups.values(), key=lambda g: (-g.compressed_size, g.name))
+
+
+class ArchiveAnalysis(object):
+    """
+    zipapp压缩包的大小分析：按顶层包（压缩包内路径的第一个分量）与文件类型统计压缩前后的大小，
+    并列出无法被有效压缩的大文件以及运行时可能用不到的文件（测试、文档、C源码、元数据等）。
+
+    只读取压缩包的中央目录，不需要解压任何条目，因此即使压缩包很大，分析也很快。
+    """
+
+    def __init__(
+        self,
+        archive: Union[str, Path],
+        packages: Dict[str, SizeGroup],
+        suffixes: Dict[str, SizeGroup],
+        flagged: List[FlaggedEntry],
+    ):
+        self.archive = Path(archive)
+        self.packages = packages
+        self.suffixes = suffixes
+        self.flagged = flagged
+
+    @classmethod
+    def analyze(cls, archive: Union[str, Path]) -> "ArchiveAnalysis":
+        import zipfile
+
+        packages: Dict[str, SizeGroup] = {}
+        suffixes: Dict[str, SizeGroup] = {}
+        flagged: List[FlaggedEntry] = []
+        with zipfile.ZipFile(archive) as z:
+            infos = z.infolist()
+        for zinfo in infos:
+            if zinfo.is_dir():
+                continue
+            name = zinfo.filename
+            size, compressed_size = zinfo.file_size, zinfo.compress_size
+            package = name.split("/", 1)[0]
+            suffix = Path(name).suffix.lower() or NO_SUFFIX
+            packages.setdefault(package, SizeGroup(package)).add(size, compressed_size)
+            suffixes.setdefault(suffix, SizeGroup(suffix)).add(size, compressed_size)
+            if (
+                zinfo.compress_type != zipfile.ZIP_STORED
+                and size >= INCOMPRESSIBLE_MIN_SIZE
+                and compressed_size >= size * INCOMPRESSIBLE_RATIO
+            ):
+                flagged.append(
+                    FlaggedEntry(name, size, compressed_size, REASON_INCOMPRESSIBLE)
+                )
+            elif size >= UNUSED_MIN_SIZE and _is_likely_unused(name):
+                flagged.append(FlaggedEntry(name, size, compressed_size, REASON_UNUSED))
+        flagged.sort(key=lambda e: (-e.compressed_size, e.name))
+        return cls(archive, packages, suffixes, flagged)
+
+    @property
+    def total(self) -> SizeGroup:
+        total = SizeGroup("total")
+        for group in self.packages.values():
+            total.files += group.files
+            total.size += group.size
+            total.compressed_size += group.compressed_size
+        return total
+
+    def to_dict(self) -> dict:
+        return {
+            "version": ANALYSIS_VERSION,
+            "archive": self.archive.as_posix(),
+            "total": self.total.to_dict(),
+            "packages": [g.to_dict() for g in _sorted_groups(self.packages)],
+            "suffixes": [g.to_dict() for g in _sorted_groups(self.suffixes)],
+            "flagged": [e.to_dict() for e in self.flagged],
+        }
+
+    def write_json(self, path: Union[str, Path]):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+
+    def diff(self, previous: dict, min_delta: int = 1024) -> List[GroupDelta]:
+        """
+        与上一次构建的分析结果（to_dict()的返回值）比较，返回压缩后大小变化不小于min_delta字节的顶层包
+        （包括新增与被移除的包），按变化量的绝对值从大到小排序。
+        """
+        previous_sizes = {
+            g["name"]: int(g["compressed_size"]) for g in previous.get("packages", [])
+        }
+        deltas = []
+        for name in set(previous_sizes) | set(self.packages):
+            group = self.packages.get(name, None)
+            delta = GroupDelta(
+                name=name,
+                compressed_size=group.compressed_size if group is not None else 0,
+                previous_compressed_size=previous_sizes.get(name, 0),
+            )
+            if abs(delta.delta) >= min_delta:
+                deltas.append(delta)
+        deltas.sort(key=lambda d: (-abs(d.delta), d.name))
+        return deltas
+
+    def summary_lines(
+        self, top: int = 10, previous: Optional[dict] = None
+    ) -> List[str]:
+        def _group_line(g: SizeGroup) -> str:
+            return (
+                f"{g.name}: {format_size(g.compressed_size)} "
+                f"({format_size(g.size)} uncompressed, ratio {g.ratio:.2f}, "
+                f"{g.files} files)"
+            )
+
+        lines = [_group_line(self.total), "packages:"]
+        lines.extend(f"  {_group_line(g)}" for g in _sorted_groups(self.packages)[:top])
+        lines.append("file types:")
+        lines.extend(f"  {_group_line(g)}" for g in _sorted_groups(self.suffixes)[:top])
+        if self.flagged:
+            lines.append("flagged entries:")
+            lines.extend(
+                f"  [{e.reason}] {e.name}: {format_size(e.compressed_size)} "
+                f"({format_size(e.size)} uncompressed)"
+                for e in self.flagged[:top]
+            )
+            if len(self.flagged) > top:
+                lines.append(f"  ... and {len(self.flagged) - top} more")
+        if previous is not None:
+            deltas = self.diff(previous)
+            lines.append(
+                "changes since previous build:"
+                if deltas
+                else "no changes since previous build"
+            )
+            lines.extend(
+                f"  {d.name}: {'+' if d.delta > 0 else '-'}"
+                f"{format_size(abs(d.delta))} "
+                f"({format_size(d.previous_compressed_size)} -> "
+                f"{format_size(d.compressed_size)})"
+                for d in deltas[:top]
+            )
+        return lines
+
+
+def load_analysis(path: Union[str, Path]) -> Optional[dict]:
+    """读取之前保存的分析结果，文件不存在或无法解析时返回None"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version", None) != ANALYSIS_VERSION:
+        return None
+    return data
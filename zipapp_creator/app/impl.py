@@ -1,12 +1,16 @@
-import os.path
+import shlex
 import sys
 import traceback
-import zipapp
 from pathlib import Path
 from string import Template
-from typing import Callable, Union, Dict
+from typing import Union, Dict, Optional, Iterable, Callable, List, Tuple
 
-from pyguiadapterlite import GUIAdapter, FnExecuteWindowConfig, FnExecuteWindow
+from pyguiadapterlite import (
+    GUIAdapter,
+    FnExecuteWindowConfig,
+    FnExecuteWindow,
+    is_function_cancelled,
+)
 from pyguiadapterlite.types import (
     dir_t,
     DirectoryValue,
@@ -17,63 +21,103 @@ from pyguiadapterlite.types import (
     bool_t,
     string_list,
     StringListValue,
+    RangedIntValue,
+    SingleChoiceValue,
 )
 
+from .pipeline import (
+    BuildPlan,
+    TargetVariant,
+    parse_target_variant,
+    parse_commands,
+    stage_source,
+    stage_minify,
+    capture_snapshot,
+    stage_dependencies,
+    merge_dependencies,
+    stage_dependency_layer,
+    stage_archive,
+    stage_matrix,
+    preflight_matrix,
+    analyze_target,
+    smoke_test_target,
+    sync_source_changes,
+    write_build_report,
+)
 from .utils import (
     info,
+    output_prefix,
     error,
     warning,
     success,
-    pip_install,
-    cleanup_dependency,
-    copy_source_tree,
-    ignored_files,
     is_valid_entry_point,
+    ProgressBar,
 )
+from .watch import SourceWatcher
 from ..appsettings import AppSettings
 from ..assets import read_asset_text
+from ..cancellation import OperationCancelled
 from ..common import trfunc
+from ..entrypoints import (
+    EntryPointIndex,
+    EntryPointIndexer,
+    ENTRY_MISSING_FUNCTION,
+    ENTRY_REQUIRES_ARGUMENTS,
+    ENTRY_SYNTAX_ERROR,
+)
+from ..instrument import BuildReport
+from ..platforms import parse_matrix
+from ..progress import JsonLinesWriter, broadcast
+from ..scheduler import StageGraph, StageFailed
+from ..snapshot import TreeSnapshot
+from ..staging import STAGING_AUTO, STAGING_STRATEGIES
 from ..consts import (
     DEFAULT_TARGET_NAME,
     DEFAULT_SHEBANG,
     DEFAULT_HOST_INTERPRETER,
-    DIST_DIR,
     DEFAULT_COPY_EXCLUDE_PATTERNS,
     DEFAULT_PACKAGING_EXCLUDE_PATTERNS,
     DEFAULT_ENTRY_POINT,
+    DIST_DIR,
     START_SCRIPT_TEMPLATE,
     APP_NAME,
     APP_VERSION,
     APP_SETTINGS_FILE,
+    APP_PROFILES_DIR,
 )
 from ..messages import messages
-from ..selfextracting import create_startup_script
+
+# 参数校验在界面线程中执行，最多等待入口点索引的时间（秒），超时则跳过依赖文件系统的检查
+VALIDATION_TIMEOUT = 0.5
+# 错误信息中最多列出的候选入口数量
+MAX_ENTRY_CANDIDATES = 10
 
 
-class CanceledByUser(RuntimeError):
-    pass
+def _with_output_prefix(stage: str, func: Callable) -> Callable:
+    """包装StageGraph的阶段函数，使该阶段输出的每一行都以阶段名开头"""
+
+    def _run(results):
+        with output_prefix(f"[{stage}] "):
+            return func(results)
+
+    return _run
 
 
 class ZipAppCreator(object):
 
-    def __init__(self, appsettings):
+    def __init__(
+        self,
+        appsettings,
+        profile_build: bool = False,
+        window_created_callback: Optional[Callable[[FnExecuteWindow], None]] = None,
+    ):
         self._appsettings: AppSettings = appsettings
+        # 命令行参数--profile-build只对本次运行生效，不会被写入配置文件
+        self._profile_build = profile_build
+        self._window_created_callback = window_created_callback
         self._startup_script_template = Template(read_asset_text(START_SCRIPT_TEMPLATE))
         self._msgs = messages()
-
-    @staticmethod
-    def _packaging_filter(
-        exclude_patterns: string_list, target_dir: Path
-    ) -> Callable[[Union[str, Path]], bool]:
-
-        ignored = ignored_files(
-            target_dir, exclude_patterns, path_type="relative", posix=True
-        )
-
-        def _filter(path: Path) -> bool:
-            return path.as_posix() not in ignored
-
-        return _filter
+        self._indexer = EntryPointIndexer()
 
     def _create_start_script(
         self, zipapp_file: Union[str, Path], start_script_py: str
@@ -89,6 +133,211 @@ class ZipAppCreator(object):
             f.write(script_content)
         return script_file
 
+    def _stage_source(
+        self, plan: BuildPlan, report: BuildReport
+    ) -> Tuple[TreeSnapshot, TreeSnapshot]:
+        """拷贝（并精简）源文件，返回(源目录的快照, dist_proj_dir的快照)"""
+        info(self._msgs.MSG_COPY_SOURCE_FILES.format(plan.dist_proj_dir.as_posix()))
+        source_snapshot = stage_source(plan, report)
+        snapshot = source_snapshot.rebase(plan.dist_proj_dir)
+        if plan.minify:
+            snapshot = stage_minify(plan, report, snapshot)
+        return source_snapshot, snapshot
+
+    def _build(self, plan: BuildPlan) -> Optional[TreeSnapshot]:
+        """完整地构建一次，成功时返回源目录的快照（供监视模式使用），失败时返回None"""
+        report = BuildReport(progress=plan.progress)
+        if plan.matrix:
+            source_snapshot, snapshot = self._stage_source(plan, report)
+            if not self._build_matrix(plan, report, snapshot):
+                return None
+            return source_snapshot
+
+        # 依赖安装到单独的目录中，与拷贝（精简）源文件同时进行，完成后再合并到dist_proj_dir。
+        # 两者的输出会相互穿插，因此以阶段名作为前缀
+        graph = StageGraph()
+        graph.add(
+            "source",
+            _with_output_prefix("source", lambda _: self._stage_source(plan, report)),
+        )
+        if plan.dependency_layer:
+            install = stage_dependency_layer
+        else:
+            install = stage_dependencies
+        graph.add(
+            "dependencies",
+            _with_output_prefix("dependencies", lambda _: install(plan, report)),
+        )
+        if not plan.dependency_layer:
+            graph.add(
+                "merge",
+                lambda r: merge_dependencies(
+                    plan, report, r["source"][1], r["dependencies"]
+                ),
+                after=("source", "dependencies"),
+            )
+        try:
+            results = graph.run()
+        except StageFailed as e:
+            if e.stage != "dependencies":
+                raise e.error
+            error(self._msgs.MSG_PIP_INSTALL_FAILURE.format(str(e.error)))
+            return None
+
+        source_snapshot, snapshot = results["source"]
+        snapshot = results.get("merge", snapshot)
+        if not self._build_archive(plan, report, snapshot=snapshot):
+            return None
+        return source_snapshot
+
+    def _write_build_report(self, plan: BuildPlan, report: BuildReport):
+        info(self._msgs.MSG_BUILD_STAGES)
+        for line in report.summary_lines():
+            info(f"  {line}")
+        try:
+            written = write_build_report(plan, report)
+        except Exception as e:
+            warning(self._msgs.MSG_WRITE_BUILD_REPORT_FAILURE.format(str(e)))
+            return
+        for report_file in written:
+            info(self._msgs.MSG_BUILD_REPORT_SAVED.format(report_file.as_posix()))
+
+    def _analyze_archive(self, plan: BuildPlan, target: Path, report: BuildReport):
+        try:
+            analysis, previous = analyze_target(plan, target, report)
+        except Exception as e:
+            warning(self._msgs.MSG_ANALYZE_ARCHIVE_FAILURE.format(str(e)))
+            return
+        info(self._msgs.MSG_ARCHIVE_ANALYSIS.format(target.name))
+        for line in analysis.summary_lines(previous=previous):
+            info(f"  {line}")
+        info(
+            self._msgs.MSG_ARCHIVE_ANALYSIS_SAVED.format(
+                plan.analysis_file(target).as_posix()
+            )
+        )
+
+    def _smoke_test(self, plan: BuildPlan, target: Path, report: BuildReport) -> bool:
+        info(self._msgs.MSG_SMOKE_TEST_RUNNING.format(target.name))
+        try:
+            result = smoke_test_target(plan, target, report)
+        except OperationCancelled:
+            raise
+        except Exception as e:
+            error(self._msgs.MSG_SMOKE_TEST_FAILURE.format(target.name, str(e)))
+            return False
+        for line in result.summary_lines():
+            info(f"  {line}")
+        if not result.passed:
+            error(
+                self._msgs.MSG_SMOKE_TEST_FAILURE.format(
+                    target.name, "; ".join(result.violations)
+                )
+            )
+            return False
+        success(self._msgs.MSG_SMOKE_TEST_PASSED.format(target.name))
+        return True
+
+    def _build_matrix(
+        self, plan: BuildPlan, report: BuildReport, snapshot: TreeSnapshot
+    ) -> bool:
+        try:
+            problems = preflight_matrix(plan, report)
+        except OperationCancelled:
+            raise
+        except Exception as e:
+            error(self._msgs.MSG_PIP_INSTALL_FAILURE.format(str(e)))
+            return False
+        if problems:
+            error("\n".join([self._msgs.MSG_MATRIX_PREFLIGHT_FAILURE, *problems]))
+            return False
+
+        try:
+            results = stage_matrix(plan, report, snapshot)
+        except OperationCancelled:
+            raise
+        except Exception as e:
+            traceback.print_exc()
+            error(self._msgs.MSG_CREATE_ZIPAPP_FAILURE.format(str(e)))
+            return False
+        return self._handle_results(plan, report, results)
+
+    def _build_archive(
+        self,
+        plan: BuildPlan,
+        report: BuildReport,
+        snapshot: Optional[TreeSnapshot] = None,
+        stale: Optional[Iterable[str]] = None,
+    ) -> bool:
+        try:
+            results = stage_archive(plan, report, snapshot=snapshot, stale=stale)
+        except OperationCancelled:
+            raise
+        except Exception as e:
+            traceback.print_exc()
+            error(self._msgs.MSG_CREATE_ZIPAPP_FAILURE.format(str(e)))
+            return False
+        return self._handle_results(plan, report, results)
+
+    def _handle_results(
+        self,
+        plan: BuildPlan,
+        report: BuildReport,
+        results: List[Tuple[TargetVariant, Union[Path, Exception]]],
+    ) -> bool:
+        ok = True
+        for variant, result in results:
+            if isinstance(result, Exception):
+                traceback.print_exception(type(result), result, result.__traceback__)
+                error(self._msgs.MSG_CREATE_ZIPAPP_FAILURE.format(str(result)))
+                ok = False
+            else:
+                success(self._msgs.MSG_ZIPAPP_CREATED.format(result.as_posix()))
+                if plan.analyze_archive:
+                    self._analyze_archive(plan, result, report)
+                if plan.smoke_test and not plan.matrix:
+                    ok = self._smoke_test(plan, result, report) and ok
+        self._write_build_report(plan, report)
+        return ok
+
+    def _watch(self, plan: BuildPlan, snapshot: Optional[TreeSnapshot] = None):
+        watcher = SourceWatcher(
+            plan.source, plan.copy_exclude_patterns(), snapshot=snapshot
+        )
+        requirements_relpath = plan.requirements_relpath()
+        info(self._msgs.MSG_WATCHING_SOURCE.format(plan.source.as_posix()))
+        while True:
+            changes = watcher.wait_for_changes(is_function_cancelled)
+            if changes is None:
+                info(self._msgs.MSG_WATCH_STOPPED)
+                return
+            info(
+                self._msgs.MSG_SOURCE_CHANGED.format(
+                    len(changes.changed), len(changes.removed)
+                )
+            )
+            stale = changes.changed | changes.removed
+            if plan.matrix:
+                # 每个目标平台都有各自的暂存目录，直接完整地重新构建
+                self._build(plan)
+            elif requirements_relpath is not None and requirements_relpath in stale:
+                # 依赖发生了变化，需要完整地重新构建
+                info(self._msgs.MSG_REQUIREMENTS_CHANGED)
+                self._build(plan)
+            else:
+                report = BuildReport(progress=plan.progress)
+                sync_source_changes(plan, changes, report)
+                snapshot = None
+                if plan.minify:
+                    snapshot = capture_snapshot(
+                        report, "staging", plan.dist_proj_dir, cancelled=plan.cancelled
+                    )
+                    snapshot = stage_minify(
+                        plan, report, snapshot, only=changes.changed
+                    )
+                self._build_archive(plan, report, snapshot=snapshot, stale=stale)
+            info(self._msgs.MSG_WATCHING_SOURCE.format(plan.source.as_posix()))
+
     def _on_run(
         self,
         source: dir_t,
@@ -103,7 +352,31 @@ class ZipAppCreator(object):
         pip_index_url: str,
         cleanup_dependencies: bool_t,
         self_extract: bool_t,
+        extra_targets: string_list = None,
+        watch: bool_t = False,
+        build_report: bool_t = True,
+        chrome_trace: bool_t = False,
+        progress_log: bool_t = False,
+        analyze_archive: bool_t = True,
+        telemetry: bool_t = False,
+        smoke_test: bool_t = False,
+        smoke_test_args: str = "",
+        smoke_test_timeout: int = 60,
+        smoke_test_max_time: int = 0,
+        smoke_test_max_rss: int = 0,
+        dependency_layer: bool_t = False,
+        strip_binaries: bool_t = False,
+        commands: string_list = None,
+        platform_matrix: string_list = None,
+        minify: bool_t = False,
+        minify_strip_asserts: bool_t = False,
+        minify_keep_line_numbers: bool_t = True,
+        minify_keep: string_list = None,
+        memory_limit: int = 0,
+        staging: str = STAGING_AUTO,
+        copy_workers: int = 0,
     ):
+        from ..smoketest import SmokeTestBudget
 
         host_py = host_py.strip()
         if not host_py:
@@ -111,71 +384,160 @@ class ZipAppCreator(object):
             host_py = Path(sys.executable).absolute().as_posix()
             info(f"Current python interpreter: {host_py}")
 
-        cleanup_dependencies = bool(cleanup_dependencies)
-        self_extract = bool(self_extract)
-
         source = Path(source).absolute()
         info(self._msgs.MSG_START_PACKAGING)
 
-        dist_root_dir = (os.path.normpath(source) / Path(DIST_DIR)).absolute()
-        proj_name = Path(os.path.normpath(source)).name
-        dist_proj_dir = Path(os.path.normpath(dist_root_dir)).joinpath(proj_name).absolute()
-        info(self._msgs.MSG_COPY_SOURCE_FILES.format(dist_proj_dir.as_posix()))
-
-        exclude_from_copy = exclude_from_copy or []
-        exclude_from_copy.append(f"{dist_root_dir.name.lstrip('/')}")
-
-        copy_source_tree(source, dist_proj_dir, exclude_from_copy)
+        plan = BuildPlan(
+            source=source,
+            entry=entry,
+            target=target,
+            shebang=shebang,
+            compressed=bool(compressed),
+            exclude_from_copy=exclude_from_copy or [],
+            exclude_from_packaging=exclude_from_packaging or [],
+            host_py=host_py,
+            requirements=requirements,
+            pip_index_url=pip_index_url,
+            cleanup_dependencies=bool(cleanup_dependencies),
+            self_extract=bool(self_extract),
+            extra_targets=extra_targets or [],
+            build_report=bool(build_report),
+            chrome_trace=bool(chrome_trace),
+            progress_log=bool(progress_log),
+            analyze_archive=bool(analyze_archive),
+            telemetry=bool(telemetry),
+            smoke_test=bool(smoke_test),
+            smoke_test_args=shlex.split(smoke_test_args or ""),
+            smoke_test_timeout=max(1, smoke_test_timeout),
+            smoke_test_budget=SmokeTestBudget(
+                max_time=max(0, smoke_test_max_time) / 1000,
+                max_rss=max(0, smoke_test_max_rss) * 1024 * 1024,
+            ),
+            dependency_layer=bool(dependency_layer),
+            strip_binaries=bool(strip_binaries),
+            commands=parse_commands(commands or []),
+            matrix=parse_matrix(platform_matrix or []),
+            minify=bool(minify),
+            minify_strip_asserts=bool(minify_strip_asserts),
+            minify_keep_line_numbers=bool(minify_keep_line_numbers),
+            minify_keep=minify_keep or [],
+            memory_limit=max(0, memory_limit) * 1024 * 1024,
+            staging=staging or STAGING_AUTO,
+            copy_workers=max(0, copy_workers),
+            cancelled=is_function_cancelled,
+        )
 
-        requirements = requirements.strip()
-        if not requirements:
-            requirements = (dist_proj_dir / "requirements.txt").absolute()
-            if not requirements.is_file():
-                requirements = ""
+        if self._profile_build or self._appsettings.profile_build:
+            self._run_profiled(plan, bool(watch))
+        else:
+            self._run(plan, bool(watch))
 
-        if requirements:
+    def _run(self, plan: BuildPlan, watch: bool):
+        progress_bar = ProgressBar()
+        progress_log = None
+        if plan.progress_log:
             try:
-                pip_install(
-                    py=host_py,
-                    requirements=requirements,
-                    target_dir=dist_proj_dir,
-                    index_url=pip_index_url,
-                )
-            except CanceledByUser as e:
-                error(str(e))
-                return
-            except Exception as e:
-                error(self._msgs.MSG_PIP_INSTALL_FAILURE.format(str(e)))
+                progress_log = JsonLinesWriter(plan.progress_file())
+            except OSError as e:
+                warning(self._msgs.MSG_WRITE_PROGRESS_LOG_FAILURE.format(str(e)))
+        plan.progress = broadcast([progress_bar, progress_log])
+        try:
+            source_snapshot = self._build(plan)
+            if source_snapshot is None or not watch:
                 return
-            if cleanup_dependencies:
-                cleanup_dependency(target_dir=dist_proj_dir)
+            self._watch(plan, source_snapshot)
+        except OperationCancelled as e:
+            # 各个阶段都会在下一个检查点停止，未完成的压缩包不会覆盖已有的压缩包
+            error(str(e) or self._msgs.MSG_BUILD_CANCELLED)
+        finally:
+            progress_bar.close()
+            if progress_log is not None:
+                progress_log.close()
+                info(
+                    self._msgs.MSG_PROGRESS_LOG_SAVED.format(
+                        progress_log.path.as_posix()
+                    )
+                )
+
+    def _run_profiled(self, plan: BuildPlan, watch: bool):
+        from ..profiling import BuildProfiler
 
+        profiler = BuildProfiler(APP_PROFILES_DIR)
         try:
+            profiler.run(self._run, plan, watch)
+        finally:
+            info(self._msgs.MSG_PROFILE_HOTSPOTS)
+            info(profiler.summary())
+            if profiler.dump_error is not None:
+                warning(
+                    self._msgs.MSG_WRITE_PROFILE_FAILURE.format(
+                        str(profiler.dump_error)
+                    )
+                )
+            else:
+                info(
+                    self._msgs.MSG_PROFILE_SAVED.format(
+                        profiler.profile_file.as_posix()
+                    )
+                )
 
-            target = target.strip() or "{SOURCE}.pyz"
-            target = target.format(SOURCE=source.name)
-            target = Path(dist_root_dir) / target
-            info(self._msgs.MSG_CREATING_ZIPAPP.format(target.name))
-
-            if self_extract:
-                start_script = create_startup_script(dist_proj_dir, entry)
-                entry = f"{start_script.stem}:main"
-
-            zipapp.create_archive(
-                source=dist_proj_dir.as_posix(),
-                target=target.as_posix(),
-                interpreter=shebang,
-                main=entry,
-                compressed=bool(compressed),
-                filter=self._packaging_filter(exclude_from_packaging, dist_proj_dir),
+    def _entry_candidates(
+        self, index: Optional[EntryPointIndex], self_extract: bool
+    ) -> str:
+        if index is None:
+            return ""
+        candidates = index.candidates(self_extract)[:MAX_ENTRY_CANDIDATES]
+        if not candidates:
+            return ""
+        return "\n" + self._msgs.MSG_ENTRY_CANDIDATES.format(", ".join(candidates))
+
+    def _check_entry_point(self, entry: str, index: EntryPointIndex) -> str:
+        module, _, func = entry.partition(":")
+        result = index.check_entry(entry)
+        if result == ENTRY_MISSING_FUNCTION:
+            return self._msgs.MSG_ENTRY_FUNCTION_NOT_FOUND.format(func, module)
+        if result == ENTRY_REQUIRES_ARGUMENTS:
+            return self._msgs.MSG_ENTRY_FUNCTION_REQUIRES_ARGS.format(func, module)
+        if result == ENTRY_SYNTAX_ERROR:
+            return self._msgs.MSG_ENTRY_MODULE_SYNTAX_ERROR.format(
+                module, index.module(module).error
             )
+        # 模块不在源目录中时（例如来自依赖），无法在打包前判断
+        return ""
 
-            success(self._msgs.MSG_ZIPAPP_CREATED.format(target.as_posix()))
-
-        except Exception as e:
-            traceback.print_exc()
-            error(self._msgs.MSG_CREATE_ZIPAPP_FAILURE.format(str(e)))
-            return
+    def _check_entry(
+        self,
+        entry: str,
+        self_extract: bool,
+        index: Optional[EntryPointIndex],
+        has_commands: bool = False,
+    ) -> Dict[str, str]:
+        """
+        检查入口。index为None时（源目录不存在或索引尚未建立完成），只检查入口的格式。
+        has_commands为True时（多入口压缩包），入口为可选的默认入口。
+        """
+        invalid_params = {}
+        has_main_file = index is not None and index.is_file("__main__.py")
+        entry_file = Path(entry).as_posix() if entry else ""
+        is_entry_file = index is not None and bool(entry) and index.is_file(entry_file)
+        if self_extract:
+            if has_main_file:
+                invalid_params["self_extract"] = self._msgs.MSG_MAIN_FILE_NOT_ALLOWED
+            if not entry or (index is not None and not is_entry_file):
+                invalid_params["entry"] = self._msgs.MSG_VALID_ENTRY_FILE_REQUIRED
+        else:
+            if not entry:
+                if index is not None and not has_main_file and not has_commands:
+                    invalid_params["entry"] = self._msgs.MSG_ENTRY_REQUIRED
+            elif is_entry_file or not is_valid_entry_point(entry):
+                invalid_params["entry"] = self._msgs.MSG_INVALID_ENTRY_FORMAT
+            elif index is not None:
+                msg = self._check_entry_point(entry, index)
+                if msg:
+                    invalid_params["entry"] = msg
+        if "entry" in invalid_params:
+            invalid_params["entry"] += self._entry_candidates(index, self_extract)
+        return invalid_params
 
     # noinspection PyUnusedLocal
     def _parameter_validator(
@@ -183,50 +545,151 @@ class ZipAppCreator(object):
         func_name: str,
         source: dir_t,
         entry: str,
+        target: str,
         self_extract: bool_t,
         host_py: file_t,
         requirements: file_t,
+        extra_targets: string_list = None,
+        exclude_from_copy: string_list = None,
+        dependency_layer: bool_t = False,
+        commands: string_list = None,
+        platform_matrix: string_list = None,
+        memory_limit: int = 0,
+        smoke_test: bool_t = False,
+        smoke_test_args: str = "",
         **kwargs,
     ) -> Dict[str, str]:
         tr = trfunc()
         _ = func_name
         invalid_params = {}
 
+        # 目录扫描与模块解析在后台线程中进行，并按文件缓存解析结果，
+        # 因此重复校验时只需要重新解析修改过的模块
+        index = None
         source = source.strip()
         if not source:
             invalid_params["source"] = self._msgs.MSG_SOURCE_DIR_REQUIRED
         else:
-            if not Path(source).is_dir():
+            index = self._indexer.get(
+                source,
+                [*(exclude_from_copy or []), DIST_DIR],
+                timeout=VALIDATION_TIMEOUT,
+            )
+            if index is not None and not index.exists:
                 invalid_params["source"] = self._msgs.MSG_SOURCE_DIR_NOT_FOUND
+                index = None
+
+        parsed_commands = {}
+        try:
+            parsed_commands = parse_commands(commands or [])
+        except ValueError as e:
+            invalid_params["commands"] = f"{self._msgs.MSG_INVALID_COMMANDS}\n{e}"
+        has_commands = bool(parsed_commands) or "commands" in invalid_params
 
         entry = entry.strip()
         if source:
-            main_file = Path(source) / "__main__.py"
-            if self_extract:
-                if main_file.is_file():
-                    invalid_params["self_extract"] = (
-                        self._msgs.MSG_MAIN_FILE_NOT_ALLOWED
+            invalid_params.update(
+                self._check_entry(entry, self_extract, index, has_commands)
+            )
+
+        extra_targets = [spec for spec in (extra_targets or []) if spec.strip()]
+        self_extract_targets = bool(self_extract)
+        if source and extra_targets:
+            invalid_extra_targets = []
+            target_names = {target.strip() or DEFAULT_TARGET_NAME}
+            base = TargetVariant(
+                target=target,
+                entry=entry,
+                shebang="",
+                compressed=False,
+                self_extract=bool(self_extract),
+            )
+            for spec in extra_targets:
+                try:
+                    variant = parse_target_variant(spec, base)
+                except ValueError as e:
+                    invalid_extra_targets.append(f"{spec}: {e}")
+                    continue
+                self_extract_targets = self_extract_targets or variant.self_extract
+                if variant.target in target_names:
+                    invalid_extra_targets.append(
+                        f"{spec}: {self._msgs.MSG_DUPLICATE_TARGET}"
                     )
-                if not entry or not (Path(source) / entry).is_file():
-                    invalid_params["entry"] = self._msgs.MSG_VALID_ENTRY_FILE_REQUIRED
-            else:
-                if not entry:
-                    if not main_file.is_file():
-                        invalid_params["entry"] = self._msgs.MSG_ENTRY_REQUIRED
-                else:
-                    if (Path(source) / entry).is_file():
-                        invalid_params["entry"] = self._msgs.MSG_INVALID_ENTRY_FORMAT
-                    elif not is_valid_entry_point(entry):
-                        invalid_params["entry"] = self._msgs.MSG_INVALID_ENTRY_FORMAT
+                target_names.add(variant.target)
+                for msg in self._check_entry(
+                    variant.entry.strip(), variant.self_extract, index, has_commands
+                ).values():
+                    invalid_extra_targets.append(f"{spec}: {msg}")
+            if invalid_extra_targets:
+                invalid_params["extra_targets"] = "\n".join(
+                    [self._msgs.MSG_INVALID_EXTRA_TARGETS, *invalid_extra_targets]
+                )
+
+        if parsed_commands:
+            invalid_commands = []
+            if self_extract_targets:
+                invalid_commands.append(
+                    self._msgs.MSG_COMMANDS_SELF_EXTRACT_UNSUPPORTED
+                )
+            if index is not None and index.is_file("__main__.py"):
+                invalid_commands.append(self._msgs.MSG_COMMANDS_MAIN_FILE_CONFLICT)
+            if index is not None:
+                for name, command_entry in parsed_commands.items():
+                    msg = self._check_entry_point(command_entry, index)
+                    if msg:
+                        invalid_commands.append(f"{name}: {msg}")
+            if invalid_commands:
+                invalid_params["commands"] = "\n".join(
+                    [self._msgs.MSG_INVALID_COMMANDS, *invalid_commands]
+                )
+
+        if dependency_layer:
+            if self_extract_targets:
+                invalid_params["dependency_layer"] = (
+                    self._msgs.MSG_LAYER_SELF_EXTRACT_UNSUPPORTED
+                )
+            elif not entry and not has_commands and "entry" not in invalid_params:
+                invalid_params["entry"] = self._msgs.MSG_LAYER_ENTRY_REQUIRED
+
+        matrix = []
+        try:
+            matrix = parse_matrix(platform_matrix or [])
+        except ValueError as e:
+            invalid_params["platform_matrix"] = (
+                f"{self._msgs.MSG_INVALID_PLATFORM_MATRIX}\n{e}"
+            )
+        if matrix and dependency_layer:
+            invalid_params["platform_matrix"] = self._msgs.MSG_MATRIX_LAYER_UNSUPPORTED
+
+        if memory_limit > 0:
+            from ..archive import writer_memory, MIN_CHUNK_SIZE
+
+            min_memory_limit = -(-writer_memory(MIN_CHUNK_SIZE) // (1024 * 1024))
+            if memory_limit < min_memory_limit:
+                invalid_params["memory_limit"] = (
+                    self._msgs.MSG_INVALID_MEMORY_LIMIT.format(min_memory_limit)
+                )
+
+        if smoke_test:
+            try:
+                shlex.split(smoke_test_args or "")
+            except ValueError as e:
+                invalid_params["smoke_test_args"] = (
+                    self._msgs.MSG_INVALID_SMOKE_TEST_ARGS.format(str(e))
+                )
+            if matrix:
+                invalid_params["smoke_test"] = self._msgs.MSG_SMOKE_TEST_MATRIX
 
         # host_py = host_py.strip()
         # if not host_py:
         #     invalid_params["host_py"] = self._msgs.MSG_HOST_PYTHON_REQUIRED
 
         requirements = requirements.strip()
-        if source and requirements:
-            requirements = Path(source) / requirements
-            if not requirements.is_file():
+        if index is not None and requirements:
+            # 绝对路径或被排除的文件不在索引中，此时才访问文件系统
+            if not index.is_file(Path(requirements).as_posix()) and not (
+                (Path(source) / requirements).is_file()
+            ):
                 invalid_params["requirements"] = (
                     self._msgs.MSG_REQUIREMENTS_FILE_NOT_FOUND
                 )
@@ -238,6 +701,8 @@ class ZipAppCreator(object):
             title=APP_NAME.replace("-", " ").title() + f" - V{APP_VERSION}",
             print_function_result=False,
             show_function_result=False,
+            enable_progressbar=True,
+            enable_progress_label=True,
             document_tab_title=self._msgs.MSG_DOCUMENT_TAB_TITLE,
             output_tab_title=self._msgs.MSG_OUTPUT_TAB_TITLE,
             execute_button_text=self._msgs.MSG_START_BTN_TEXT,
@@ -250,6 +715,8 @@ class ZipAppCreator(object):
 
     def after_window_create(self, window: FnExecuteWindow):
         window.set_always_on_top(self._appsettings.always_on_top)
+        if self._window_created_callback is not None:
+            self._window_created_callback(window)
 
     # noinspection PyUnusedLocal
     def before_window_close(self, window: FnExecuteWindow) -> bool:
@@ -344,6 +811,13 @@ class ZipAppCreator(object):
                 group=self._msgs.MSG_PARAM_GROUP_EXCLUDE,
                 description=self._msgs.MSG_PARAM_DESC_EXCLUDE_FROM_PACKAGING,
             ),
+            minify_keep=StringListValue(
+                label=self._msgs.MSG_PARAM_MINIFY_KEEP,
+                default_value=[],
+                hide_label=True,
+                group=self._msgs.MSG_PARAM_GROUP_EXCLUDE,
+                description=self._msgs.MSG_PARAM_DESC_MINIFY_KEEP,
+            ),
             host_py=FileValue(
                 label=self._msgs.MSG_PARAM_HOST_PYTHON,
                 default_value=DEFAULT_HOST_INTERPRETER,
@@ -366,5 +840,151 @@ class ZipAppCreator(object):
                 group=self._msgs.MSG_PARAM_GROUP_PACKAGING,
                 description=self._msgs.MSG_PARAM_DESC_CLEANUP_DEPENDENCIES,
             ),
+            strip_binaries=BoolValue2(
+                label=self._msgs.MSG_PARAM_STRIP_BINARIES,
+                default_value=False,
+                group=self._msgs.MSG_PARAM_GROUP_PACKAGING,
+                description=self._msgs.MSG_PARAM_DESC_STRIP_BINARIES,
+            ),
+            extra_targets=StringListValue(
+                label=self._msgs.MSG_PARAM_EXTRA_TARGETS,
+                default_value=[],
+                hide_label=True,
+                group=self._msgs.MSG_PARAM_GROUP_TARGETS,
+                description=self._msgs.MSG_PARAM_DESC_EXTRA_TARGETS,
+            ),
+            commands=StringListValue(
+                label=self._msgs.MSG_PARAM_COMMANDS,
+                default_value=[],
+                hide_label=True,
+                group=self._msgs.MSG_PARAM_GROUP_TARGETS,
+                description=self._msgs.MSG_PARAM_DESC_COMMANDS,
+            ),
+            watch=BoolValue2(
+                label=self._msgs.MSG_PARAM_WATCH,
+                default_value=False,
+                group=self._msgs.MSG_PARAM_GROUP_PACKAGING,
+                description=self._msgs.MSG_PARAM_DESC_WATCH,
+            ),
+            dependency_layer=BoolValue2(
+                label=self._msgs.MSG_PARAM_DEPENDENCY_LAYER,
+                default_value=False,
+                group=self._msgs.MSG_PARAM_GROUP_PACKAGING,
+                description=self._msgs.MSG_PARAM_DESC_DEPENDENCY_LAYER,
+            ),
+            minify=BoolValue2(
+                label=self._msgs.MSG_PARAM_MINIFY,
+                default_value=False,
+                group=self._msgs.MSG_PARAM_GROUP_PACKAGING,
+                description=self._msgs.MSG_PARAM_DESC_MINIFY,
+            ),
+            minify_strip_asserts=BoolValue2(
+                label=self._msgs.MSG_PARAM_MINIFY_STRIP_ASSERTS,
+                default_value=False,
+                group=self._msgs.MSG_PARAM_GROUP_PACKAGING,
+                description=self._msgs.MSG_PARAM_DESC_MINIFY_STRIP_ASSERTS,
+            ),
+            minify_keep_line_numbers=BoolValue2(
+                label=self._msgs.MSG_PARAM_MINIFY_KEEP_LINE_NUMBERS,
+                default_value=True,
+                group=self._msgs.MSG_PARAM_GROUP_PACKAGING,
+                description=self._msgs.MSG_PARAM_DESC_MINIFY_KEEP_LINE_NUMBERS,
+            ),
+            memory_limit=RangedIntValue(
+                label=self._msgs.MSG_PARAM_MEMORY_LIMIT,
+                default_value=0,
+                min_value=0,
+                max_value=1024 * 1024,
+                group=self._msgs.MSG_PARAM_GROUP_PACKAGING,
+                description=self._msgs.MSG_PARAM_DESC_MEMORY_LIMIT,
+            ),
+            staging=SingleChoiceValue(
+                label=self._msgs.MSG_PARAM_STAGING,
+                default_value=STAGING_AUTO,
+                choices=list(STAGING_STRATEGIES),
+                columns=len(STAGING_STRATEGIES),
+                group=self._msgs.MSG_PARAM_GROUP_PACKAGING,
+                description=self._msgs.MSG_PARAM_DESC_STAGING,
+            ),
+            copy_workers=RangedIntValue(
+                label=self._msgs.MSG_PARAM_COPY_WORKERS,
+                default_value=0,
+                min_value=0,
+                max_value=256,
+                group=self._msgs.MSG_PARAM_GROUP_PACKAGING,
+                description=self._msgs.MSG_PARAM_DESC_COPY_WORKERS,
+            ),
+            platform_matrix=StringListValue(
+                label=self._msgs.MSG_PARAM_PLATFORM_MATRIX,
+                default_value=[],
+                hide_label=True,
+                group=self._msgs.MSG_PARAM_GROUP_TARGETS,
+                description=self._msgs.MSG_PARAM_DESC_PLATFORM_MATRIX,
+            ),
+            build_report=BoolValue2(
+                label=self._msgs.MSG_PARAM_BUILD_REPORT,
+                default_value=True,
+                group=self._msgs.MSG_PARAM_GROUP_DIAGNOSTICS,
+                description=self._msgs.MSG_PARAM_DESC_BUILD_REPORT,
+            ),
+            chrome_trace=BoolValue2(
+                label=self._msgs.MSG_PARAM_CHROME_TRACE,
+                default_value=False,
+                group=self._msgs.MSG_PARAM_GROUP_DIAGNOSTICS,
+                description=self._msgs.MSG_PARAM_DESC_CHROME_TRACE,
+            ),
+            progress_log=BoolValue2(
+                label=self._msgs.MSG_PARAM_PROGRESS_LOG,
+                default_value=False,
+                group=self._msgs.MSG_PARAM_GROUP_DIAGNOSTICS,
+                description=self._msgs.MSG_PARAM_DESC_PROGRESS_LOG,
+            ),
+            analyze_archive=BoolValue2(
+                label=self._msgs.MSG_PARAM_ANALYZE_ARCHIVE,
+                default_value=True,
+                group=self._msgs.MSG_PARAM_GROUP_DIAGNOSTICS,
+                description=self._msgs.MSG_PARAM_DESC_ANALYZE_ARCHIVE,
+            ),
+            telemetry=BoolValue2(
+                label=self._msgs.MSG_PARAM_TELEMETRY,
+                default_value=False,
+                group=self._msgs.MSG_PARAM_GROUP_DIAGNOSTICS,
+                description=self._msgs.MSG_PARAM_DESC_TELEMETRY,
+            ),
+            smoke_test=BoolValue2(
+                label=self._msgs.MSG_PARAM_SMOKE_TEST,
+                default_value=False,
+                group=self._msgs.MSG_PARAM_GROUP_DIAGNOSTICS,
+                description=self._msgs.MSG_PARAM_DESC_SMOKE_TEST,
+            ),
+            smoke_test_args=StringValue(
+                label=self._msgs.MSG_PARAM_SMOKE_TEST_ARGS,
+                group=self._msgs.MSG_PARAM_GROUP_DIAGNOSTICS,
+                description=self._msgs.MSG_PARAM_DESC_SMOKE_TEST_ARGS,
+            ),
+            smoke_test_timeout=RangedIntValue(
+                label=self._msgs.MSG_PARAM_SMOKE_TEST_TIMEOUT,
+                default_value=60,
+                min_value=1,
+                max_value=24 * 60 * 60,
+                group=self._msgs.MSG_PARAM_GROUP_DIAGNOSTICS,
+                description=self._msgs.MSG_PARAM_DESC_SMOKE_TEST_TIMEOUT,
+            ),
+            smoke_test_max_time=RangedIntValue(
+                label=self._msgs.MSG_PARAM_SMOKE_TEST_MAX_TIME,
+                default_value=0,
+                min_value=0,
+                max_value=24 * 60 * 60 * 1000,
+                group=self._msgs.MSG_PARAM_GROUP_DIAGNOSTICS,
+                description=self._msgs.MSG_PARAM_DESC_SMOKE_TEST_MAX_TIME,
+            ),
+            smoke_test_max_rss=RangedIntValue(
+                label=self._msgs.MSG_PARAM_SMOKE_TEST_MAX_RSS,
+                default_value=0,
+                min_value=0,
+                max_value=1024 * 1024,
+                group=self._msgs.MSG_PARAM_GROUP_DIAGNOSTICS,
+                description=self._msgs.MSG_PARAM_DESC_SMOKE_TEST_MAX_RSS,
+            ),
         )
         adapter.run()
@@ -0,0 +1,983 @@
+import dataclasses
+import os
+import shutil
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Union, Tuple
+
+from .utils import (
+    info,
+    warning,
+    pip_install,
+    cleanup_dependency,
+    copy_source_tree,
+    ignored_files,
+    is_valid_entry_point,
+    pip_dry_run,
+)
+from .watch import SourceChanges
+from ..cancellation import OperationCancelled, check_cancelled
+from ..consts import (
+    DIST_DIR,
+    DEFAULT_TARGET_NAME,
+    APP_LAYERS_DIR,
+    APP_MINIFY_CACHE_DIR,
+    APP_STRIP_CACHE_DIR,
+)
+from ..instrument import BuildReport, StageRecord, report_file
+from ..messages import messages
+from ..progress import ProgressListener
+from ..snapshot import TreeSnapshot
+from ..staging import Stager, STAGING_AUTO, STAGING_COPY
+
+# 各个可选功能的模块只在用到时才导入（它们会引入ast、concurrent.futures等较重的模块），以加快程序启动
+if TYPE_CHECKING:
+    from ..analysis import ArchiveAnalysis
+    from ..platforms import MatrixTarget
+    from ..smoketest import SmokeTestBudget, SmokeTestResult
+
+_TRUE_VALUES = ("1", "true", "yes", "on")
+_FALSE_VALUES = ("0", "false", "no", "off")
+
+
+@dataclasses.dataclass(frozen=True)
+class TargetVariant(object):
+    target: str
+    entry: str
+    shebang: str
+    compressed: bool
+    self_extract: bool
+
+
+def _parse_bool(value: str) -> bool:
+    value = value.strip().lower()
+    if value in _TRUE_VALUES:
+        return True
+    if value in _FALSE_VALUES:
+        return False
+    raise ValueError(f"invalid boolean value: {value}")
+
+
+def parse_target_variant(spec: str, base: TargetVariant) -> TargetVariant:
+    """
+    解析额外的打包目标，格式为：`<target>; key=value; ...`，其中key可以是entry、shebang、
+    compressed、self_extract，未指定的选项沿用base中的值。例如：
+
+    `{SOURCE}-selfextract.pyz; self_extract=true; entry=main.py`
+    """
+    parts = [part.strip() for part in spec.split(";")]
+    target = parts[0]
+    if not target:
+        raise ValueError("target name is required")
+    fields = {}
+    for part in parts[1:]:
+        if not part:
+            continue
+        key, sep, value = part.partition("=")
+        key = key.strip()
+        if not sep:
+            raise ValueError(f"invalid option: {part}")
+        if key in ("compressed", "self_extract"):
+            fields[key] = _parse_bool(value)
+        elif key in ("entry", "shebang"):
+            fields[key] = value.strip()
+        else:
+            raise ValueError(f"unknown option: {key}")
+    return dataclasses.replace(base, target=target, **fields)
+
+
+def parse_commands(specs: Iterable[str]) -> Dict[str, str]:
+    """
+    解析多入口压缩包的命令，每一项的格式为：`<name>=<module>:<fn>`，例如`serve=app.cli:serve`。
+    """
+    commands = {}
+    for spec in specs:
+        spec = spec.strip()
+        if not spec:
+            continue
+        name, sep, entry = spec.partition("=")
+        name, entry = name.strip(), entry.strip()
+        if not sep or not name or not entry:
+            raise ValueError(f"invalid command: {spec}")
+        if any(c.isspace() or c in "/\\" for c in name):
+            raise ValueError(f"invalid command name: {name}")
+        if ":" not in entry or not is_valid_entry_point(entry):
+            raise ValueError(f"invalid entry point (expected module:fn): {entry}")
+        if name in commands:
+            raise ValueError(f"duplicate command: {name}")
+        commands[name] = entry
+    return commands
+
+
+@dataclasses.dataclass
+class BuildPlan(object):
+    source: Path
+    entry: str
+    target: str
+    shebang: str
+    compressed: bool
+    exclude_from_copy: List[str]
+    exclude_from_packaging: List[str]
+    host_py: str
+    requirements: str
+    pip_index_url: str
+    cleanup_dependencies: bool
+    self_extract: bool
+    extra_targets: List[str] = dataclasses.field(default_factory=list)
+    build_report: bool = False
+    chrome_trace: bool = False
+    # 将进度事件以JSON Lines格式写入<target>.progress.jsonl
+    progress_log: bool = False
+    analyze_archive: bool = False
+    # 在压缩包中嵌入遥测模块：运行时启用了ZIPAPP_TELEMETRY环境变量时记录导入耗时、解压耗时与cProfile结果
+    telemetry: bool = False
+    # 构建完成后在隔离的解释器中运行压缩包，检查其能否正常启动，并检查耗时与内存是否超出预算
+    smoke_test: bool = False
+    smoke_test_args: List[str] = dataclasses.field(default_factory=list)
+    smoke_test_timeout: float = 60.0
+    # 冒烟测试的预算，为None时不限制
+    smoke_test_budget: Optional["SmokeTestBudget"] = None
+    dependency_layer: bool = False
+    # 安装依赖后剥离其中ELF共享对象的调试信息（需要系统中有strip或objcopy）
+    strip_binaries: bool = False
+    # 多入口压缩包的命令（命令名 -> 入口），为空时生成普通的单入口压缩包
+    commands: Dict[str, str] = dataclasses.field(default_factory=dict)
+    # 依赖矩阵：为每个目标平台分别安装依赖并生成带后缀的压缩包
+    matrix: List["MatrixTarget"] = dataclasses.field(default_factory=list)
+    # 精简源文件（移除文档字符串、注释等），minify_keep中的文件保持原样
+    minify: bool = False
+    minify_strip_asserts: bool = False
+    minify_keep_line_numbers: bool = True
+    minify_keep: List[str] = dataclasses.field(default_factory=list)
+    # 打包可使用的内存上限（字节），0表示不限制
+    memory_limit: int = 0
+    # 暂存策略（auto、reflink、hardlink、copy），决定源文件如何放入暂存目录
+    staging: str = STAGING_AUTO
+    # 拷贝源文件的线程数，0表示自动（default_copy_workers()），1表示逐个拷贝
+    copy_workers: int = 0
+    # 本次构建实际使用的依赖层（文件名），由stage_dependency_layer()填充
+    layers: List[str] = dataclasses.field(default_factory=list)
+    # 返回是否已请求取消构建的函数（例如is_function_cancelled），各个阶段在循环中定期检查
+    cancelled: Optional[Callable[[], bool]] = dataclasses.field(
+        default=None, repr=False, compare=False
+    )
+    # 接收各个阶段进度事件的监听器，用于创建BuildReport
+    progress: Optional[ProgressListener] = dataclasses.field(
+        default=None, repr=False, compare=False
+    )
+
+    @property
+    def dist_root_dir(self) -> Path:
+        return (Path(os.path.normpath(self.source)) / DIST_DIR).absolute()
+
+    @property
+    def dist_proj_dir(self) -> Path:
+        proj_name = Path(os.path.normpath(self.source)).name
+        return self.dist_root_dir.joinpath(proj_name).absolute()
+
+    def variants(self) -> List[TargetVariant]:
+        base = TargetVariant(
+            target=self.target,
+            entry=self.entry,
+            shebang=self.shebang,
+            compressed=self.compressed,
+            self_extract=self.self_extract,
+        )
+        variants = [base]
+        for spec in self.extra_targets:
+            if spec.strip():
+                variants.append(parse_target_variant(spec, base))
+        return variants
+
+    def target_file(
+        self, variant: Optional[TargetVariant] = None, suffix: str = ""
+    ) -> Path:
+        target = variant.target if variant is not None else self.target
+        target = target.strip() or DEFAULT_TARGET_NAME
+        target = self.dist_root_dir / target.format(SOURCE=self.source.name)
+        if suffix:
+            target = target.with_name(f"{target.stem}-{suffix}{target.suffix}")
+        return target
+
+    def matrix_staging_dir(self, target: "MatrixTarget") -> Path:
+        return self.dist_root_dir / ".matrix" / target.suffix / self.dist_proj_dir.name
+
+    def report_file(self) -> Path:
+        return report_file(self.target_file(), ".build.json")
+
+    def trace_file(self) -> Path:
+        return report_file(self.target_file(), ".trace.json")
+
+    def progress_file(self) -> Path:
+        return report_file(self.target_file(), ".progress.jsonl")
+
+    @property
+    def layers_dir(self) -> Path:
+        from ..layers import LAYERS_DIR_NAME
+
+        return self.dist_root_dir / LAYERS_DIR_NAME
+
+    @property
+    def dependency_dir(self) -> Path:
+        # 与dist_proj_dir位于同一文件系统，合并时只需重命名
+        return self.dist_root_dir / ".deps" / self.dist_proj_dir.name
+
+    @property
+    def layer_site_dir(self) -> Path:
+        return self.dist_root_dir / ".layer-site"
+
+    def analysis_file(self, target: Path) -> Path:
+        return report_file(target, ".analysis.json")
+
+    def smoke_test_file(self, target: Path) -> Path:
+        return report_file(target, ".smoketest.json")
+
+    def copy_exclude_patterns(self) -> List[str]:
+        return [*self.exclude_from_copy, self.dist_root_dir.name.lstrip("/")]
+
+    def requirements_file(self) -> Optional[Path]:
+        """
+        未指定requirements时使用源目录中的requirements.txt（被排除在拷贝之外时除外）。
+        总是在源目录而不是dist_proj_dir中查找：安装依赖与拷贝源文件同时进行，此时dist_proj_dir可能正在被重新创建。
+        """
+        requirements = self.requirements.strip()
+        if requirements:
+            return Path(requirements)
+        source = Path(os.path.normpath(self.source)).absolute()
+        requirements = source / "requirements.txt"
+        ignore = shutil.ignore_patterns(*self.copy_exclude_patterns())
+        if requirements.is_file() and not ignore(str(source), [requirements.name]):
+            return requirements
+        return None
+
+    def requirements_relpath(self) -> Optional[str]:
+        """requirements文件相对于源目录的路径，若其不在源目录（或其副本）中则返回None"""
+        requirements = self.requirements_file()
+        if requirements is None:
+            return "requirements.txt"
+        requirements = Path(os.path.normpath(requirements.absolute()))
+        for base_dir in (self.dist_proj_dir, self.source):
+            try:
+                return requirements.relative_to(base_dir).as_posix()
+            except ValueError:
+                continue
+        return None
+
+
+def packaging_filter(
+    exclude_patterns: List[str],
+    target_dir: Path,
+    snapshot: Optional[TreeSnapshot] = None,
+) -> Callable[[Union[str, Path]], bool]:
+    ignored = ignored_files(
+        target_dir,
+        exclude_patterns,
+        path_type="relative",
+        posix=True,
+        snapshot=snapshot,
+    )
+
+    def _filter(path: Path) -> bool:
+        return path.as_posix() not in ignored
+
+    return _filter
+
+
+def capture_snapshot(
+    report: BuildReport,
+    name: str,
+    root_dir: Path,
+    ignore_patterns: Iterable[str] = (),
+    cancelled: Optional[Callable[[], bool]] = None,
+) -> TreeSnapshot:
+    with report.stage(f"snapshot:{name}") as record:
+        snapshot = TreeSnapshot.capture(root_dir, ignore_patterns, cancelled)
+        record.add(files=snapshot.totals()[0])
+    return snapshot
+
+
+def _stage_tree(
+    plan: BuildPlan,
+    record: StageRecord,
+    source_dir: Path,
+    staging_dir: Path,
+    ignore_patterns: List[str],
+    snapshot: TreeSnapshot,
+):
+    """按照plan.staging把source_dir中的文件放入staging_dir，并记录每种方式暂存的文件数量"""
+    stager = Stager(plan.staging)
+    record.expect(*snapshot.totals())
+    files, total_bytes = copy_source_tree(
+        source_dir,
+        staging_dir,
+        ignore_patterns,
+        snapshot=snapshot,
+        cancelled=plan.cancelled,
+        progress=record.advance,
+        stager=stager,
+        workers=plan.copy_workers,
+    )
+    record.add(files=files, bytes=total_bytes)
+    record.extra.update({f"staged_{k}": v for k, v in stager.counts.items()})
+    # 明确指定了reflink或hardlink时，提示退回到了普通拷贝
+    copied = stager.counts.get(STAGING_COPY, 0)
+    if plan.staging not in (STAGING_AUTO, STAGING_COPY) and copied:
+        warning(messages().MSG_STAGING_FALLBACK.format(plan.staging, copied))
+
+
+def stage_source(plan: BuildPlan, report: BuildReport) -> TreeSnapshot:
+    """拷贝源目录，返回源目录的快照，之后的阶段（以及监视模式）都基于该快照，而不再遍历源目录"""
+    snapshot = capture_snapshot(
+        report, "source", plan.source, plan.copy_exclude_patterns(), plan.cancelled
+    )
+    with report.stage("copy_source_tree") as record:
+        _stage_tree(
+            plan,
+            record,
+            plan.source,
+            plan.dist_proj_dir,
+            plan.copy_exclude_patterns(),
+            snapshot,
+        )
+    return snapshot
+
+
+def stage_minify(
+    plan: BuildPlan,
+    report: BuildReport,
+    snapshot: TreeSnapshot,
+    only: Optional[Iterable[str]] = None,
+) -> TreeSnapshot:
+    """
+    精简dist_proj_dir中（从源目录拷贝过来的）Python源文件，依赖不会被精简。snapshot为dist_proj_dir的快照，
+    若指定了only，则只处理其中列出的文件（监视模式下只处理发生了变化的文件）。
+    返回更新了文件大小之后的快照。
+    """
+    from ..cache import ContentCache
+    from ..minify import MinifyOptions, minify_tree
+
+    msgs = messages()
+    kept = set()
+    for pattern in plan.minify_keep:
+        if pattern.strip():
+            kept.update(snapshot.glob(pattern.strip()))
+    candidates = snapshot.without(kept)
+    paths = [path for path, _, _ in candidates.files() if path.endswith(".py")]
+    if only is not None:
+        only = set(only)
+        paths = [path for path in paths if path in only]
+    if not paths:
+        return snapshot
+    options = MinifyOptions(
+        strip_docstrings=True,
+        strip_asserts=plan.minify_strip_asserts,
+        keep_line_numbers=plan.minify_keep_line_numbers,
+    )
+    info(msgs.MSG_MINIFYING_SOURCE.format(len(paths)))
+    with report.stage("minify_source") as record:
+        record.expect(files=len(paths))
+        stats, sizes, failures = minify_tree(
+            plan.dist_proj_dir,
+            paths,
+            options,
+            ContentCache(APP_MINIFY_CACHE_DIR),
+            cancelled=plan.cancelled,
+            progress=record.advance,
+        )
+        record.add(files=stats.files, bytes=stats.bytes_before)
+    for path, reason in sorted(failures.items()):
+        warning(msgs.MSG_MINIFY_FILE_SKIPPED.format(path, reason))
+    info(
+        msgs.MSG_MINIFY_DONE.format(
+            stats.files - stats.kept_files,
+            stats.cached_files,
+            stats.bytes_before,
+            stats.bytes_after,
+        )
+    )
+    return snapshot.with_sizes(sizes)
+
+
+def _install_dependencies(
+    plan: BuildPlan,
+    report: BuildReport,
+    requirements: Path,
+    target_dir: Path,
+    matrix_target: Optional["MatrixTarget"] = None,
+) -> TreeSnapshot:
+    label = f":{matrix_target.suffix}" if matrix_target is not None else ""
+    with report.stage(f"pip_install{label}"):
+        pip_install(
+            py=plan.host_py,
+            requirements=requirements,
+            target_dir=target_dir,
+            index_url=plan.pip_index_url,
+            extra_args=matrix_target.pip_args() if matrix_target is not None else None,
+        )
+    snapshot = capture_snapshot(
+        report, f"dependencies{label}", target_dir, cancelled=plan.cancelled
+    )
+    if plan.cleanup_dependencies:
+        with report.stage(f"cleanup_dependency{label}") as record:
+            removed = cleanup_dependency(
+                target_dir,
+                snapshot=snapshot,
+                cancelled=plan.cancelled,
+                progress=record.advance,
+            )
+            remaining = snapshot.without(removed)
+            # removed中包括整个被删除的目录，因此根据快照统计实际删除的文件数量
+            record.add(files=snapshot.totals()[0] - remaining.totals()[0])
+        snapshot = remaining
+    if plan.strip_binaries:
+        snapshot = _strip_binaries(plan, report, target_dir, snapshot, label)
+    return snapshot
+
+
+def _strip_binaries(
+    plan: BuildPlan,
+    report: BuildReport,
+    target_dir: Path,
+    snapshot: TreeSnapshot,
+    label: str = "",
+) -> TreeSnapshot:
+    """剥离依赖中ELF共享对象的调试信息，返回更新了文件大小之后的快照。没有可用的工具时所有文件保持不变"""
+    from ..cache import ContentCache
+    from ..stripping import (
+        find_strip_tool,
+        is_shared_object_name,
+        strip_tree,
+    )
+
+    msgs = messages()
+    paths = [path for path, _, _ in snapshot.files() if is_shared_object_name(path)]
+    if not paths:
+        return snapshot
+    tool = find_strip_tool()
+    if tool is None:
+        warning(msgs.MSG_STRIP_TOOL_NOT_FOUND)
+        return snapshot
+    info(msgs.MSG_STRIPPING_BINARIES.format(len(paths), tool.name))
+    with report.stage(f"strip_binaries{label}") as record:
+        record.expect(len(paths), sum(snapshot.size(path) for path in paths))
+        stats, sizes, failures = strip_tree(
+            target_dir,
+            paths,
+            tool,
+            ContentCache(APP_STRIP_CACHE_DIR),
+            cancelled=plan.cancelled,
+            progress=record.advance,
+        )
+        record.add(files=stats.files, bytes=stats.bytes_before)
+        record.extra["bytes_saved"] = stats.bytes_saved
+    for path, reason in sorted(failures.items()):
+        warning(msgs.MSG_STRIP_FILE_SKIPPED.format(path, reason))
+    info(
+        msgs.MSG_STRIP_DONE.format(
+            stats.files - stats.kept_files,
+            stats.cached_files,
+            stats.bytes_before,
+            stats.bytes_after,
+            stats.bytes_saved,
+        )
+    )
+    return snapshot.with_sizes(sizes)
+
+
+def stage_dependencies(plan: BuildPlan, report: BuildReport) -> Optional[TreeSnapshot]:
+    """
+    将依赖安装（并清理）到单独的依赖目录（plan.dependency_dir）中，返回依赖目录的快照，没有依赖时返回None。
+    该阶段不访问dist_proj_dir，因此可以与拷贝源文件等阶段同时进行，之后由merge_dependencies()合并。
+    """
+    requirements = plan.requirements_file()
+    if requirements is None:
+        return None
+    shutil.rmtree(plan.dependency_dir, ignore_errors=True)
+    return _install_dependencies(plan, report, requirements, plan.dependency_dir)
+
+
+def merge_dependencies(
+    plan: BuildPlan,
+    report: BuildReport,
+    snapshot: TreeSnapshot,
+    dependencies: Optional[TreeSnapshot],
+) -> TreeSnapshot:
+    """
+    把依赖目录中的顶层条目移动（重命名，不拷贝数据）到dist_proj_dir中。snapshot为dist_proj_dir的快照，
+    dependencies为stage_dependencies()返回的快照，返回合并之后dist_proj_dir的快照。
+    与pip install --target到已有目录时一样，dist_proj_dir中已存在的顶层条目（源文件）不会被替换。
+    """
+    if dependencies is None:
+        return snapshot
+    msgs = messages()
+    dependency_dir = plan.dependency_dir
+    skipped = []
+    with report.stage("merge_dependencies") as record:
+        for name in dependencies.top_level():
+            if name in snapshot:
+                skipped.append(name)
+                continue
+            os.replace(dependency_dir / name, plan.dist_proj_dir / name)
+        shutil.rmtree(dependency_dir, ignore_errors=True)
+        try:
+            dependency_dir.parent.rmdir()
+        except OSError:
+            pass
+        dependencies = dependencies.without(skipped).rebase(plan.dist_proj_dir)
+        record.add(*dependencies.totals())
+    for name in skipped:
+        warning(msgs.MSG_DEPENDENCY_CONFLICT.format(name))
+    return snapshot.merge(dependencies)
+
+
+def stage_dependency_layer(plan: BuildPlan, report: BuildReport) -> List[str]:
+    """
+    将依赖安装并打包为独立的依赖层，而不是安装到dist_proj_dir中。依赖层按requirements文件的内容等
+    缓存在APP_LAYERS_DIR中，缓存命中时跳过pip install与打包。
+    依赖层最终被放到layers_dir中，与压缩包一起分发。返回依赖层的文件名（同时记录在plan.layers中）。
+    """
+    from ..layers import LayerCache, layer_key, build_layer, install_layer
+
+    requirements = plan.requirements_file()
+    if requirements is None:
+        plan.layers = []
+        return plan.layers
+    msgs = messages()
+    cache = LayerCache(APP_LAYERS_DIR)
+    key = layer_key(
+        requirements,
+        plan.host_py,
+        [
+            plan.pip_index_url,
+            str(plan.cleanup_dependencies),
+            str(plan.compressed),
+            str(plan.strip_binaries),
+        ],
+    )
+    layer = cache.lookup(key)
+    if layer is not None:
+        info(msgs.MSG_LAYER_CACHE_HIT.format(layer.name))
+    else:
+        site_dir = plan.layer_site_dir
+        shutil.rmtree(site_dir, ignore_errors=True)
+        tmp_layer = APP_LAYERS_DIR / f"{key}.tmp"
+        try:
+            snapshot = _install_dependencies(plan, report, requirements, site_dir)
+            with report.stage("build_layer") as record:
+                APP_LAYERS_DIR.mkdir(parents=True, exist_ok=True)
+                record.expect(*snapshot.totals())
+                files, total_bytes = build_layer(
+                    site_dir,
+                    tmp_layer,
+                    compressed=plan.compressed,
+                    snapshot=snapshot,
+                    cancelled=plan.cancelled,
+                    progress=record.advance,
+                )
+                layer = cache.store(key, tmp_layer)
+                record.add(files=files, bytes=total_bytes)
+        finally:
+            # 打包失败（或被取消）时不留下不完整的依赖层
+            tmp_layer.unlink(missing_ok=True)
+            shutil.rmtree(site_dir, ignore_errors=True)
+        info(msgs.MSG_LAYER_CREATED.format(layer.name))
+    with report.stage("install_layer"):
+        installed = install_layer(layer, plan.layers_dir)
+    info(msgs.MSG_LAYER_INSTALLED.format(installed.as_posix()))
+    plan.layers = [layer.name]
+    return plan.layers
+
+
+def build_variant(
+    plan: BuildPlan,
+    variant: TargetVariant,
+    filter: Callable[[Path], bool],
+    report: BuildReport,
+    snapshot: TreeSnapshot,
+    stale: Optional[Iterable[str]] = None,
+    staging_dir: Optional[Path] = None,
+    suffix: str = "",
+    chunk_size: Optional[int] = None,
+) -> Path:
+    msgs = messages()
+    target = plan.target_file(variant, suffix)
+    staging_dir = staging_dir or plan.dist_proj_dir
+    info(msgs.MSG_CREATING_ZIPAPP.format(target.name))
+    with report.stage(f"create_archive:{target.name}") as record:
+        stats = _build_variant(
+            plan,
+            variant,
+            target,
+            filter,
+            snapshot,
+            stale,
+            record,
+            staging_dir,
+            chunk_size,
+        )
+    if stats.zip64:
+        warning(msgs.MSG_ZIP64_ARCHIVE.format(target.name))
+    return target
+
+
+def _build_variant(
+    plan: BuildPlan,
+    variant: TargetVariant,
+    target: Path,
+    filter: Callable[[Path], bool],
+    snapshot: TreeSnapshot,
+    stale: Optional[Iterable[str]],
+    record: StageRecord,
+    staging_dir: Path,
+    chunk_size: Optional[int],
+):
+    from ..archive import create_archive, DEFAULT_CHUNK_SIZE
+    from ..layers import bootstrap_module
+    from ..selfextracting import create_startup_script
+    from ..telemetry import telemetry_module
+
+    msgs = messages()
+    entry = variant.entry
+    extra_files = {}
+    main_prologue = ""
+    telemetry_script = ""
+    if plan.telemetry:
+        telemetry_name, telemetry_content, telemetry_prologue = telemetry_module()
+        if variant.self_extract:
+            # 由启动脚本在运行解压出的程序时启用，解压耗时也一并记录
+            extra_files[telemetry_name] = telemetry_content
+            telemetry_script = telemetry_name
+        elif entry or plan.commands:
+            extra_files[telemetry_name] = telemetry_content
+            main_prologue += telemetry_prologue
+        else:
+            # 源目录中自带__main__.py，无法插入启用遥测的代码
+            warning(msgs.MSG_TELEMETRY_NOT_EMBEDDED.format(target.name))
+    if plan.layers:
+        if variant.self_extract:
+            raise ValueError(
+                "dependency layers are not supported by self-extracting targets"
+            )
+        bootstrap_name, bootstrap_content, layers_prologue = bootstrap_module(
+            plan.layers
+        )
+        extra_files[bootstrap_name] = bootstrap_content
+        main_prologue += layers_prologue
+    if variant.self_extract:
+        script_name, script_content = create_startup_script(
+            staging_dir, entry, telemetry_script
+        )
+        extra_files[script_name] = script_content
+        entry = f"{Path(script_name).stem}:main"
+
+    if record.progress is not None:
+        # 需要对每个文件调用filter，只在需要显示进度时才计算
+        record.expect(*snapshot.totals(lambda path: filter(Path(path))))
+    stats = create_archive(
+        source=staging_dir,
+        target=target,
+        interpreter=variant.shebang,
+        main=entry,
+        compressed=variant.compressed,
+        filter=filter,
+        previous=target if stale is not None else None,
+        stale=stale or (),
+        extra_files=extra_files,
+        snapshot=snapshot,
+        main_prologue=main_prologue,
+        commands=plan.commands if not variant.self_extract else None,
+        chunk_size=chunk_size or DEFAULT_CHUNK_SIZE,
+        cancelled=plan.cancelled,
+        progress=record.advance,
+    )
+    record.add(files=stats.entries, bytes=stats.file_size)
+    record.extra.update(
+        compress_size=stats.compress_size,
+        archive_size=stats.archive_size,
+        reused_entries=stats.reused_entries,
+        zip64=stats.zip64,
+    )
+    return stats
+
+
+def stage_archive(
+    plan: BuildPlan,
+    report: BuildReport,
+    snapshot: Optional[TreeSnapshot] = None,
+    stale: Optional[Iterable[str]] = None,
+    staging_dir: Optional[Path] = None,
+    suffix: str = "",
+    memory_limit: Optional[int] = None,
+) -> List[Tuple[TargetVariant, Union[Path, Exception]]]:
+    """
+    为每一个打包目标创建压缩包。所有目标共享同一个暂存目录（默认为dist_proj_dir）及其快照，并行打包。
+    若未提供暂存目录的快照，则先扫描暂存目录。
+    若指定了stale，则以上一次构建生成的压缩包为基础进行增量打包。
+    若指定了suffix，则压缩包的文件名带有该后缀（用于依赖矩阵）。
+    memory_limit为打包可使用的内存上限（字节，默认为plan.memory_limit），它决定了同时打包的目标数量
+    以及每次读取的字节数。
+
+    返回每个目标对应的压缩包路径，若某个目标打包失败，则对应的值为异常对象。
+    构建被取消时抛出OperationCancelled（已生成的压缩包保持不变）。
+    """
+    variants = plan.variants()
+    staging_dir = staging_dir or plan.dist_proj_dir
+    label = f":{suffix}" if suffix else ""
+    if snapshot is None:
+        snapshot = capture_snapshot(
+            report, f"staging{label}", staging_dir, cancelled=plan.cancelled
+        )
+    with report.stage(f"packaging_filter{label}"):
+        filter = packaging_filter(
+            plan.exclude_from_packaging, staging_dir, snapshot=snapshot
+        )
+    if stale is not None:
+        stale = set(stale)
+
+    from ..archive import plan_memory
+
+    if memory_limit is None:
+        memory_limit = plan.memory_limit
+    writers, chunk_size = plan_memory(
+        memory_limit, min(len(variants), os.cpu_count() or 1)
+    )
+
+    def _build(variant: TargetVariant) -> Path:
+        return build_variant(
+            plan,
+            variant,
+            filter,
+            report,
+            snapshot,
+            stale,
+            staging_dir,
+            suffix,
+            chunk_size,
+        )
+
+    if len(variants) == 1:
+        try:
+            return [(variants[0], _build(variants[0]))]
+        except OperationCancelled:
+            raise
+        except Exception as e:
+            return [(variants[0], e)]
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    results = []
+    with ThreadPoolExecutor(max_workers=writers) as executor:
+        futures = [(variant, executor.submit(_build, variant)) for variant in variants]
+        for variant, future in futures:
+            try:
+                results.append((variant, future.result()))
+            except Exception as e:
+                results.append((variant, e))
+    _raise_if_cancelled(results)
+    return results
+
+
+def _raise_if_cancelled(results: List[Tuple[TargetVariant, Union[Path, Exception]]]):
+    # 并行打包时，被取消的任务的异常保存在结果中，这里统一抛出，而不是当作普通的打包失败
+    for _, result in results:
+        if isinstance(result, OperationCancelled):
+            raise result
+
+
+def _preflight_matrix_target(plan: BuildPlan, target: "MatrixTarget") -> List[str]:
+    from ..platforms import check_wheelhouse
+
+    requirements = plan.requirements_file()
+    if requirements is None:
+        return []
+    if target.wheelhouse:
+        return check_wheelhouse(target, requirements)
+    ok, output = pip_dry_run(
+        plan.host_py, requirements, plan.pip_index_url, target.pip_args()
+    )
+    return [] if ok else [output or "pip install --dry-run failed"]
+
+
+def preflight_matrix(plan: BuildPlan, report: BuildReport) -> List[str]:
+    """
+    在安装依赖之前并行检查依赖矩阵中的每个目标平台：若指定了wheelhouse，则根据wheel文件名中的标签
+    检查兼容性；否则以--dry-run方式执行pip install（只解析依赖）。返回发现的问题（带目标平台后缀）。
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    problems = []
+    with report.stage("preflight_matrix"):
+        max_workers = min(len(plan.matrix), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                (target, executor.submit(_preflight_matrix_target, plan, target))
+                for target in plan.matrix
+            ]
+            for target, future in futures:
+                problems.extend(f"[{target.suffix}] {p}" for p in future.result())
+    return problems
+
+
+def _stage_matrix_target(
+    plan: BuildPlan,
+    report: BuildReport,
+    snapshot: TreeSnapshot,
+    target: "MatrixTarget",
+    memory_limit: int,
+) -> List[Tuple[TargetVariant, Union[Path, Exception]]]:
+    msgs = messages()
+    staging_dir = plan.matrix_staging_dir(target)
+    info(msgs.MSG_MATRIX_TARGET_STAGING.format(target.suffix, staging_dir.as_posix()))
+    try:
+        with report.stage(f"copy_staging:{target.suffix}") as record:
+            _stage_tree(plan, record, plan.dist_proj_dir, staging_dir, [], snapshot)
+        staging_snapshot = snapshot.rebase(staging_dir)
+        requirements = plan.requirements_file()
+        if requirements is not None:
+            staging_snapshot = _install_dependencies(
+                plan, report, requirements, staging_dir, matrix_target=target
+            )
+    except OperationCancelled:
+        raise
+    except Exception as e:
+        failure = RuntimeError(f"[{target.suffix}] {e}")
+        failure.__cause__ = e
+        return [(variant, failure) for variant in plan.variants()]
+    return stage_archive(
+        plan,
+        report,
+        staging_snapshot,
+        staging_dir=staging_dir,
+        suffix=target.suffix,
+        memory_limit=memory_limit,
+    )
+
+
+def stage_matrix(
+    plan: BuildPlan, report: BuildReport, snapshot: TreeSnapshot
+) -> List[Tuple[TargetVariant, Union[Path, Exception]]]:
+    """
+    依赖矩阵构建：源文件只拷贝（到dist_proj_dir）一次，然后为每个目标平台并行地准备暂存目录、
+    安装依赖并打包，生成带有目标平台后缀的压缩包。snapshot为dist_proj_dir（尚未安装依赖）的快照。
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from ..archive import writer_memory, MIN_CHUNK_SIZE
+
+    results = []
+    max_workers = min(len(plan.matrix), os.cpu_count() or 1)
+    if plan.memory_limit > 0:
+        max_workers = max(
+            1, min(max_workers, plan.memory_limit // writer_memory(MIN_CHUNK_SIZE))
+        )
+    # 同时处理的目标平台平分内存上限
+    memory_limit = plan.memory_limit // max_workers
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                _stage_matrix_target, plan, report, snapshot, target, memory_limit
+            )
+            for target in plan.matrix
+        ]
+        for future in futures:
+            try:
+                results.extend(future.result())
+            except OperationCancelled as e:
+                # 等待其余目标平台（它们也会在下一个检查点停止）结束之后再抛出
+                results.append((None, e))
+    _raise_if_cancelled(results)
+    return results
+
+
+def analyze_target(
+    plan: BuildPlan, target: Path, report: BuildReport
+) -> Tuple["ArchiveAnalysis", Optional[dict]]:
+    """
+    分析生成的压缩包，并将结果保存为`<target>.analysis.json`。
+    同时返回上一次构建保存的分析结果（若存在），以便比较两次构建之间的差异。
+    """
+    from ..analysis import ArchiveAnalysis, load_analysis
+
+    analysis_file = plan.analysis_file(target)
+    with report.stage(f"analyze_archive:{target.name}") as record:
+        previous = load_analysis(analysis_file)
+        analysis = ArchiveAnalysis.analyze(target)
+        total = analysis.total
+        record.add(files=total.files, bytes=total.compressed_size)
+        analysis.write_json(analysis_file)
+    return analysis, previous
+
+
+def smoke_test_target(
+    plan: BuildPlan, target: Path, report: BuildReport
+) -> "SmokeTestResult":
+    """
+    用宿主Python解释器运行生成的压缩包（参数为plan.smoke_test_args），并将结果保存为`<target>.smoketest.json`。
+    """
+    from ..smoketest import run_smoke_test
+
+    with report.stage(f"smoke_test:{target.name}") as record:
+        result = run_smoke_test(
+            plan.host_py,
+            target,
+            plan.smoke_test_args,
+            plan.smoke_test_timeout,
+            budget=plan.smoke_test_budget,
+            cancelled=plan.cancelled,
+        )
+        record.extra.update(
+            exit_code=result.exit_code,
+            elapsed=result.elapsed,
+            peak_rss=result.peak_rss,
+            passed=result.passed,
+        )
+        result.write_json(plan.smoke_test_file(target))
+    return result
+
+
+def sync_source_changes(plan: BuildPlan, changes: SourceChanges, report: BuildReport):
+    """把源目录中发生变化的文件同步到dist_proj_dir中，而不是重新拷贝整个源目录"""
+    with report.stage("sync_source_changes") as record:
+        _sync_source_changes(plan, changes, record)
+
+
+def _sync_source_changes(plan: BuildPlan, changes: SourceChanges, record: StageRecord):
+    msgs = messages()
+    source_dir = Path(os.path.normpath(plan.source))
+    dist_proj_dir = plan.dist_proj_dir
+    stager = Stager(plan.staging)
+    record.expect(files=len(changes.changed))
+    for rel_path in sorted(changes.removed):
+        dist_file = dist_proj_dir / rel_path
+        if dist_file.is_file():
+            dist_file.unlink()
+            info(msgs.MSG_REMOVING.format(dist_file.as_posix()))
+    for rel_path in sorted(changes.changed):
+        check_cancelled(plan.cancelled)
+        src_file = source_dir / rel_path
+        dist_file = dist_proj_dir / rel_path
+        if not src_file.is_file():
+            continue
+        dist_file.parent.mkdir(parents=True, exist_ok=True)
+        # 先删除旧文件再重新暂存，而不是原地覆盖：旧文件可能是源文件的硬链接
+        dist_file.unlink(missing_ok=True)
+        size = src_file.stat().st_size
+        stager.stage(src_file, dist_file, size)
+        record.add(files=1, bytes=size)
+        record.advance(files=1, bytes=size)
+
+
+def write_build_report(plan: BuildPlan, report: BuildReport) -> List[Path]:
+    report.metadata.update(
+        source=plan.source.as_posix(),
+        targets=[plan.target_file(v).as_posix() for v in plan.variants()],
+        python=sys.version,
+        platform=sys.platform,
+    )
+    written = []
+    if plan.build_report:
+        report.write_json(plan.report_file())
+        written.append(plan.report_file())
+    if plan.chrome_trace:
+        report.write_chrome_trace(plan.trace_file())
+        written.append(plan.trace_file())
+    return written
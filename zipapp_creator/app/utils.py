@@ -1,3 +1,4 @@
+import contextlib
 import os
 import re
 import shlex
@@ -8,11 +9,26 @@ import sys
 import threading
 import time
 from pathlib import Path
-from typing import Literal, Union, List, Set
+from typing import Callable, Iterator, Literal, Union, List, Set, Tuple, Optional
 
-from pyguiadapterlite import uprint, is_function_cancelled
+from pyguiadapterlite import (
+    uprint,
+    is_function_cancelled,
+    start_progressbar,
+    update_progressbar,
+    stop_progressbar,
+)
 
+from zipapp_creator.cancellation import OperationCancelled, check_cancelled
 from zipapp_creator.messages import messages
+from zipapp_creator.progress import (
+    ProgressCallback,
+    ProgressEvent,
+    ProgressListener,
+    StatusLinePrinter,
+)
+from zipapp_creator.snapshot import TreeSnapshot
+from zipapp_creator.staging import Stager, PARALLEL_COPY_THRESHOLD
 
 _MSG_LABEL_INFO = "INFO".ljust(7)
 _MSG_LABEL_ERROR = "ERROR".ljust(7)
@@ -22,24 +38,94 @@ _MSG_LABEL_SUCCESS = "SUCCESS".ljust(7)
 _ENTRY_POINT_REGEX = re.compile(r"^([a-zA-Z0-9_]+\.)*([a-zA-Z0-9_]+)(:[a-zA-Z0-9_]+)?$")
 
 
-class CanceledByUser(RuntimeError):
+# 同时执行的阶段（例如拷贝源文件与安装依赖）都会输出信息：输出逐次加锁，并可以为每一行加上阶段名作为前缀
+_output_lock = threading.Lock()
+_output_local = threading.local()
+
+
+class CanceledByUser(OperationCancelled):
     pass
 
 
+@contextlib.contextmanager
+def output_prefix(prefix: str) -> Iterator[None]:
+    """在当前线程中为info()等函数以及pip的输出的每一行加上前缀（例如"[dependencies] "）"""
+    previous = current_output_prefix()
+    _output_local.prefix = prefix
+    try:
+        yield
+    finally:
+        _output_local.prefix = previous
+
+
+def current_output_prefix() -> str:
+    return getattr(_output_local, "prefix", "")
+
+
+def _print(msg: str = "", end="\n", prefix: Optional[str] = None):
+    if prefix is None:
+        prefix = current_output_prefix()
+    if prefix and msg:
+        msg = "\n".join(prefix + line if line else line for line in msg.split("\n"))
+    with _output_lock:
+        uprint(msg, end=end)
+
+
 def info(msg: str, end="\n"):
-    uprint(f"\033[1m{_MSG_LABEL_INFO} {msg}\033[0m", end=end)
+    _print(f"\033[1m{_MSG_LABEL_INFO} {msg}\033[0m", end=end)
 
 
 def error(msg: str, end="\n"):
-    uprint(f"\033[1m\033[31m{_MSG_LABEL_ERROR} {msg}\033[0m", end=end)
+    _print(f"\033[1m\033[31m{_MSG_LABEL_ERROR} {msg}\033[0m", end=end)
 
 
 def warning(msg: str, end="\n"):
-    uprint(f"\033[1m\033[33m{_MSG_LABEL_WARNING} {msg}\033[0m", end=end)
+    _print(f"\033[1m\033[33m{_MSG_LABEL_WARNING} {msg}\033[0m", end=end)
 
 
 def success(msg: str, end="\n"):
-    uprint(f"\033[1m\033[32m{_MSG_LABEL_SUCCESS} {msg}\033[0m", end=end)
+    _print(f"\033[1m\033[32m{_MSG_LABEL_SUCCESS} {msg}\033[0m", end=end)
+
+
+class ProgressBar(object):
+    """
+    在执行窗口的进度条中显示进度事件（进度条显示最近一次更新的阶段）。
+    没有执行窗口时（例如在脚本中直接调用）退回到在标准错误输出中显示状态行。
+    """
+
+    RESOLUTION = 1000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = False
+        self._fallback: Optional[ProgressListener] = None
+
+    def __call__(self, event: ProgressEvent):
+        with self._lock:
+            if self._fallback is None:
+                try:
+                    self._update(event)
+                    return
+                except RuntimeError:
+                    # fn execute_window is not set
+                    self._fallback = StatusLinePrinter()
+        self._fallback(event)
+
+    def _update(self, event: ProgressEvent):
+        value = int((event.fraction or 0) * self.RESOLUTION)
+        if not self._started:
+            start_progressbar(
+                self.RESOLUTION, initial_value=value, initial_msg=event.format()
+            )
+            self._started = True
+        else:
+            update_progressbar(value, event.format())
+
+    def close(self):
+        with self._lock:
+            if self._started:
+                stop_progressbar(hide_after_stop=True)
+                self._started = False
 
 
 def terminate_process(process: subprocess.Popen):
@@ -60,19 +146,21 @@ def read_process_output(process: subprocess.Popen) -> bool:
     cancelled = False
 
     lock = threading.Lock()
+    # 输出在另一个线程中读取，使用调用者线程的前缀
+    prefix = current_output_prefix()
 
     def do_read():
         nonlocal cancelled
-        uprint()
+        _print(prefix=prefix)
         while process.poll() is None:
             with lock:
                 if cancelled:
                     break
             line = process.stdout.readline()
             if line:
-                uprint(line, end="")
+                _print(line, end="", prefix=prefix)
             time.sleep(0.01)
-        uprint()
+        _print(prefix=prefix)
 
     read_thread = threading.Thread(target=do_read, daemon=True)
     read_thread.start()
@@ -92,6 +180,7 @@ def pip_install(
     requirements: Union[str, Path],
     target_dir: Union[str, Path],
     index_url: str = None,
+    extra_args: Optional[List[str]] = None,
 ):
     msgs = messages()
     cmd = [
@@ -106,11 +195,12 @@ def pip_install(
     ]
     if index_url:
         cmd.extend(["--index-url", index_url])
+    cmd.extend(extra_args or [])
     info(msgs.MSG_START_PIP_INSTALL)
 
-    uprint()
-    uprint(shlex.join(cmd))
-    uprint()
+    _print()
+    _print(shlex.join(cmd))
+    _print()
 
     process = subprocess.Popen(
         cmd,
@@ -123,55 +213,219 @@ def pip_install(
         raise CanceledByUser(msgs.MSG_PIP_INSTALL_CANCELLED)
 
     if process.returncode != 0:
-        uprint(process.stdout.read())
+        _print(process.stdout.read())
         raise RuntimeError(f"non-zero exit code from pip install: {process.returncode}")
 
     success(msgs.MSG_PIP_INSTALL_SUCCESS)
 
 
-def cleanup_dependency(target_dir: Union[str, Path]):
+def pip_dry_run(
+    py: Union[str, Path],
+    requirements: Union[str, Path],
+    index_url: str = None,
+    extra_args: Optional[List[str]] = None,
+) -> Tuple[bool, str]:
+    """
+    以--dry-run方式执行pip install，只解析依赖而不安装，返回(是否成功, pip的输出)。
+    用于在真正安装之前快速发现没有兼容wheel的依赖。
+    """
+    cmd = [
+        str(py),
+        "-m",
+        "pip",
+        "install",
+        "--dry-run",
+        "--ignore-installed",
+        "--quiet",
+        "-r",
+        Path(requirements).as_posix(),
+    ]
+    if index_url:
+        cmd.extend(["--index-url", index_url])
+    cmd.extend(extra_args or [])
+    process = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        universal_newlines=True,
+    )
+    while True:
+        try:
+            output, _ = process.communicate(timeout=0.1)
+            break
+        except subprocess.TimeoutExpired:
+            if is_function_cancelled():
+                terminate_process(process)
+                raise CanceledByUser(messages().MSG_PIP_INSTALL_CANCELLED)
+    return process.returncode == 0, output.strip()
+
+
+def dependency_garbage(snapshot: TreeSnapshot) -> List[str]:
+    """
+    找出依赖中不必要的文件（目录）：顶层的.dist-info目录、__pycache__目录以及.pyc文件。
+    已被包含在其他待删除目录中的条目不会重复列出。
+    """
+    garbage = []
+    # 快照按先序遍历存储，被删除目录下的条目总是紧跟在该目录之后
+    skipped_dir = None
+    for path, is_dir in snapshot.entries():
+        if skipped_dir is not None and path.startswith(skipped_dir):
+            continue
+        skipped_dir = None
+        name = path.rsplit("/", 1)[-1]
+        if is_dir and (
+            (name.endswith(".dist-info") and "/" not in path) or name == "__pycache__"
+        ):
+            garbage.append(path)
+            skipped_dir = path + "/"
+        elif not is_dir and name.endswith(".pyc"):
+            garbage.append(path)
+    return garbage
+
+
+def cleanup_dependency(
+    target_dir: Union[str, Path],
+    snapshot: Optional[TreeSnapshot] = None,
+    cancelled: Optional[Callable[[], bool]] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> List[str]:
+    """
+    清理依赖中不必要的文件，返回被删除的文件（目录）的相对路径。
+    若提供了target_dir的快照，则直接根据快照确定需要删除的文件，无需遍历目录。
+    每删除一个条目检查一次cancelled，已请求取消时抛出OperationCancelled，并通过progress报告进度。
+    """
     target_dir = Path(target_dir)
     msgs = messages()
     info(msgs.MSG_CLEANUP_DEPENDENCIES)
+    if snapshot is None:
+        snapshot = TreeSnapshot.capture(target_dir, cancelled=cancelled)
+
+    removed = []
+    for rel_path in dependency_garbage(snapshot):
+        check_cancelled(cancelled)
+        path = target_dir / rel_path
+        try:
+            if snapshot.is_dir(rel_path):
+                shutil.rmtree(path)
+            else:
+                path.unlink()
+        except FileNotFoundError:
+            continue
+        removed.append(rel_path)
+        info(msgs.MSG_REMOVING.format(path.as_posix()))
+        if progress is not None:
+            progress(1, 0)
 
-    # 删除所有 .dist-info 目录
-    for dist_info in target_dir.glob("*.dist-info"):
-        if dist_info.is_dir():
-            shutil.rmtree(dist_info)
-            info(msgs.MSG_REMOVING.format(dist_info.as_posix()))
+    success(msgs.MSG_CLEANUP_DEPENDENCIES_DONE)
+    return removed
 
-    # 删除所有 __pycache__ 目录
-    for pycache in target_dir.rglob("__pycache__"):
-        if pycache.is_dir():
-            shutil.rmtree(pycache)
-            info(msgs.MSG_REMOVING.format(pycache.as_posix()))
 
-    # 删除所有 .pyc 文件
-    for pyc_file in target_dir.rglob("*.pyc"):
-        pyc_file.unlink()
-        info(msgs.MSG_REMOVING.format(pyc_file.as_posix()))
+def default_copy_workers() -> int:
+    """并行拷贝的默认线程数。拷贝主要在等待I/O，与ThreadPoolExecutor的默认值一样不受CPU数量的限制"""
+    return min(32, (os.cpu_count() or 1) + 4)
 
-    success(msgs.MSG_CLEANUP_DEPENDENCIES_DONE)
+
+def _run_in_threads(
+    func: Callable[[str], None],
+    items: List[str],
+    workers: int,
+    cancelled: Optional[Callable[[], bool]] = None,
+):
+    """
+    在线程池中对每一项调用func。同时提交的任务数量有上限，等待期间定期检查cancelled，
+    任意一项失败（或已请求取消）时取消尚未开始的任务并抛出异常。
+    """
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+    def _reap(pending):
+        check_cancelled(cancelled)
+        done, pending = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
+        for future in done:
+            future.result()
+        return pending
+
+    max_pending = workers * 4
+    pending = set()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        try:
+            for item in items:
+                while len(pending) >= max_pending:
+                    pending = _reap(pending)
+                pending.add(executor.submit(func, item))
+            while pending:
+                pending = _reap(pending)
+        finally:
+            for future in pending:
+                future.cancel()
 
 
 def copy_source_tree(
-    source_dir: Union[str, Path], dist_dir: Union[str, Path], ignore_patterns: List[str]
-):
+    source_dir: Union[str, Path],
+    dist_dir: Union[str, Path],
+    ignore_patterns: List[str],
+    snapshot: Optional[TreeSnapshot] = None,
+    cancelled: Optional[Callable[[], bool]] = None,
+    progress: Optional[ProgressCallback] = None,
+    stager: Optional[Stager] = None,
+    workers: int = 1,
+) -> Tuple[int, int]:
+    """
+    拷贝源目录，返回拷贝的文件数量与字节数。
+    文件按stager的暂存策略放入dist_dir（默认为auto：支持时使用reflink，否则拷贝），
+    stager.counts记录了每种方式暂存的文件数量。
+    snapshot为源目录（已应用ignore_patterns）的快照，若未提供则先扫描源目录。
+    先一次性创建所有目录，再拷贝文件：workers大于1（0表示default_copy_workers()）且文件足够多时，
+    文件在线程池中并行拷贝，源目录位于NFS、SMB等高延迟的文件系统上时可以大幅缩短拷贝时间。
+    每拷贝一个文件（大文件每拷贝一块）检查一次cancelled，已请求取消时抛出OperationCancelled，
+    此时dist_dir中只有部分文件（dist_dir在每次构建时都会被重新创建）。
+    progress（若指定）以(文件数量, 字节数)的增量报告拷贝进度。
+    """
     source_dir = os.path.normpath(Path(source_dir).absolute().as_posix())
     dist_dir = os.path.normpath(Path(dist_dir).absolute().as_posix())
 
+    if snapshot is None:
+        snapshot = TreeSnapshot.capture(source_dir, ignore_patterns, cancelled)
+    if stager is None:
+        stager = Stager()
+
     if os.path.isdir(dist_dir):
         shutil.rmtree(dist_dir, ignore_errors=True)
 
     if not os.path.isdir(dist_dir):
         os.makedirs(dist_dir, exist_ok=True)
 
-    shutil.copytree(
-        source_dir,
-        dist_dir,
-        ignore=shutil.ignore_patterns(*ignore_patterns),
-        dirs_exist_ok=True,
-    )
+    files = []
+    total_bytes = 0
+    dirs = []
+    # 先序遍历保证父目录总是先于子目录创建，拷贝文件时不必再检查目录是否存在
+    for rel_path, is_dir in snapshot.entries():
+        if is_dir:
+            check_cancelled(cancelled)
+            dst = os.path.join(dist_dir, rel_path)
+            os.makedirs(dst, exist_ok=True)
+            dirs.append((os.path.join(source_dir, rel_path), dst))
+        else:
+            files.append(rel_path)
+            total_bytes += snapshot.size(rel_path)
+
+    def _copy(rel_path: str):
+        src = os.path.join(source_dir, rel_path)
+        dst = os.path.join(dist_dir, rel_path)
+        stager.stage(src, dst, snapshot.size(rel_path), cancelled, progress)
+        if progress is not None:
+            progress(1, 0)
+
+    workers = workers or default_copy_workers()
+    if workers > 1 and len(files) >= PARALLEL_COPY_THRESHOLD:
+        _run_in_threads(_copy, files, workers, cancelled)
+    else:
+        for rel_path in files:
+            check_cancelled(cancelled)
+            _copy(rel_path)
+    # 与shutil.copytree()一样，在目录中的内容拷贝完成后再拷贝目录的元数据
+    for src, dst in reversed(dirs):
+        shutil.copystat(src, dst)
+    return len(files), total_bytes
 
 
 def ignored_files(
@@ -179,11 +433,19 @@ def ignored_files(
     patterns: List[str],
     path_type: Literal["Path", "absolute", "relative"] = "Path",
     posix: bool = True,
+    snapshot: Optional[TreeSnapshot] = None,
 ) -> Set[Path]:
+    """
+    找出start_dir中与patterns（Path.rglob()语义）匹配的所有条目。
+    若提供了start_dir的快照，则在快照中进行匹配，不再为每个pattern遍历一次目录。
+    """
     start_dir = Path(start_dir)
     ignored = set()
     for pattern in patterns:
-        selected = start_dir.rglob(pattern)
+        if snapshot is not None:
+            selected = (start_dir / p for p in snapshot.glob(pattern))
+        else:
+            selected = start_dir.rglob(pattern)
         if path_type == "Path":
             ignored.update(selected)
         elif path_type == "absolute":
@@ -0,0 +1,93 @@
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
+
+from ..snapshot import TreeSnapshot
+
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_DEBOUNCE = 0.5
+
+
+class SourceChanges(object):
+    def __init__(self, changed: Set[str], removed: Set[str]):
+        self.changed = changed
+        self.removed = removed
+
+    def __bool__(self):
+        return bool(self.changed or self.removed)
+
+    def __len__(self):
+        return len(self.changed) + len(self.removed)
+
+    def merge(self, other: "SourceChanges"):
+        self.changed = (self.changed - other.removed) | other.changed
+        self.removed = (self.removed - other.changed) | other.removed
+
+
+def _file_state(snapshot: TreeSnapshot) -> Dict[str, Tuple[int, int]]:
+    return {path: (mtime, size) for path, size, mtime in snapshot.files()}
+
+
+def diff_tree(old: TreeSnapshot, new: TreeSnapshot) -> SourceChanges:
+    """比较两个快照中的文件（忽略目录），返回新增/修改与删除的文件"""
+    old_state, new_state = _file_state(old), _file_state(new)
+    changed = {
+        path for path, info in new_state.items() if old_state.get(path, None) != info
+    }
+    removed = set(old_state.keys()) - set(new_state.keys())
+    return SourceChanges(changed, removed)
+
+
+class SourceWatcher(object):
+    """
+    轮询方式监视源目录的变化。检测到变化后，会等待变化平息（debounce）后再返回，
+    以避免编辑器保存、git checkout等批量写入操作触发多次重新构建。
+    """
+
+    def __init__(
+        self,
+        source_dir: Union[str, Path],
+        ignore_patterns: List[str],
+        interval: float = DEFAULT_POLL_INTERVAL,
+        debounce: float = DEFAULT_DEBOUNCE,
+        snapshot: Optional[TreeSnapshot] = None,
+    ):
+        self._source_dir = Path(source_dir)
+        self._ignore_patterns = list(ignore_patterns)
+        self._interval = interval
+        self._debounce = debounce
+        # 可以直接使用构建时拍摄的源目录快照作为初始状态，避免再扫描一次源目录
+        self._state = snapshot if snapshot is not None else self._scan()
+
+    def _scan(self) -> TreeSnapshot:
+        return TreeSnapshot.capture(self._source_dir, self._ignore_patterns)
+
+    def _sleep(self, seconds: float, cancelled: Callable[[], bool]) -> bool:
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            if cancelled():
+                return False
+            time.sleep(min(0.1, max(deadline - time.monotonic(), 0)))
+        return not cancelled()
+
+    def wait_for_changes(
+        self, cancelled: Callable[[], bool]
+    ) -> Optional[SourceChanges]:
+        """阻塞直至源目录发生变化，返回变化的文件集合；若被取消则返回None"""
+        while True:
+            if not self._sleep(self._interval, cancelled):
+                return None
+            new_state = self._scan()
+            changes = diff_tree(self._state, new_state)
+            if not changes:
+                continue
+            # debounce：直到连续两次扫描结果一致，才认为这一批变化已经结束
+            while True:
+                self._state = new_state
+                if not self._sleep(self._debounce, cancelled):
+                    return None
+                new_state = self._scan()
+                more_changes = diff_tree(self._state, new_state)
+                if not more_changes:
+                    return changes
+                changes.merge(more_changes)
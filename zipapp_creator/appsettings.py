@@ -22,6 +22,7 @@ class AppSettings(JsonSettingsBase):
     )
     hdpi_mode = BoolValue2(label=_msgs.MSG_HDPI_MODE_FIELD, default_value=False)
     confirm_exit = BoolValue2(label=_msgs.MSG_CONFIRM_EXIT_FIELD, default_value=False)
+    profile_build = BoolValue2(label=_msgs.MSG_PROFILE_BUILD_FIELD, default_value=False)
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -0,0 +1,427 @@
+import copy
+import dataclasses
+import os
+import stat
+import struct
+import sys
+import zipfile
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Tuple, Union
+
+from .cancellation import check_cancelled
+from .progress import ProgressCallback
+from .snapshot import TreeSnapshot
+
+# 与zipapp模块生成的__main__.py保持一致
+MAIN_TEMPLATE = """\
+# -*- coding: utf-8 -*-
+{prologue}import {module}
+{module}.{fn}()
+"""
+
+# 多入口（busybox风格）压缩包的__main__.py：根据argv[0]（例如指向压缩包的符号链接的名称）
+# 或第一个参数选择要执行的命令
+DISPATCHER_TEMPLATE = """\
+# -*- coding: utf-8 -*-
+# THIS FILE IS AUTOMATICALLY GENERATED BY zipapp-creator
+{prologue}import os
+import sys
+
+COMMANDS = {commands!r}
+DEFAULT = {default!r}
+
+
+def _command_name(path):
+    name = os.path.basename(path)
+    for suffix in (".pyz", ".pyzw", ".py", ".exe"):
+        if name.endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+def _usage():
+    prog = os.path.basename(sys.argv[0])
+    lines = ["usage: %s <command> [args...]" % prog, "", "commands:"]
+    lines.extend("  %s" % name for name in sorted(COMMANDS))
+    return "\\n".join(lines)
+
+
+def _resolve(entry):
+    import importlib
+
+    module, _, attrs = entry.partition(":")
+    target = importlib.import_module(module)
+    for attr in attrs.split("."):
+        target = getattr(target, attr)
+    return target
+
+
+def _dispatch():
+    entry = COMMANDS.get(_command_name(sys.argv[0]), None)
+    if entry is None and len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        name = sys.argv.pop(1)
+        entry = COMMANDS[name]
+        sys.argv[0] = "%s %s" % (sys.argv[0], name)
+    if entry is None:
+        entry = DEFAULT
+    if entry is None:
+        print(_usage(), file=sys.stderr)
+        return 2
+    return _resolve(entry)()
+
+
+sys.exit(_dispatch())
+"""
+
+SHEBANG_ENCODING = "utf-8"
+
+# 拷贝、压缩文件时每次读取的字节数，整个文件不会被一次性读入内存
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+MIN_CHUNK_SIZE = 64 * 1024
+# 每个写入压缩包的线程除读缓冲区之外的内存开销（zlib压缩器的状态、压缩输出等）的估计值
+WRITER_OVERHEAD = 512 * 1024
+# 包含zip64结构的压缩包只能由Python 3.13及以上版本的zipimport加载
+ZIP64_MIN_PYTHON = (3, 13)
+
+
+@dataclasses.dataclass
+class ArchiveStats(object):
+    entries: int = 0
+    reused_entries: int = 0
+    file_size: int = 0
+    compress_size: int = 0
+    archive_size: int = 0
+    # 是否使用了zip64扩展（条目超过65535个，或文件、压缩包超过4GB）
+    zip64: bool = False
+
+
+def _split_entry_point(main: str) -> Tuple[str, str]:
+    mod, sep, fn = main.partition(":")
+    mod_ok = all(part.isidentifier() for part in mod.split("."))
+    fn_ok = all(part.isidentifier() for part in fn.split("."))
+    if not (sep == ":" and mod_ok and fn_ok):
+        raise ValueError(f"invalid entry point: {main}")
+    return mod, fn
+
+
+def main_script_content(main: str, prologue: str = "") -> str:
+    mod, fn = _split_entry_point(main)
+    return MAIN_TEMPLATE.format(module=mod, fn=fn, prologue=prologue)
+
+
+def dispatcher_script_content(
+    commands: Dict[str, str], default: Optional[str] = None, prologue: str = ""
+) -> str:
+    """生成多入口压缩包的__main__.py，commands为命令名 -> 入口（module:fn），default为默认入口"""
+    for entry in [*commands.values(), *([default] if default else [])]:
+        _split_entry_point(entry)
+    return DISPATCHER_TEMPLATE.format(
+        commands=dict(sorted(commands.items())),
+        default=default or None,
+        prologue=prologue,
+    )
+
+
+def writer_memory(chunk_size: int) -> int:
+    """一个写入压缩包的线程大约需要的内存：读缓冲区、与之等量的压缩输出以及压缩器的状态"""
+    return 2 * chunk_size + WRITER_OVERHEAD
+
+
+def plan_memory(memory_limit: int, writers: int) -> Tuple[int, int]:
+    """
+    根据内存上限（字节，0表示不限制）决定同时写入的压缩包数量与每次读取的字节数，返回(writers, chunk_size)。
+    内存上限连一个使用最小缓冲区的写入线程都容纳不下时抛出ValueError。
+    """
+    writers = max(1, writers)
+    if memory_limit <= 0:
+        return writers, DEFAULT_CHUNK_SIZE
+    if memory_limit < writer_memory(MIN_CHUNK_SIZE):
+        raise ValueError(
+            f"memory limit too low: at least {writer_memory(MIN_CHUNK_SIZE)} bytes required"
+        )
+    writers = min(writers, memory_limit // writer_memory(MIN_CHUNK_SIZE))
+    chunk_size = (memory_limit // writers - WRITER_OVERHEAD) // 2
+    # 按MIN_CHUNK_SIZE对齐，且不超过默认值（更大的缓冲区不会更快）
+    chunk_size = chunk_size // MIN_CHUNK_SIZE * MIN_CHUNK_SIZE
+    return writers, max(MIN_CHUNK_SIZE, min(chunk_size, DEFAULT_CHUNK_SIZE))
+
+
+def _write_file(
+    z: zipfile.ZipFile,
+    path: Path,
+    arcname: str,
+    buffer: bytearray,
+    cancelled: Optional[Callable[[], bool]] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> zipfile.ZipInfo:
+    """
+    以固定大小的块将文件写入压缩包，与ZipFile.write()相同，但使用调用者提供的（可复用的）缓冲区，
+    因此内存占用与文件大小无关。文件大小超过4GB时自动使用zip64。每写入一块通过progress报告字节数。
+    """
+    zinfo = zipfile.ZipInfo.from_file(path, arcname)
+    if zinfo.is_dir():
+        z.write(path, arcname)
+        return zinfo
+    zinfo.compress_type = z.compression
+    view = memoryview(buffer)
+    with open(path, "rb") as src, z.open(zinfo, "w") as dst:
+        while True:
+            check_cancelled(cancelled)
+            n = src.readinto(buffer)
+            if not n:
+                break
+            dst.write(view[:n])
+            if progress is not None:
+                progress(0, n)
+    return zinfo
+
+
+# 原样拷贝条目需要直接操作ZipFile的内部状态：start_dir、filelist、NameToInfo与_didModify属性，
+# 以及未公开的本地文件头结构（structFileHeader等常量与ZipInfo.FileHeader()）。已对照CPython 3.10至3.13的
+# zipfile源码确认它们的含义与用法一致（3.13将_strip_extra()改为_Extra.strip()，因此这里自行移除zip64字段），
+# 3.14未在本地验证，依赖下面的属性检查。其他版本或缺少这些属性时，退回到解压后重新写入（结果相同，但更慢）
+_RAW_COPY_VERSIONS = ((3, 10), (3, 14))
+_RAW_COPY_MODULE_ATTRS = ("structFileHeader", "stringFileHeader", "sizeFileHeader")
+_RAW_COPY_ZIPFILE_ATTRS = ("start_dir", "filelist", "NameToInfo", "_didModify")
+_ZIP64_EXTRA_ID = 1
+
+
+def _can_copy_raw(dst: zipfile.ZipFile) -> bool:
+    """是否可以在当前Python版本中将条目原样拷贝到dst中"""
+    low, high = _RAW_COPY_VERSIONS
+    return (
+        low <= sys.version_info[:2] <= high
+        and all(hasattr(zipfile, attr) for attr in _RAW_COPY_MODULE_ATTRS)
+        and hasattr(zipfile.ZipInfo, "FileHeader")
+        and all(hasattr(dst, attr) for attr in _RAW_COPY_ZIPFILE_ATTRS)
+    )
+
+
+def _strip_zip64_extra(extra: bytes) -> bytes:
+    """移除扩展字段中的zip64字段（写入本地文件头时由ZipInfo.FileHeader()按需重新生成），其余字段保持不变"""
+    fields = []
+    i = 0
+    while i + 4 <= len(extra):
+        xid, xlen = struct.unpack("<HH", extra[i : i + 4])
+        if xid != _ZIP64_EXTRA_ID:
+            fields.append(extra[i : i + 4 + xlen])
+        i += 4 + xlen
+    fields.append(extra[i:])
+    return b"".join(fields)
+
+
+def _copy_raw_entry(
+    src_fp,
+    src_info: zipfile.ZipInfo,
+    dst: zipfile.ZipFile,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    cancelled: Optional[Callable[[], bool]] = None,
+) -> zipfile.ZipInfo:
+    """将已压缩的条目原样拷贝到新的压缩包中，跳过解压与重新压缩。调用前必须通过_can_copy_raw()检查"""
+    src_fp.seek(src_info.header_offset)
+    header = struct.unpack(
+        zipfile.structFileHeader, src_fp.read(zipfile.sizeFileHeader)
+    )
+    if header[0] != zipfile.stringFileHeader:
+        raise zipfile.BadZipFile(f"bad local file header: {src_info.filename}")
+    src_fp.seek(header[10] + header[11], os.SEEK_CUR)
+
+    zinfo = copy.copy(src_info)
+    # 原始数据之后不再跟随data descriptor，大小与CRC直接写入本地文件头
+    zinfo.flag_bits &= ~0x08
+    zinfo.extra = _strip_zip64_extra(zinfo.extra)
+    zip64 = (
+        zinfo.file_size > zipfile.ZIP64_LIMIT
+        or zinfo.compress_size > zipfile.ZIP64_LIMIT
+    )
+
+    dst.fp.seek(dst.start_dir)
+    zinfo.header_offset = dst.fp.tell()
+    dst.fp.write(zinfo.FileHeader(zip64))
+    remaining = zinfo.compress_size
+    while remaining > 0:
+        check_cancelled(cancelled)
+        chunk = src_fp.read(min(remaining, chunk_size))
+        if not chunk:
+            raise zipfile.BadZipFile(f"truncated entry: {src_info.filename}")
+        dst.fp.write(chunk)
+        remaining -= len(chunk)
+    dst.start_dir = dst.fp.tell()
+    dst.filelist.append(zinfo)
+    dst.NameToInfo[zinfo.filename] = zinfo
+    dst._didModify = True
+    return zinfo
+
+
+def _rewrite_entry(
+    src: zipfile.ZipFile,
+    src_info: zipfile.ZipInfo,
+    dst: zipfile.ZipFile,
+    buffer: bytearray,
+    cancelled: Optional[Callable[[], bool]] = None,
+) -> zipfile.ZipInfo:
+    """解压src中的条目并以相同的元数据重新写入dst，只使用zipfile的公开接口"""
+    zinfo = zipfile.ZipInfo(src_info.filename, src_info.date_time)
+    zinfo.external_attr = src_info.external_attr
+    zinfo.compress_type = src_info.compress_type
+    zinfo.file_size = src_info.file_size
+    if src_info.is_dir():
+        dst.writestr(zinfo, b"")
+        return zinfo
+    view = memoryview(buffer)
+    with src.open(src_info) as fsrc, dst.open(zinfo, "w") as fdst:
+        while True:
+            check_cancelled(cancelled)
+            n = fsrc.readinto(buffer)
+            if not n:
+                break
+            fdst.write(view[:n])
+    return zinfo
+
+
+def _copy_entry(
+    src: zipfile.ZipFile,
+    src_info: zipfile.ZipInfo,
+    dst: zipfile.ZipFile,
+    buffer: bytearray,
+    cancelled: Optional[Callable[[], bool]] = None,
+) -> zipfile.ZipInfo:
+    """将src中的条目拷贝到dst中：尽可能原样拷贝已压缩的数据，否则解压后重新写入"""
+    if _can_copy_raw(dst):
+        return _copy_raw_entry(src.fp, src_info, dst, len(buffer), cancelled)
+    return _rewrite_entry(src, src_info, dst, buffer, cancelled)
+
+
+def create_archive(
+    source: Union[str, Path],
+    target: Union[str, Path],
+    interpreter: Optional[str] = None,
+    main: Optional[str] = None,
+    filter: Optional[Callable[[Path], bool]] = None,
+    compressed: bool = False,
+    previous: Optional[Union[str, Path]] = None,
+    stale: Iterable[str] = (),
+    extra_files: Optional[Dict[str, Union[str, bytes]]] = None,
+    snapshot: Optional[TreeSnapshot] = None,
+    main_prologue: str = "",
+    commands: Optional[Dict[str, str]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    cancelled: Optional[Callable[[], bool]] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> ArchiveStats:
+    """
+    创建zipapp压缩包，行为与zipapp.create_archive()一致。
+
+    若指定了previous（上一次构建生成的压缩包），则未在stale中列出的条目将直接从previous中原样拷贝，
+    无需重新读取和压缩源文件。stale中的路径为相对于source的posix路径。
+
+    extra_files中的文件（压缩包内路径 -> 文件内容）不需要存在于source中，将被直接写入压缩包。
+
+    snapshot为source的快照，若未提供则先扫描source。
+
+    main_prologue为插入到生成的__main__.py开头（导入入口模块之前）的代码，此时必须指定main或commands。
+
+    若指定了commands（命令名 -> 入口），则生成的__main__.py根据argv[0]或第一个参数选择要执行的入口，
+    此时main（可选）为默认入口。
+
+    文件以chunk_size大小的块流式写入（或从previous中拷贝），内存占用与文件大小无关。
+    条目超过65535个或文件、压缩包超过4GB时使用zip64扩展。
+
+    每写入一个条目（或一个数据块）检查一次cancelled，已请求取消时抛出OperationCancelled，
+    此时临时文件被删除，target保持不变（不会留下不完整的压缩包）。
+    progress（若指定）以(文件数量, 未压缩的字节数)的增量报告source中的文件的打包进度。
+
+    返回压缩包的统计信息。
+    """
+    source = Path(source)
+    target = Path(target)
+    if not source.is_dir():
+        raise FileNotFoundError(f"source directory not found: {source.as_posix()}")
+
+    if snapshot is None:
+        snapshot = TreeSnapshot.capture(source)
+
+    has_main = snapshot.is_file("__main__.py")
+    if (main or commands) and has_main:
+        raise ValueError("cannot specify entry point if the source has __main__.py")
+    if not (main or commands or has_main):
+        raise ValueError("archive has no entry point")
+    if main_prologue and not (main or commands):
+        raise ValueError("main prologue requires an entry point")
+    if commands:
+        main_py = dispatcher_script_content(commands, main, main_prologue)
+    elif main:
+        main_py = main_script_content(main, main_prologue)
+    else:
+        main_py = None
+
+    compression = zipfile.ZIP_DEFLATED if compressed else zipfile.ZIP_STORED
+    stale = set(stale)
+    stats = ArchiveStats()
+    buffer = bytearray(chunk_size)
+
+    previous_zip = None
+    if previous is not None and Path(previous).is_file():
+        try:
+            previous_zip = zipfile.ZipFile(previous, "r")
+        except zipfile.BadZipFile:
+            previous_zip = None
+
+    # 先写入临时文件，完成后再替换目标文件，这样previous可以与target为同一文件
+    tmp_target = target.with_name(target.name + ".tmp")
+    try:
+        with open(tmp_target, "wb") as fd:
+            if interpreter:
+                fd.write(b"#!" + interpreter.encode(SHEBANG_ENCODING) + b"\n")
+            with zipfile.ZipFile(fd, "w", compression=compression) as z:
+                for arcname, is_dir in snapshot.entries():
+                    check_cancelled(cancelled)
+                    if filter is not None and not filter(Path(arcname)):
+                        continue
+                    reusable = None
+                    if previous_zip is not None and arcname not in stale:
+                        name = arcname + "/" if is_dir else arcname
+                        reusable = previous_zip.NameToInfo.get(name, None)
+                    if reusable is not None and (
+                        reusable.is_dir() or reusable.compress_type == compression
+                    ):
+                        _copy_entry(previous_zip, reusable, z, buffer, cancelled)
+                        stats.reused_entries += 1
+                        if progress is not None and not is_dir:
+                            progress(1, reusable.file_size)
+                    else:
+                        _write_file(
+                            z, source / arcname, arcname, buffer, cancelled, progress
+                        )
+                        if progress is not None and not is_dir:
+                            progress(1, 0)
+                for arcname, content in (extra_files or {}).items():
+                    if isinstance(content, str):
+                        content = content.encode("utf-8")
+                    z.writestr(arcname, content)
+                if main_py:
+                    z.writestr("__main__.py", main_py.encode("utf-8"))
+                for zinfo in z.infolist():
+                    stats.entries += 1
+                    stats.file_size += zinfo.file_size
+                    stats.compress_size += zinfo.compress_size
+                    stats.zip64 = stats.zip64 or (
+                        zinfo.file_size > zipfile.ZIP64_LIMIT
+                        or zinfo.compress_size > zipfile.ZIP64_LIMIT
+                        or zinfo.header_offset > zipfile.ZIP64_LIMIT
+                    )
+                stats.zip64 = stats.zip64 or (
+                    stats.entries >= zipfile.ZIP_FILECOUNT_LIMIT
+                    or fd.tell() > zipfile.ZIP64_LIMIT
+                )
+        os.replace(tmp_target, target)
+    finally:
+        if previous_zip is not None:
+            previous_zip.close()
+        if tmp_target.exists():
+            tmp_target.unlink()
+
+    stats.archive_size = target.stat().st_size
+    if interpreter:
+        target.chmod(target.stat().st_mode | stat.S_IEXEC)
+    return stats
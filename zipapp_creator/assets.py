@@ -8,6 +8,7 @@ from pyguiadapterlite.pathutils import read_text, read_binary, copytree
 PACKAGE_NAME = "zipapp_creator"
 ASSETS_DIR_NAME = "_assets"
 LOCALES_DIR_NAME = "locales"
+LOCALES_STAMP_FILE = ".digest"
 
 
 def locale_file(domain: str, locale_code: str) -> str:
@@ -53,6 +54,44 @@ def export_builtin_locales(target_dir: str, overwrite: bool = False) -> None:
     copy_assets_tree(LOCALES_DIR_NAME, target_dir.as_posix(), dirs_exist_ok=True)
 
 
+def builtin_locales_digest() -> str:
+    """计算所有内置.mo文件（相对路径与内容）的sha256，内置的翻译发生任何变化时该值都会改变"""
+    import hashlib
+    from importlib.resources import files
+
+    h = hashlib.sha256()
+
+    def _walk(res, rel: str):
+        for child in sorted(res.iterdir(), key=lambda r: r.name):
+            child_rel = f"{rel}/{child.name}"
+            if child.is_dir():
+                _walk(child, child_rel)
+            elif child.name.endswith(".mo"):
+                h.update(child_rel.encode("utf-8") + b"\0")
+                h.update(child.read_bytes())
+
+    locales = files(PACKAGE_NAME).joinpath(ASSETS_DIR_NAME, LOCALES_DIR_NAME)
+    _walk(locales, LOCALES_DIR_NAME)
+    return h.hexdigest()
+
+
+def export_builtin_locales_if_outdated(target_dir: str) -> bool:
+    """
+    仅当target_dir中的标记与内置.mo文件的摘要不一致（或不存在）时才导出内置的locale文件，
+    避免每次启动时都重复拷贝。返回是否进行了导出。
+    """
+    digest = builtin_locales_digest()
+    stamp_file = Path(target_dir) / LOCALES_STAMP_FILE
+    try:
+        if stamp_file.read_text(encoding="utf-8").strip() == digest:
+            return False
+    except OSError:
+        pass
+    export_builtin_locales(target_dir, overwrite=True)
+    stamp_file.write_text(digest, encoding="utf-8")
+    return True
+
+
 def load_locale_file(domain: str, locale_code: str) -> Optional[bytes]:
     locale_file_path = locale_file(domain, locale_code)
     try:
@@ -0,0 +1,41 @@
+import hashlib
+import os
+from pathlib import Path
+from typing import Optional, Union
+
+
+class ContentCache(object):
+    """
+    按内容寻址的处理结果缓存（精简源文件、剥离调试信息等），以处理选项与输入内容的sha256为键。
+    每个结果保存为cache_dir中的一个文件，可以被多个进程同时读写。
+    """
+
+    def __init__(self, cache_dir: Union[str, Path]):
+        self.cache_dir = Path(cache_dir)
+
+    @staticmethod
+    def key(content: bytes, options_key: str) -> str:
+        """options_key标识处理方式（工具、选项及其版本），其变化后缓存自动失效"""
+        h = hashlib.sha256(options_key.encode("utf-8") + b"\0")
+        h.update(content)
+        return h.hexdigest()
+
+    def _cache_file(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / key
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self._cache_file(key).read_bytes()
+        except OSError:
+            return None
+
+    def put(self, key: str, content: bytes):
+        cache_file = self._cache_file(key)
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_name(f"{key}.{os.getpid()}.tmp")
+            tmp_file.write_bytes(content)
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            # 缓存只是加速手段，写入失败时忽略
+            pass
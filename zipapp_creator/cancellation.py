@@ -0,0 +1,37 @@
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Optional
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+
+class OperationCancelled(RuntimeError):
+    """长时间运行的操作（拷贝、扫描、清理、打包等）被取消"""
+
+    pass
+
+
+def check_cancelled(cancelled: Optional[Callable[[], bool]]):
+    """
+    协作式取消的检查点：cancelled为返回是否已请求取消的函数（例如is_function_cancelled），
+    已请求取消时抛出OperationCancelled。长时间运行的循环应在每次迭代（或每个数据块）时调用该函数。
+    """
+    if cancelled is not None and cancelled():
+        raise OperationCancelled()
+
+
+def wait_cancellable(
+    futures: Iterable["Future"],
+    cancelled: Optional[Callable[[], bool]],
+    interval: float = 0.05,
+) -> Iterator["Future"]:
+    """
+    按完成的顺序依次产生futures中的Future。等待期间每隔interval秒醒来检查一次是否已请求取消，
+    已请求取消时抛出OperationCancelled（尚未完成的Future由调用者负责取消）。
+    """
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    pending = set(futures)
+    while pending:
+        done, pending = wait(pending, timeout=interval, return_when=FIRST_COMPLETED)
+        check_cancelled(cancelled)
+        yield from done
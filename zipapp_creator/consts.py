@@ -2,7 +2,6 @@ from pathlib import Path
 
 import platformdirs
 
-
 APP_NAME = "zipapp-creator"
 APP_VERSION = "0.2.3"
 APP_DESCRIPTION = (
@@ -16,6 +15,12 @@ APP_REPO = "https://github.com/zimolab/zipapp-creator"
 APP_DATADIR = Path(platformdirs.user_data_dir(APP_NAME, ensure_exists=True))
 APP_LOCALES_DIR = APP_DATADIR / "locales"
 APP_SETTINGS_FILE = APP_DATADIR / "config.json"
+APP_PROFILES_DIR = APP_DATADIR / "profiles"
+APP_LAYERS_DIR = APP_DATADIR / "layers"
+APP_MINIFY_CACHE_DIR = APP_DATADIR / "minify-cache"
+APP_STRIP_CACHE_DIR = APP_DATADIR / "strip-cache"
+
+ENV_DEBUG_MODE = "ZIPAPP_CREATOR_DEBUG"
 
 GLOBAL_VARNAME_DEBUG_FUNC = "_zipapp_creator_debug_"
 GLOBAL_VARNAME_ERROR_FUNC = "_zipapp_creator_error_"
@@ -0,0 +1,280 @@
+"""
+zipapp压缩包的增量更新。
+
+make_delta()逐条比较新旧两个压缩包的中央目录（CRC、大小、压缩方式），生成只包含变化内容的增量包；
+apply_delta()使用旧压缩包与增量包重建出与新压缩包逐字节相同的文件，并校验其sha256。
+
+新压缩包被描述为一系列字节区间：未变化条目的压缩数据直接引用旧压缩包中的区间，
+其余部分（shebang、本地文件头、变化条目的数据、中央目录）保存在增量包中。
+由于每次构建时依赖的修改时间都会变化，本地文件头总是保存在增量包中，只复用压缩数据。
+
+本模块只依赖标准库，可以单独分发给客户端使用：
+
+    python -m zipapp_creator.delta make old.pyz new.pyz update.delta
+    python -m zipapp_creator.delta apply old.pyz update.delta new.pyz
+"""
+
+import argparse
+import dataclasses
+import hashlib
+import json
+import os
+import struct
+import sys
+import zipfile
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Tuple, Union
+
+DELTA_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+DATA_NAME = "data.bin"
+
+OP_OLD = "old"
+OP_DELTA = "delta"
+
+_COPY_BUFSIZE = 1024 * 1024
+
+
+class DeltaError(ValueError):
+    pass
+
+
+@dataclasses.dataclass
+class DeltaStats(object):
+    entries: int = 0
+    reused_entries: int = 0
+    new_size: int = 0
+    reused_bytes: int = 0
+    delta_size: int = 0
+
+
+def file_sha256(path: Union[str, Path]) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_COPY_BUFSIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _data_offset(fp: BinaryIO, zinfo: zipfile.ZipInfo) -> int:
+    """返回条目压缩数据的起始位置（跳过本地文件头）"""
+    fp.seek(zinfo.header_offset)
+    header = struct.unpack(zipfile.structFileHeader, fp.read(zipfile.sizeFileHeader))
+    if header[0] != zipfile.stringFileHeader:
+        raise zipfile.BadZipFile(f"bad local file header: {zinfo.filename}")
+    return zinfo.header_offset + zipfile.sizeFileHeader + header[10] + header[11]
+
+
+def _same_range(fp1: BinaryIO, offset1: int, fp2: BinaryIO, offset2: int, size: int):
+    fp1.seek(offset1)
+    fp2.seek(offset2)
+    while size > 0:
+        n = min(size, _COPY_BUFSIZE)
+        if fp1.read(n) != fp2.read(n):
+            return False
+        size -= n
+    return True
+
+
+def _same_entry(old: zipfile.ZipInfo, new: zipfile.ZipInfo) -> bool:
+    return (
+        old.CRC == new.CRC
+        and old.file_size == new.file_size
+        and old.compress_size == new.compress_size
+        and old.compress_type == new.compress_type
+    )
+
+
+class _OpsBuilder(object):
+    def __init__(self):
+        self.ops: List[Tuple[str, int, int]] = []
+
+    def add(self, op: str, offset: int, length: int):
+        if length <= 0:
+            return
+        if self.ops:
+            last_op, last_offset, last_length = self.ops[-1]
+            # 合并连续的区间
+            if last_op == op and last_offset + last_length == offset:
+                self.ops[-1] = (op, last_offset, last_length + length)
+                return
+        self.ops.append((op, offset, length))
+
+
+def make_delta(
+    old: Union[str, Path], new: Union[str, Path], delta: Union[str, Path]
+) -> DeltaStats:
+    """比较old与new两个压缩包，生成从old更新到new所需的增量包delta"""
+    old, new, delta = Path(old), Path(new), Path(delta)
+    stats = DeltaStats(new_size=new.stat().st_size)
+    builder = _OpsBuilder()
+    data_size = 0
+    tmp_delta = delta.with_name(delta.name + ".tmp")
+    try:
+        with zipfile.ZipFile(old) as old_zip, zipfile.ZipFile(
+            new
+        ) as new_zip, zipfile.ZipFile(
+            tmp_delta, "w", compression=zipfile.ZIP_DEFLATED
+        ) as delta_zip, open(
+            new, "rb"
+        ) as new_fp:
+            old_fp = old_zip.fp
+            with delta_zip.open(DATA_NAME, "w", force_zip64=True) as data:
+
+                def _emit_new(start: int, end: int):
+                    nonlocal data_size
+                    new_fp.seek(start)
+                    remaining = end - start
+                    while remaining > 0:
+                        chunk = new_fp.read(min(remaining, _COPY_BUFSIZE))
+                        data.write(chunk)
+                        remaining -= len(chunk)
+                    builder.add(OP_DELTA, data_size, end - start)
+                    data_size += end - start
+
+                position = 0
+                infos = sorted(new_zip.infolist(), key=lambda i: i.header_offset)
+                for zinfo in infos:
+                    stats.entries += 1
+                    previous = old_zip.NameToInfo.get(zinfo.filename, None)
+                    if previous is None or zinfo.compress_size == 0:
+                        continue
+                    if not _same_entry(previous, zinfo):
+                        continue
+                    old_offset = _data_offset(old_fp, previous)
+                    new_offset = _data_offset(new_fp, zinfo)
+                    if not _same_range(
+                        old_fp, old_offset, new_fp, new_offset, zinfo.compress_size
+                    ):
+                        continue
+                    # 从上一个位置到该条目压缩数据之前的内容（包括本地文件头）保存在增量包中
+                    _emit_new(position, new_offset)
+                    builder.add(OP_OLD, old_offset, zinfo.compress_size)
+                    position = new_offset + zinfo.compress_size
+                    stats.reused_entries += 1
+                    stats.reused_bytes += zinfo.compress_size
+                _emit_new(position, stats.new_size)
+
+            manifest = {
+                "version": DELTA_VERSION,
+                "old_sha256": file_sha256(old),
+                "old_size": old.stat().st_size,
+                "new_sha256": file_sha256(new),
+                "new_size": stats.new_size,
+                "ops": builder.ops,
+            }
+            delta_zip.writestr(MANIFEST_NAME, json.dumps(manifest))
+        os.replace(tmp_delta, delta)
+    finally:
+        if tmp_delta.exists():
+            tmp_delta.unlink()
+    stats.delta_size = delta.stat().st_size
+    return stats
+
+
+def read_manifest(delta: Union[str, Path]) -> dict:
+    with zipfile.ZipFile(delta) as delta_zip:
+        try:
+            manifest = json.loads(delta_zip.read(MANIFEST_NAME))
+        except KeyError:
+            raise DeltaError(f"not a delta file: {delta}") from None
+    if manifest.get("version", None) != DELTA_VERSION:
+        raise DeltaError(f"unsupported delta version: {manifest.get('version')}")
+    return manifest
+
+
+def apply_delta(
+    old: Union[str, Path],
+    delta: Union[str, Path],
+    target: Union[str, Path],
+    verify_old: bool = True,
+):
+    """
+    使用旧压缩包old与增量包delta重建新的压缩包，并写入target（可以与old为同一文件）。
+    重建结果的sha256与增量包中记录的不一致时抛出DeltaError，且不会修改target。
+    """
+    old, delta, target = Path(old), Path(delta), Path(target)
+    manifest = read_manifest(delta)
+    if verify_old:
+        if (
+            old.stat().st_size != manifest["old_size"]
+            or file_sha256(old) != manifest["old_sha256"]
+        ):
+            raise DeltaError(f"the delta does not apply to this archive: {old}")
+
+    tmp_target = target.with_name(target.name + ".tmp")
+    h = hashlib.sha256()
+    try:
+        with open(old, "rb") as old_fp, zipfile.ZipFile(
+            delta
+        ) as delta_zip, delta_zip.open(DATA_NAME) as data, open(
+            tmp_target, "wb"
+        ) as out:
+            # data.bin中的区间是按顺序使用的，因此可以流式读取
+            data_position = 0
+            for op, offset, length in manifest["ops"]:
+                if op == OP_OLD:
+                    src = old_fp
+                    src.seek(offset)
+                elif op == OP_DELTA:
+                    if offset != data_position:
+                        raise DeltaError("corrupted delta: unexpected data offset")
+                    src = data
+                    data_position += length
+                else:
+                    raise DeltaError(f"corrupted delta: unknown operation {op!r}")
+                remaining = length
+                while remaining > 0:
+                    chunk = src.read(min(remaining, _COPY_BUFSIZE))
+                    if not chunk:
+                        raise DeltaError("corrupted delta: unexpected end of data")
+                    out.write(chunk)
+                    h.update(chunk)
+                    remaining -= len(chunk)
+        if h.hexdigest() != manifest["new_sha256"]:
+            raise DeltaError("sha256 mismatch after applying the delta")
+        # 保留旧压缩包的权限（例如带有shebang的压缩包的可执行权限）
+        tmp_target.chmod(old.stat().st_mode)
+        os.replace(tmp_target, target)
+    finally:
+        if tmp_target.exists():
+            tmp_target.unlink()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m zipapp_creator.delta",
+        description="create or apply delta updates between two zipapp archives",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    make_parser = commands.add_parser("make", help="create a delta from OLD to NEW")
+    make_parser.add_argument("old")
+    make_parser.add_argument("new")
+    make_parser.add_argument("delta")
+    apply_parser = commands.add_parser(
+        "apply", help="rebuild the new archive from OLD and DELTA"
+    )
+    apply_parser.add_argument("old")
+    apply_parser.add_argument("delta")
+    apply_parser.add_argument("target")
+    args = parser.parse_args(argv)
+
+    if args.command == "make":
+        stats = make_delta(args.old, args.new, args.delta)
+        print(
+            f"{stats.reused_entries}/{stats.entries} entries reused, "
+            f"delta size: {stats.delta_size} bytes "
+            f"({stats.delta_size / max(stats.new_size, 1):.1%} of the new archive)"
+        )
+        return 0
+    try:
+        apply_delta(args.old, args.delta, args.target)
+    except DeltaError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    print(f"archive updated: {args.target}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
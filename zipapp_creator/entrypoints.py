@@ -0,0 +1,330 @@
+import ast
+import dataclasses
+import os
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
+
+from .snapshot import TreeSnapshot
+
+# 超过该大小的.py文件（通常是自动生成的代码）不会被解析
+MAX_MODULE_SIZE = 1024 * 1024
+
+ENTRY_OK = "ok"
+# 模块不在源目录中（可能来自尚未安装的依赖），无法判断入口是否有效
+ENTRY_UNKNOWN_MODULE = "unknown_module"
+ENTRY_MISSING_FUNCTION = "missing_function"
+ENTRY_REQUIRES_ARGUMENTS = "requires_arguments"
+ENTRY_SYNTAX_ERROR = "syntax_error"
+
+
+@dataclasses.dataclass(frozen=True)
+class ModuleInfo(object):
+    module: str
+    path: str
+    has_main_block: bool = False
+    # 顶层绑定的所有名称（函数、类、变量、导入）
+    names: FrozenSet[str] = frozenset()
+    # 顶层定义的（非async）函数，以及其中不需要参数就可以调用的函数
+    functions: FrozenSet[str] = frozenset()
+    zero_arg_functions: FrozenSet[str] = frozenset()
+    error: str = ""
+
+
+def _is_main_check(node: ast.expr) -> bool:
+    # if __name__ == "__main__": / if "__main__" == __name__:
+    if not isinstance(node, ast.Compare) or len(node.ops) != 1:
+        return False
+    if not isinstance(node.ops[0], ast.Eq):
+        return False
+    operands = [node.left, node.comparators[0]]
+    has_name = any(isinstance(o, ast.Name) and o.id == "__name__" for o in operands)
+    has_main = any(
+        isinstance(o, ast.Constant) and o.value == "__main__" for o in operands
+    )
+    return has_name and has_main
+
+
+def _requires_arguments(node: ast.FunctionDef) -> bool:
+    args = node.args
+    positional = [*args.posonlyargs, *args.args]
+    if len(positional) > len(args.defaults):
+        return True
+    return any(default is None for default in args.kw_defaults)
+
+
+def _collect_names(
+    body: List[ast.stmt], names: set, functions: set, zero_arg_functions: set
+):
+    for node in body:
+        if isinstance(node, ast.FunctionDef):
+            names.add(node.name)
+            functions.add(node.name)
+            if _requires_arguments(node):
+                zero_arg_functions.discard(node.name)
+            else:
+                zero_arg_functions.add(node.name)
+        elif isinstance(node, (ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                for sub in ast.walk(target):
+                    if isinstance(sub, ast.Name):
+                        names.add(sub.id)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                names.add(alias.asname or alias.name.split(".")[0])
+        elif isinstance(node, ast.If) and not _is_main_check(node.test):
+            _collect_names(node.body, names, functions, zero_arg_functions)
+            _collect_names(node.orelse, names, functions, zero_arg_functions)
+        elif isinstance(node, ast.Try):
+            for block in (node.body, node.orelse, node.finalbody):
+                _collect_names(block, names, functions, zero_arg_functions)
+            for handler in node.handlers:
+                _collect_names(handler.body, names, functions, zero_arg_functions)
+        elif isinstance(node, ast.With):
+            _collect_names(node.body, names, functions, zero_arg_functions)
+
+
+def parse_module(module: str, path: str, source: bytes) -> ModuleInfo:
+    try:
+        tree = ast.parse(source, filename=path)
+    except (SyntaxError, ValueError) as e:
+        return ModuleInfo(module=module, path=path, error=str(e))
+    names, functions, zero_arg_functions = set(), set(), set()
+    _collect_names(tree.body, names, functions, zero_arg_functions)
+    has_main_block = any(
+        isinstance(node, ast.If) and _is_main_check(node.test) for node in tree.body
+    )
+    return ModuleInfo(
+        module=module,
+        path=path,
+        has_main_block=has_main_block,
+        names=frozenset(names),
+        functions=frozenset(functions),
+        zero_arg_functions=frozenset(zero_arg_functions),
+    )
+
+
+def module_name(rel_path: str) -> Optional[str]:
+    """根据.py文件的相对路径得到模块名，若其无法被导入（例如目录名不是合法的标识符）则返回None"""
+    if not rel_path.endswith(".py"):
+        return None
+    parts = rel_path[:-3].split("/")
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    if not parts or not all(part.isidentifier() for part in parts):
+        return None
+    return ".".join(parts)
+
+
+class EntryPointIndex(object):
+    """
+    源目录的入口点索引：使用ast解析源目录中的所有模块，记录其中的顶层名称、无参函数，
+    以及是否包含`if __name__ == "__main__":`代码块。
+    """
+
+    def __init__(
+        self,
+        source_dir: Union[str, Path],
+        snapshot: Optional[TreeSnapshot],
+        modules: Dict[str, ModuleInfo],
+        file_keys: Dict[str, Tuple[int, int]],
+        dir_mtime: int = 0,
+    ):
+        self.source_dir = Path(source_dir)
+        # 源目录不存在时为None
+        self.snapshot = snapshot
+        self._modules = modules
+        self._file_keys = file_keys
+        # 建立索引之前源目录本身的修改时间（纳秒）
+        self.dir_mtime = dir_mtime
+
+    @classmethod
+    def build(
+        cls,
+        source_dir: Union[str, Path],
+        ignore_patterns: Iterable[str] = (),
+        previous: Optional["EntryPointIndex"] = None,
+    ) -> "EntryPointIndex":
+        """
+        建立索引。若提供了上一次的索引，则修改时间与大小均未变化的模块直接沿用上一次的解析结果。
+        """
+        source_dir = Path(source_dir)
+        try:
+            # 在扫描之前记录，扫描期间发生的变化在下一次检查时就会被发现
+            dir_mtime = os.stat(source_dir).st_mtime_ns
+        except OSError:
+            dir_mtime = 0
+        if not source_dir.is_dir():
+            return cls(source_dir, None, {}, {})
+        snapshot = TreeSnapshot.capture(source_dir, ignore_patterns)
+        previous_modules = {}
+        previous_keys = {}
+        if previous is not None:
+            previous_modules = {m.path: m for m in previous._modules.values()}
+            previous_keys = previous._file_keys
+        modules, file_keys = {}, {}
+        for rel_path, size, mtime in snapshot.files():
+            name = module_name(rel_path)
+            if name is None or size > MAX_MODULE_SIZE:
+                continue
+            key = (mtime, size)
+            info = previous_modules.get(rel_path, None)
+            if info is None or previous_keys.get(rel_path, None) != key:
+                try:
+                    info = parse_module(
+                        name, rel_path, (source_dir / rel_path).read_bytes()
+                    )
+                except OSError:
+                    continue
+            modules[name] = info
+            file_keys[rel_path] = key
+        return cls(source_dir, snapshot, modules, file_keys, dir_mtime)
+
+    def is_stale(self) -> bool:
+        """
+        检查源目录在建立索引之后是否发生了变化：比较源目录及其中各个目录的修改时间（增删、重命名文件时改变）
+        以及已解析模块的修改时间与大小。只需要stat，不需要重新遍历目录或解析模块。
+        """
+        try:
+            if self.snapshot is None:
+                return self.source_dir.is_dir()
+            if os.stat(self.source_dir).st_mtime_ns != self.dir_mtime:
+                return True
+            for rel_path, is_dir in self.snapshot.entries():
+                if is_dir:
+                    st = os.stat(self.source_dir / rel_path)
+                    if st.st_mtime_ns != self.snapshot.mtime_ns(rel_path):
+                        return True
+            for rel_path, key in self._file_keys.items():
+                st = os.stat(self.source_dir / rel_path)
+                if (st.st_mtime_ns, st.st_size) != key:
+                    return True
+        except OSError:
+            return True
+        return False
+
+    @property
+    def exists(self) -> bool:
+        return self.snapshot is not None
+
+    def is_file(self, rel_path: str) -> bool:
+        return self.snapshot is not None and self.snapshot.is_file(rel_path)
+
+    def module(self, name: str) -> Optional[ModuleInfo]:
+        return self._modules.get(name, None)
+
+    def check_entry(self, entry: str) -> str:
+        """检查`module:func`形式的入口是否存在于源目录中，返回ENTRY_*中的一个"""
+        module, _, func = entry.strip().partition(":")
+        info = self.module(module)
+        if info is None:
+            return ENTRY_UNKNOWN_MODULE
+        if info.error:
+            return ENTRY_SYNTAX_ERROR
+        if not func:
+            return ENTRY_OK
+        if func not in info.names:
+            return ENTRY_MISSING_FUNCTION
+        if func in info.functions and func not in info.zero_arg_functions:
+            return ENTRY_REQUIRES_ARGUMENTS
+        return ENTRY_OK
+
+    def candidates(self, self_extract: bool = False) -> List[str]:
+        """
+        返回可能的入口：对于普通的zipapp，返回包含无参main()函数的模块（`module:main`）；
+        对于自解压的zipapp，返回包含`if __name__ == "__main__":`的.py文件路径。
+        """
+        if self_extract:
+            found = [m.path for m in self._modules.values() if m.has_main_block]
+        else:
+            found = [
+                f"{m.module}:main"
+                for m in self._modules.values()
+                if "main" in m.zero_arg_functions
+            ]
+        # 层级越浅越靠前，同一层级中名为main的模块优先
+        return sorted(
+            found,
+            key=lambda c: (c.count(".") + c.count("/"), not c.startswith("main"), c),
+        )
+
+
+class EntryPointIndexer(object):
+    """
+    在后台线程中建立源目录的入口点索引，并按源目录（与忽略规则）缓存。
+
+    参数校验在界面线程中执行：已有索引时get()立即返回缓存的索引，同时在后台检查源目录是否发生了变化
+    （EntryPointIndex.is_stale()），只有发生了变化时才重新建立索引，供之后的校验使用；
+    还没有索引时最多只等待timeout秒，超时则返回None，由调用者跳过依赖文件系统的检查。
+    因此即使源目录位于很慢的网络驱动器上，界面也不会被阻塞。后台线程为守护线程，不会阻止程序退出。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexes: Dict[Tuple[str, Tuple[str, ...]], EntryPointIndex] = {}
+        self._pending: Dict[Tuple[str, Tuple[str, ...]], Future] = {}
+
+    @staticmethod
+    def _key(
+        source_dir: Union[str, Path], ignore_patterns: Iterable[str]
+    ) -> Tuple[str, Tuple[str, ...]]:
+        return (
+            os.path.normpath(Path(source_dir).absolute().as_posix()),
+            tuple(ignore_patterns),
+        )
+
+    def request(
+        self, source_dir: Union[str, Path], ignore_patterns: Iterable[str] = ()
+    ) -> Future:
+        """在后台更新索引（缓存的索引没有过期时直接使用），返回其结果的Future"""
+        key = self._key(source_dir, ignore_patterns)
+        with self._lock:
+            future = self._pending.get(key, None)
+            if future is not None and not future.done():
+                return future
+            future = Future()
+            self._pending[key] = future
+        thread = threading.Thread(
+            target=self._build, args=(key, future), daemon=True, name="entry-index"
+        )
+        thread.start()
+        return future
+
+    def _build(self, key: Tuple[str, Tuple[str, ...]], future: Future):
+        if not future.set_running_or_notify_cancel():
+            return
+        source_dir, ignore_patterns = key
+        try:
+            with self._lock:
+                previous = self._indexes.get(key, None)
+            if previous is not None and not previous.is_stale():
+                index = previous
+            else:
+                index = EntryPointIndex.build(source_dir, ignore_patterns, previous)
+        except BaseException as e:
+            future.set_exception(e)
+            return
+        with self._lock:
+            self._indexes[key] = index
+        future.set_result(index)
+
+    def get(
+        self,
+        source_dir: Union[str, Path],
+        ignore_patterns: Iterable[str] = (),
+        timeout: Optional[float] = None,
+    ) -> Optional[EntryPointIndex]:
+        with self._lock:
+            cached = self._indexes.get(self._key(source_dir, ignore_patterns), None)
+        future = self.request(source_dir, ignore_patterns)
+        if cached is not None:
+            return cached
+        try:
+            return future.result(timeout=timeout)
+        except Exception:
+            # 超时（TimeoutError）或建立索引失败
+            return None
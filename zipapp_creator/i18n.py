@@ -1,9 +1,13 @@
+import gettext
 import io
+import mmap
+import struct
+import sys
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 from pyguiadapterlite.assets import copy_assets_tree
-from pyguiadapterlite.i18n import I18N
+from pyguiadapterlite.i18n import I18N, detect_system_locale
 
 from .assets import LOCALES_DIR_NAME
 
@@ -12,6 +16,111 @@ DEFAULT_LOCALE_CODE = "auto"
 DEFAULT_LOCALE_DIR = ""
 EXPORT_LOCALES = False
 
+_MO_LE_MAGIC = 0x950412DE
+_MO_BE_MAGIC = 0xDE120495
+
+
+class MappedTranslations(gettext.NullTranslations):
+    """
+    基于内存映射的.mo文件翻译。与gettext.GNUTranslations不同，它不会在加载时把整个文件读入内存
+    并解析出所有的消息，而是在查找某条消息时才在（已排序的）原文表中进行二分查找，并缓存查找结果。
+    """
+
+    def __init__(self, mo_file: str):
+        super().__init__()
+        self._mo_file = mo_file
+        with open(mo_file, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._parse_header()
+        except Exception:
+            self._map.close()
+            raise
+        self._cache: Dict[Tuple[str, ...], Optional[str]] = {}
+
+    def _parse_header(self):
+        (magic,) = struct.unpack_from("<I", self._map, 0)
+        if magic == _MO_LE_MAGIC:
+            self._endian = "<"
+        elif magic == _MO_BE_MAGIC:
+            self._endian = ">"
+        else:
+            raise OSError(f"bad magic number in {self._mo_file}")
+        revision, self._count, self._originals, self._translations = struct.unpack_from(
+            f"{self._endian}4I", self._map, 4
+        )
+        if revision >> 16 not in (0, 1):
+            raise OSError(f"bad version number in {self._mo_file}")
+        self._charset = "utf-8"
+        self.plural = lambda n: int(n != 1)
+        metadata = self._find(b"")
+        if metadata is None:
+            return
+        # 与gettext.GNUTranslations一样，从元数据中读取字符集与复数形式
+        for line in metadata.decode("ascii", errors="replace").split("\n"):
+            key, sep, value = line.partition(":")
+            if not sep:
+                continue
+            key = key.strip().lower()
+            value = value.strip()
+            self._info[key] = value
+            if key == "content-type" and "charset=" in value:
+                self._charset = value.split("charset=")[1].strip()
+            elif key == "plural-forms":
+                plural = value.split(";")[1].split("plural=")[1]
+                self.plural = gettext.c2py(plural)
+
+    def _entry(self, table: int, index: int) -> bytes:
+        length, offset = struct.unpack_from(
+            f"{self._endian}2I", self._map, table + index * 8
+        )
+        return self._map[offset : offset + length]
+
+    def _find(self, key: bytes) -> Optional[bytes]:
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            original = self._entry(self._originals, mid)
+            if original < key:
+                lo = mid + 1
+            elif original > key:
+                hi = mid
+            else:
+                return self._entry(self._translations, mid)
+        return None
+
+    def _lookup(self, *msgids: str) -> Optional[str]:
+        if msgids in self._cache:
+            return self._cache[msgids]
+        key = b"\0".join(msgid.encode(self._charset) for msgid in msgids)
+        translation = self._find(key)
+        if translation is not None:
+            translation = translation.decode(self._charset)
+        self._cache[msgids] = translation
+        return translation
+
+    def gettext(self, message: str) -> str:
+        translation = self._lookup(message)
+        if translation is not None:
+            return translation
+        if self._fallback:
+            return self._fallback.gettext(message)
+        return message
+
+    def ngettext(self, msgid1: str, msgid2: str, n: int) -> str:
+        translation = self._lookup(msgid1, msgid2)
+        if translation is not None:
+            forms = translation.split("\0")
+            index = self.plural(n)
+            if index < len(forms):
+                return forms[index]
+        if self._fallback:
+            return self._fallback.ngettext(msgid1, msgid2, n)
+        return msgid1 if n == 1 else msgid2
+
+    def close(self):
+        self._map.close()
+
 
 class ZipappCreatorI18N(I18N):
     def __init__(
@@ -27,6 +136,36 @@ class ZipappCreatorI18N(I18N):
             export_locales=export_locales,
         )
 
+    def set_locale(
+        self,
+        locale_code: Optional[str] = None,
+        domain: Optional[str] = None,
+        localedir: Optional[str] = None,
+    ) -> None:
+        # 若指定了locales目录且其中存在对应的.mo文件，则直接对其进行内存映射，
+        # 其他情况（使用内置的locale文件、找不到.mo文件等）仍然交给基类处理
+        domain = (domain or "").strip()
+        localedir = (localedir or "").strip()
+        locale_code = (locale_code or "").strip()
+        if locale_code.lower() == "auto" or locale_code == "":
+            locale_code = detect_system_locale()
+        mo_file = None
+        if domain and localedir:
+            mo_file = gettext.find(domain, localedir, languages=[locale_code])
+        if mo_file is None:
+            super().set_locale(locale_code, domain, localedir)
+            return
+        try:
+            translation = MappedTranslations(mo_file)
+        except Exception as e:
+            print(f"failed to map locale file {mo_file}: {e}", file=sys.stderr)
+            super().set_locale(locale_code, domain, localedir)
+            return
+        self._domain = domain
+        self._localedir = localedir
+        self._current_locale = locale_code
+        self._translation = translation
+
     def load_builtin_locale_file(
         self, domain: str, locale_code: str
     ) -> Optional[io.BytesIO]:
@@ -0,0 +1,254 @@
+import contextlib
+import dataclasses
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+from .progress import ProgressListener, StageProgress
+
+REPORT_VERSION = 2
+
+
+def peak_working_set(handle: Optional[int] = None) -> int:
+    """
+    返回Windows下进程（handle为进程句柄，默认为当前进程）的常驻内存峰值（PeakWorkingSetSize），
+    单位为字节，无法获取时返回0。
+    """
+    try:
+        return _peak_working_set(handle)
+    except Exception:
+        return 0
+
+
+def _peak_working_set(handle: Optional[int]) -> int:
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    get_process_memory_info = ctypes.windll.psapi.GetProcessMemoryInfo
+    get_process_memory_info.argtypes = [
+        wintypes.HANDLE,
+        ctypes.POINTER(PROCESS_MEMORY_COUNTERS),
+        wintypes.DWORD,
+    ]
+    if handle is None:
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+    if not get_process_memory_info(handle, ctypes.byref(counters), counters.cb):
+        return 0
+    return int(counters.PeakWorkingSetSize)
+
+
+def peak_rss(children: bool = False) -> int:
+    """
+    返回当前进程（或已结束的子进程中）的常驻内存峰值，单位为字节，无法获取时返回0。
+    Windows下不支持统计子进程。
+    """
+    if sys.platform == "win32":
+        return 0 if children else peak_working_set()
+    try:
+        import resource
+    except ImportError:
+        return 0
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    max_rss = resource.getrusage(who).ru_maxrss
+    # Linux下ru_maxrss的单位为KB，macOS下为字节
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def children_cpu_time() -> float:
+    times = os.times()
+    return times.children_user + times.children_system
+
+
+@dataclasses.dataclass
+class StageRecord(object):
+    name: str
+    start: float = 0.0
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    children_cpu_time: float = 0.0
+    # 本阶段执行期间（整个进程的）常驻内存峰值的增长量，为0表示没有超过本阶段开始之前的峰值。
+    # children_为已结束的子进程中的峰值的增长量。并行执行的阶段会相互影响
+    peak_rss_increase: int = 0
+    children_peak_rss_increase: int = 0
+    files: int = 0
+    bytes: int = 0
+    thread_id: int = 0
+    extra: Dict[str, Union[int, float, str]] = dataclasses.field(default_factory=dict)
+    # 实时进度，只有BuildReport设置了进度监听器时才存在，不计入报告
+    progress: Optional[StageProgress] = dataclasses.field(
+        default=None, repr=False, compare=False
+    )
+
+    def add(self, files: int = 0, bytes: int = 0):
+        self.files += files
+        self.bytes += bytes
+
+    def expect(self, files: int = 0, bytes: int = 0):
+        """设置阶段的总工作量（用于计算进度与剩余时间）"""
+        if self.progress is not None:
+            self.progress.expect(files, bytes)
+
+    def advance(self, files: int = 0, bytes: int = 0):
+        """报告新完成的工作量，只用于实时进度，与add()不同，不计入统计结果"""
+        if self.progress is not None:
+            self.progress.advance(files, bytes)
+
+    @property
+    def throughput(self) -> float:
+        """每秒处理的字节数"""
+        if self.wall_time <= 0:
+            return 0.0
+        return self.bytes / self.wall_time
+
+    def to_dict(self) -> dict:
+        data = dataclasses.asdict(dataclasses.replace(self, progress=None))
+        del data["progress"]
+        data["throughput"] = self.throughput
+        return data
+
+
+class BuildReport(object):
+    """
+    记录构建过程中每个阶段的耗时与资源占用。
+
+    注意：cpu_time与peak_rss_increase都是整个进程的增量，当多个阶段在不同线程中并行执行时
+    （例如同时打包多个目标），各阶段的数据会相互重叠。整个进程的常驻内存峰值记录在报告的peak_rss中。
+
+    若指定了progress，则每个阶段开始、结束以及报告进度时都会向其发送ProgressEvent。
+    """
+
+    def __init__(self, progress: Optional[ProgressListener] = None):
+        self._progress = progress
+        self._origin = time.perf_counter()
+        self._started_at = time.time()
+        self._lock = threading.Lock()
+        self._stages: List[StageRecord] = []
+        self.metadata: Dict[str, Union[str, int, float, bool, list]] = {}
+
+    @property
+    def stages(self) -> List[StageRecord]:
+        with self._lock:
+            return list(self._stages)
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[StageRecord]:
+        record = StageRecord(name=name, thread_id=threading.get_ident())
+        if self._progress is not None:
+            record.progress = StageProgress(name, self._progress)
+            record.progress.start()
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        start_children_cpu = children_cpu_time()
+        start_peak_rss = peak_rss()
+        start_children_peak_rss = peak_rss(children=True)
+        record.start = start_wall - self._origin
+        try:
+            yield record
+        finally:
+            record.wall_time = time.perf_counter() - start_wall
+            record.cpu_time = time.process_time() - start_cpu
+            record.children_cpu_time = children_cpu_time() - start_children_cpu
+            record.peak_rss_increase = peak_rss() - start_peak_rss
+            record.children_peak_rss_increase = (
+                peak_rss(children=True) - start_children_peak_rss
+            )
+            with self._lock:
+                self._stages.append(record)
+            if record.progress is not None:
+                record.progress.finish()
+
+    def total_wall_time(self) -> float:
+        stages = self.stages
+        if not stages:
+            return 0.0
+        return max(s.start + s.wall_time for s in stages) - min(s.start for s in stages)
+
+    def to_dict(self) -> dict:
+        return {
+            "version": REPORT_VERSION,
+            "started_at": self._started_at,
+            "total_wall_time": self.total_wall_time(),
+            "peak_rss": peak_rss(),
+            "children_peak_rss": peak_rss(children=True),
+            "metadata": dict(self.metadata),
+            "stages": [s.to_dict() for s in self.stages],
+        }
+
+    def write_json(self, path: Union[str, Path]):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+
+    def to_chrome_trace(self) -> dict:
+        """转换为Chrome Trace Event格式，可以在chrome://tracing或ui.perfetto.dev中打开"""
+        pid = os.getpid()
+        events = []
+        for s in self.stages:
+            events.append(
+                {
+                    "name": s.name,
+                    "cat": "stage",
+                    "ph": "X",
+                    "ts": s.start * 1e6,
+                    "dur": s.wall_time * 1e6,
+                    "pid": pid,
+                    "tid": s.thread_id,
+                    "args": {
+                        "cpu_time": s.cpu_time,
+                        "children_cpu_time": s.children_cpu_time,
+                        "peak_rss_increase": s.peak_rss_increase,
+                        "files": s.files,
+                        "bytes": s.bytes,
+                        "throughput": s.throughput,
+                        **s.extra,
+                    },
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: Union[str, Path]):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f, ensure_ascii=False)
+
+    def summary_lines(self) -> List[str]:
+        lines = []
+        for s in self.stages:
+            line = f"{s.name}: {s.wall_time:.3f}s wall, {s.cpu_time:.3f}s cpu"
+            if s.files or s.bytes:
+                line += f", {s.files} files, {format_size(s.bytes)}"
+            if s.throughput:
+                line += f", {format_size(s.throughput)}/s"
+            lines.append(line)
+        return lines
+
+
+def format_size(size: Union[int, float]) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024:
+            return f"{size:.1f}{unit}" if unit != "B" else f"{int(size)}B"
+        size /= 1024
+    return f"{size:.1f}TB"
+
+
+def report_file(target: Union[str, Path], suffix: str) -> Path:
+    target = Path(target)
+    return target.with_name(f"{target.stem}{suffix}")
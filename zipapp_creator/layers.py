@@ -0,0 +1,179 @@
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from string import Template
+from typing import Callable, Iterable, List, Optional, Tuple, Union
+
+from .cancellation import check_cancelled
+from .progress import ProgressCallback
+from .snapshot import TreeSnapshot
+
+LAYER_PREFIX = "deps-"
+LAYER_SUFFIX = ".zip"
+# 运行时除了压缩包所在目录及其下的layers目录之外，还会在该环境变量列出的目录中查找依赖层
+ENV_LAYERS_PATH = "ZIPAPP_LAYERS_PATH"
+LAYERS_DIR_NAME = "layers"
+BOOTSTRAP_MODULE = "__zipapp_layers__"
+
+_HASH_BUFSIZE = 1024 * 1024
+
+BOOTSTRAP_TEMPLATE = Template("""\
+# THIS FILE IS AUTOMATICALLY GENERATED BY zipapp-creator
+# DO NOT MODIFY IT MANUALLY!!!
+import os
+import sys
+
+LAYERS = ${layers}
+
+
+def _search_dirs():
+    app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    dirs = [d for d in os.environ.get("${env_var}", "").split(os.pathsep) if d]
+    dirs.extend([os.path.join(app_dir, "${layers_dir}"), app_dir])
+    return dirs
+
+
+def _mount():
+    dirs = _search_dirs()
+    for position, name in enumerate(LAYERS, start=1):
+        for d in dirs:
+            layer = os.path.join(d, name)
+            if os.path.isfile(layer):
+                # right after the archive itself, as if the dependencies were bundled
+                sys.path.insert(position, layer)
+                break
+        else:
+            sys.exit(f"dependency layer not found: {name} (searched: {dirs})")
+
+
+_mount()
+
+# END OF GENERATED CODE
+""")
+
+
+def layer_key(
+    requirements: Union[str, Path], host_py: str, options: Iterable[str] = ()
+) -> str:
+    """
+    依赖层的缓存键：由requirements文件的内容、宿主Python解释器以及影响依赖层内容的选项
+    （例如index url、是否清理、是否压缩）决定。解释器以其路径、大小与修改时间标识
+    （升级解释器之后缓存自动失效），避免为了获取版本号而启动解释器。
+    """
+    h = hashlib.sha256()
+    h.update(Path(requirements).read_bytes())
+    host_py_path = shutil.which(host_py) or host_py
+    try:
+        st = os.stat(host_py_path)
+        host_py_id = f"{os.path.realpath(host_py_path)}:{st.st_size}:{st.st_mtime_ns}"
+    except OSError:
+        host_py_id = host_py
+    for part in (host_py_id, *options):
+        h.update(b"\0" + part.encode("utf-8"))
+    return h.hexdigest()
+
+
+def file_digest(path: Union[str, Path]) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_BUFSIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class LayerCache(object):
+    """
+    依赖层缓存。依赖层按内容寻址：文件名为`deps-<sha256前缀>.zip`，因此内容相同的依赖层只会保存一份；
+    index目录记录每个缓存键（见layer_key()）对应的依赖层文件名。
+    """
+
+    def __init__(self, cache_dir: Union[str, Path]):
+        self.cache_dir = Path(cache_dir)
+
+    def _index_file(self, key: str) -> Path:
+        return self.cache_dir / "index" / key
+
+    def lookup(self, key: str) -> Optional[Path]:
+        try:
+            name = self._index_file(key).read_text(encoding="utf-8").strip()
+        except OSError:
+            return None
+        layer = self.cache_dir / name
+        return layer if name and layer.is_file() else None
+
+    def store(self, key: str, layer_file: Union[str, Path]) -> Path:
+        """将新生成的依赖层移入缓存（若已存在内容相同的依赖层，则直接使用已有的文件）"""
+        layer_file = Path(layer_file)
+        digest = file_digest(layer_file)
+        layer = self.cache_dir / f"{LAYER_PREFIX}{digest[:16]}{LAYER_SUFFIX}"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        if layer.is_file():
+            layer_file.unlink()
+        else:
+            os.replace(layer_file, layer)
+        index_file = self._index_file(key)
+        index_file.parent.mkdir(parents=True, exist_ok=True)
+        index_file.write_text(layer.name, encoding="utf-8")
+        return layer
+
+
+def build_layer(
+    site_dir: Union[str, Path],
+    target: Union[str, Path],
+    compressed: bool = True,
+    snapshot: Optional[TreeSnapshot] = None,
+    cancelled: Optional[Callable[[], bool]] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> Tuple[int, int]:
+    """
+    将site_dir（pip install --target的安装目录）打包为依赖层，返回写入的文件数量与字节数。
+    每写入一个条目检查一次cancelled，已请求取消时抛出OperationCancelled，并通过progress报告进度。
+    """
+    import zipfile
+
+    site_dir = Path(site_dir)
+    if snapshot is None:
+        snapshot = TreeSnapshot.capture(site_dir, cancelled=cancelled)
+    compression = zipfile.ZIP_DEFLATED if compressed else zipfile.ZIP_STORED
+    files = total_bytes = 0
+    with zipfile.ZipFile(target, "w", compression=compression) as z:
+        for arcname, is_dir in snapshot.entries():
+            check_cancelled(cancelled)
+            z.write(site_dir / arcname, arcname)
+            if not is_dir:
+                files += 1
+                total_bytes += snapshot.size(arcname)
+                if progress is not None:
+                    progress(1, snapshot.size(arcname))
+    return files, total_bytes
+
+
+def install_layer(layer: Union[str, Path], layers_dir: Union[str, Path]) -> Path:
+    """
+    将依赖层放到layers_dir中（与压缩包一起分发）。优先使用硬链接，避免再拷贝一份。
+    依赖层按内容寻址，因此同名文件已存在时无需替换。
+    """
+    layer = Path(layer)
+    layers_dir = Path(layers_dir)
+    installed = layers_dir / layer.name
+    if installed.is_file():
+        return installed
+    layers_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(layer, installed)
+    except OSError:
+        shutil.copy2(layer, installed)
+    return installed
+
+
+def bootstrap_module(layers: List[str]) -> Tuple[str, str, str]:
+    """
+    生成在运行时挂载依赖层的模块，返回(压缩包内的文件名, 文件内容, 需要插入__main__.py开头的代码)。
+    """
+    content = BOOTSTRAP_TEMPLATE.substitute(
+        layers=repr(list(layers)),
+        env_var=ENV_LAYERS_PATH,
+        layers_dir=LAYERS_DIR_NAME,
+    )
+    return f"{BOOTSTRAP_MODULE}.py", content, f"import {BOOTSTRAP_MODULE}\n"
@@ -1,256 +1,611 @@
 import textwrap
-
+from typing import Optional
 
 DEFAULT_WRAP_WIDTH = 55
 
 
-def _wrap(text: str, width: int = DEFAULT_WRAP_WIDTH) -> str:
+class _Message(object):
+    """
+    延迟翻译的消息。首次访问_Messages实例的对应属性时才进行翻译（以及自动换行），
+    然后将结果缓存到实例的__dict__中，之后的访问不再经过该描述符。
+    """
+
+    __slots__ = ("text", "wrap_width", "_name")
+
+    def __init__(self, text: str, wrap_width: Optional[int] = None):
+        self.text = text
+        self.wrap_width = wrap_width
+        self._name = ""
+
+    def __set_name__(self, owner, name: str):
+        self._name = name
+
+    def __get__(self, instance, owner) -> str:
+        if instance is None:
+            return self
+        value = instance.tr(self.text)
+        if self.wrap_width:
+            value = _wrap_text(value, self.wrap_width)
+        instance.__dict__[self._name] = value
+        return value
+
+
+def tr(text: str) -> _Message:
+    # 函数名必须为tr，以便poedit等工具可以继续从源码中提取待翻译的字符串
+    return _Message(text)
+
+
+def _wrap_text(text: str, width: int = DEFAULT_WRAP_WIDTH) -> str:
     return "\n".join(
         textwrap.wrap(text, width, drop_whitespace=False, replace_whitespace=False)
     )
 
 
+def _wrap(message: _Message, width: int = DEFAULT_WRAP_WIDTH) -> _Message:
+    return _Message(message.text, wrap_width=width)
+
+
 class _Messages(object):
     def __init__(self):
         from .common import trfunc
 
-        tr = trfunc()
-
-        self.MSG_SAVE_PARAMS_TITLE = tr("Save Parameters")
-        self.MSG_LOAD_PARAMS_TITLE = tr("Load Parameters")
-        self.MSG_JSON_FILE_FILTER = tr("JSON Files")
-        self.MSG_ALL_FILES_FILTER = tr("All Files")
-        self.MSG_SAVE_PARAMS_SUCCESS = tr("Parameters saved to file: {}")
-        self.MSG_LOAD_PARAMS_SUCCESS = tr("Parameters loaded from file: {}")
-        self.MSG_SAVE_PARAMS_ERROR = tr("Failed to save parameters to file: {}")
-        self.MSG_LOAD_PARAMS_ERROR = tr("Failed to load parameters from file: {}")
-        self.MSG_INVALID_PARAMS_IN_FILE = tr("Invalid parameters in file: {}")
-        self.MSG_ABOUT_TITLE = tr("About")
-        self.MSG_LICENSE_TITLE = tr("License")
-        self.MSG_LICENSE_HINT = tr("This project is under the MIT license.")
-        self.MSG_EDIT_APP_CONFIG_HINT = tr(
-            "Changes to the configuration file will be take effect after restarting the program!"
-        )
-        self.MSG_ACTION_SAVE_PARAMS = tr("Save Parameters")
-        self.MSG_ACTION_LOAD_PARAMS = tr("Load Parameters")
-        self.MSG_ACTION_EXIT = tr("Exit")
-        self.MSG_ACTION_ALWAYS_ON_TOP = tr("Always on Top")
-        self.MSG_ACTION_ABOUT = tr("About")
-        self.MSG_ACTION_LICENSE = tr("License")
-        self.MSG_ACTION_SETTINGS = tr("Settings")
-        self.MSG_MENU_FILE = tr("File")
-        self.MSG_MENU_VIEW = tr("View")
-        self.MSG_MENU_HELP = tr("Help")
-        self.MSG_START_PACKAGING = tr("Start packaging...")
-        self.MSG_COPY_SOURCE_FILES = tr("Start copying source files to {}...")
-        self.MSG_PIP_INSTALL_FAILURE = tr("Failed to install dependencies: {}")
-        self.MSG_CREATING_ZIPAPP = tr("Start creating zipapp file {}...")
-        self.MSG_ZIPAPP_CREATED = tr("Zipapp file created: {}")
-        self.MSG_CREATING_STARTUP_SCRIPT = tr(
-            "Creating startup script for Windows os..."
-        )
-        self.MSG_STARTUP_SCRIPT_CREATED = tr("Startup script created: {}")
-        self.MSG_CREATE_ZIPAPP_FAILURE = tr("Failed to create zipapp file: {}")
-
-        self.MSG_SOURCE_DIR_REQUIRED = tr("Please specify the source directory!")
-        self.MSG_SOURCE_DIR_NOT_FOUND = tr("The source directory does not exist!")
-        self.MSG_MAIN_FILE_NOT_ALLOWED = tr(
-            "A __main__.py file is found in the source directory, "
-            "which is not allowed when creating a self-extracting zipapp!"
-        )
-        self.MSG_VALID_ENTRY_FILE_REQUIRED = tr(
-            "Please specify a valid entry file when creating a self-extracting zipapp!"
-        )
-        self.MSG_ENTRY_REQUIRED = tr(
-            "The entry must be specified(in the form of 'pkg.module:fn' or 'module:fn') "
-            "if there is no __main__.py file in the source directory!"
-        )
-        self.MSG_INVALID_ENTRY_FORMAT = tr(
-            "The entry should be in the form of 'pkg.module:fn' or 'module:fn', not a file path!"
-            "Or you can just leave it empty if there is a __main__.py file in the source directory!"
-        )
-        self.MSG_HOST_PYTHON_REQUIRED = tr(
-            "host python is not specified, it is required to execute the pip install command! "
-            "Use current python interpreter as host python."
-        )
-        self.MSG_REQUIREMENTS_FILE_NOT_FOUND = tr(
-            "The requirements file not found in the source directory!"
-        )
-        self.MSG_SCRIPT_PYTHON_REQUIRED = tr(
-            "Please specify the python command which will be used in the startup script for starting the "
-            "output zipapp."
-        )
-        self.MSG_CLEANUP_DEPENDENCIES = tr("Cleaning up dependencies...")
-        self.MSG_REMOVING = tr("Removing: {}")
-        self.MSG_CLEANUP_DEPENDENCIES_DONE = tr("Cleanup done!")
-
-        self.MSG_START_PIP_INSTALL = tr("Installing dependencies with pip...")
-        self.MSG_PIP_INSTALL_FAILURE = tr("Failed to install dependencies: {}")
-        self.MSG_PIP_INSTALL_SUCCESS = tr("Dependencies installed successfully!")
-        self.MSG_PIP_INSTALL_CANCELLED = tr("User cancelled the pip-install process!")
-
-        self.MSG_PARAM_GROUP_MAIN = tr("Main")
-        self.MSG_PARAM_GROUP_EXCLUDE = tr("Exclude")
-        self.MSG_PARAM_GROUP_PACKAGING = tr("Packaging")
-
-        self.MSG_PARAM_SRC_DIR = tr("Source")
-        self.MSG_PARAM_TARGET = tr("Target")
-        self.MSG_PARAM_ENTRY = tr("Entry")
-        self.MSG_PARAM_SHEBANG = tr("Shebang")
-        self.MSG_PARAM_REQUIREMENTS = tr("Requirements")
-        self.MSG_PARAM_HOST_PYTHON = tr("Host Python")
-        self.MSG_PARAM_DEFLATE_COMPRESSION = tr("Deflate Compression")
-        self.MSG_PARAM_SELF_EXTRACTING = tr("Self-Extracting Mode")
-        self.MSG_PARAM_START_SCRIPT = tr("Start Script for Windows")
-        self.MSG_STRAT_SCRIPT_PYTHON = tr("Python for Start Script")
-        self.MSG_PARMA_EXCLUDE_FROM_COPY = tr("Exclude from Copy")
-        self.MSG_PARAM_EXCLUDE_FROM_PACKAGING = tr("Exclude from Packaging")
-        self.MSG_PARAM_PIP_INDEX_URL = tr("PIP Index URL")
-        self.MSG_PARMA_CLEANUP_DEPENDENCIES = tr(
-            "Cleanup dependencies after pip install"
-        )
-
-        self.MSG_PARAM_DESC_SRC_DIR = _wrap(
-            tr(
-                "The name of a directory, in which case a new application "
-                "archive will be created from the content of that directory."
-            )
-        )
-        self.MSG_PARAM_DESC_TARGET = _wrap(
-            tr(
-                "This argument determines where the resulting archive "
-                "will be written. If this argument is omitted, the target "
-                "will be a file with the same name as the source, with a .pyz "
-                "extension added."
-            )
-        )
-        self.MSG_PARAM_DESC_SHEBANG = _wrap(
-            tr(
-                "This argument specifies the name of python interpreter "
-                "with which the archive will be executed. It is written as a "
-                "“shebang” line at the start of the archive. On POSIX, this will "
-                "be interpreted by the OS, and on Windows it will be handled "
-                "by the Python launcher. Omitting this argument results in no "
-                "shebang line being written. If an shebang is specified, "
-                "and the target is a filename, the executable bit of the target "
-                "file will be set."
-            )
-        )
-        self.MSG_PARAM_DESC_DEFLATE_COMPRESSION = _wrap(
-            tr(
-                "This argument determines whether files are compressed. If selected, "
-                "files in the archive are compressed with the deflate method; otherwise, "
-                "files are stored uncompressed."
-            )
-        )
-        self.MSG_PARAM_DESC_SELF_EXTRACTING = _wrap(
-            tr(
-                "This argument determines whether the resulting archive is 'self-extracting'. "
-                "A self-extracting archive contains a auto-generated python script as "
-                "the pre-entry point of the application. When executed, this script will be "
-                "executed first. This script does two things: firstly, it extracts the contents "
-                "of the archive to a temporary directory, and then executes the actual entry point file "
-                "you specified. If this argument is selected, you must specify a valid python script file "
-                "as the entry and make sure that there is no __main__.py file in the source directory. "
-                "If this argument is not selected, you need to provide an entry point in the form of "
-                "'pkg.module:fn' or 'module:fn', or just leave the entry point argument empty if "
-                "there is a __main__.py file in the source directory. An self-extracting archive "
-                "is very useful if you have c extensions in your dependencies."
-            )
-        )
-        self.MSG_PARAM_DESC_START_SCRIPT = _wrap(
-            tr(
-                "This argument determines whether a startup script will be created for Windows operating "
-                "system. The startup script will be a vbs file with the same name as the target archive, "
-                "For example, if the target archive is 'app.pyz', the startup script will be 'app.vbs'. "
-                "The startup script starts the output zipapp by using the python command you specified, and "
-                "it hides the console window which makes your zipapp look more like a native application. "
-                "If this argument is selected, you must specify the python command being used to execute the "
-                "output zipapp application. "
-            )
-        )
-        self.MSG_PARAM_DESC_SCRIPT_PYTHON = _wrap(
-            tr(
-                "This argument determines the python command to execute the output zipapp in the startup script. "
-                "For example, if you want to use python 3 to start the output zipapp, you can specify 'python3'."
-                "It is not recommented to specify an absolute path to the python interpreter, it may not work "
-                "in other machines. It is recommended to use 'python', 'python3', 'python.exe', etc., and make "
-                "sure the python interpreter is in the system PATH."
-            )
-        )
-        self.MSG_PARAM_DESC_EXCLUDE_FROM_COPY = _wrap(
-            tr(
-                "Everytime creating a new zipapp archive, the source directory will be copied to the `zipapp_dist` "
-                "directory to keep your source directory clean and uncompromised. This argument let you exclude the "
-                "files and directories you don't want to be copied to the `zipapp_dist` directory. For example, you "
-                "probably don't want the virtual environment directory(normally named venv or .venv) being copied "
-                "to the zipapp_dist directory. "
-            )
-        )
-        self.MSG_PARAM_DESC_EXCLUDE_FROM_PACKAGING = _wrap(
-            tr(
-                "Sometimes some files is required for packaging, but not necessary in the runtime. For example, a "
-                "requirements.txt is needed for if you want to installing the dependencies during the packaging "
-                "process, but it is not necessary in the runtime. This argument let you specify the patterns of files "
-                "and directories will be excluded from the target zipapp archive."
-            )
-        )
-        self.MSG_PARAM_DESC_HOST_PYTHON = _wrap(
-            tr(
-                "This argument specifies the Python interpreter to be used for pip-install during the packaging process."
-            )
-        )
-        self.MSG_PARAM_DESC_REQUIREMENTS = _wrap(
-            tr(
-                "This argument specifies the requirements file to be used for pip-install during the packaging process. "
-                "The requirements file should be located in the source directory. If it is omitted, zipapp-creator will try "
-                "to find a default requirements file named 'requirements.txt' in the source directory. If it is not found, "
-                "the pip-install process will be skipped."
-            )
-        )
-        self.MSG_PARAM_DESC_PIP_INDEX_URL = _wrap(
-            tr(
-                "This argument specifies the pip index url to be used for pip-install during the packaging process."
-                "If it is omitted, the pip-install process will use the default pip index url."
-            )
-        )
-        self.MSG_PARAM_DESC_CLEANUP_DEPENDENCIES = _wrap(
-            tr(
-                "This argument specifies whether to cleanup the dependencies after pip-install. If it is selected, "
-                "zipapp-creator will try to find and delete 'unnecessary' files and directories in the installed "
-                "dependencies, such as *.dist-info, __pycache__, etc., to reduce the size of the final zipapp archive."
-            )
-        )
-        self.MSG_PARAM_DESC_ENTRY = _wrap(
-            tr(
-                "This argument specifies the entry point of the zipapp. \n\n"
-                "If you are creating a non-self-extracting zipapp: \n"
-                "1) the entry point should be in the form of 'pkg.module:fn' or 'module:fn' or \n"
-                "2) just leave it empty if there is a __main__.py file in the source directory. \n\n"
-                "If you are creating a self-extracting zipapp: \n"
-                "1) the entry point should be the name of the main python file in the source directory and \n"
-                "2) there should be no __main__.py file in the source directory. "
-            )
-        )
-
-        self.MSG_CONFIRM_EXIT = tr("Are you sure you want to exit?")
-        self.MSG_CONFIRM_EXIT_TITLE = tr("Confirm Exit")
-
-        self.MSG_DOCUMENT_TAB_TITLE = tr("Description")
-        self.MSG_OUTPUT_TAB_TITLE = tr("Output")
-        self.MSG_START_BTN_TEXT = tr("Start")
-        self.MSG_CANCEL_BTN_TEXT = tr("Cancel")
-        self.MSG_CLEAR_BTN_TEXT = tr("Clear")
-        self.MSG_CLEAR_CHECKBOX_TEXT = tr("clear output before start")
-
-        self.MSG_LANGUAGE_FIELD = tr("Language")
-        self.MSG_CONFIRM_EXIT_FIELD = tr("Confirm Exit")
-        self.MSG_HDPI_MODE_FIELD = tr("High DPI Mode")
-
-        self.MSG_SETTINGS_SAVED = tr(
-            "Application settings has been saved! Some changes may require a restart of the program."
-        )
-        self.MSG_SAVE_SETTINGS_ERROR = tr("Failed to save application settings!")
+        self.tr = trfunc()
+
+    MSG_SAVE_PARAMS_TITLE = tr("Save Parameters")
+    MSG_LOAD_PARAMS_TITLE = tr("Load Parameters")
+    MSG_JSON_FILE_FILTER = tr("JSON Files")
+    MSG_ALL_FILES_FILTER = tr("All Files")
+    MSG_SAVE_PARAMS_SUCCESS = tr("Parameters saved to file: {}")
+    MSG_LOAD_PARAMS_SUCCESS = tr("Parameters loaded from file: {}")
+    MSG_SAVE_PARAMS_ERROR = tr("Failed to save parameters to file: {}")
+    MSG_LOAD_PARAMS_ERROR = tr("Failed to load parameters from file: {}")
+    MSG_INVALID_PARAMS_IN_FILE = tr("Invalid parameters in file: {}")
+    MSG_ABOUT_TITLE = tr("About")
+    MSG_LICENSE_TITLE = tr("License")
+    MSG_LICENSE_HINT = tr("This project is under the MIT license.")
+    MSG_EDIT_APP_CONFIG_HINT = tr(
+        "Changes to the configuration file will be take effect after restarting the program!"
+    )
+    MSG_ACTION_SAVE_PARAMS = tr("Save Parameters")
+    MSG_ACTION_LOAD_PARAMS = tr("Load Parameters")
+    MSG_ACTION_EXIT = tr("Exit")
+    MSG_ACTION_ALWAYS_ON_TOP = tr("Always on Top")
+    MSG_ACTION_ABOUT = tr("About")
+    MSG_ACTION_LICENSE = tr("License")
+    MSG_ACTION_SETTINGS = tr("Settings")
+    MSG_MENU_FILE = tr("File")
+    MSG_MENU_VIEW = tr("View")
+    MSG_MENU_HELP = tr("Help")
+    MSG_START_PACKAGING = tr("Start packaging...")
+    MSG_COPY_SOURCE_FILES = tr("Start copying source files to {}...")
+    MSG_PIP_INSTALL_FAILURE = tr("Failed to install dependencies: {}")
+    MSG_CREATING_ZIPAPP = tr("Start creating zipapp file {}...")
+    MSG_ZIPAPP_CREATED = tr("Zipapp file created: {}")
+    MSG_CREATING_STARTUP_SCRIPT = tr("Creating startup script for Windows os...")
+    MSG_STARTUP_SCRIPT_CREATED = tr("Startup script created: {}")
+    MSG_CREATE_ZIPAPP_FAILURE = tr("Failed to create zipapp file: {}")
+
+    MSG_SOURCE_DIR_REQUIRED = tr("Please specify the source directory!")
+    MSG_SOURCE_DIR_NOT_FOUND = tr("The source directory does not exist!")
+    MSG_MAIN_FILE_NOT_ALLOWED = tr(
+        "A __main__.py file is found in the source directory, "
+        "which is not allowed when creating a self-extracting zipapp!"
+    )
+    MSG_VALID_ENTRY_FILE_REQUIRED = tr(
+        "Please specify a valid entry file when creating a self-extracting zipapp!"
+    )
+    MSG_ENTRY_REQUIRED = tr(
+        "The entry must be specified(in the form of 'pkg.module:fn' or 'module:fn') "
+        "if there is no __main__.py file in the source directory!"
+    )
+    MSG_INVALID_ENTRY_FORMAT = tr(
+        "The entry should be in the form of 'pkg.module:fn' or 'module:fn', not a file path!"
+        "Or you can just leave it empty if there is a __main__.py file in the source directory!"
+    )
+    MSG_ENTRY_FUNCTION_NOT_FOUND = tr("Function '{}' was not found in module '{}'!")
+    MSG_ENTRY_FUNCTION_REQUIRES_ARGS = tr(
+        "Function '{}' in module '{}' cannot be called without arguments!"
+    )
+    MSG_ENTRY_MODULE_SYNTAX_ERROR = tr("Failed to parse module '{}': {}")
+    MSG_ENTRY_CANDIDATES = tr("Possible entry points: {}")
+    MSG_HOST_PYTHON_REQUIRED = tr(
+        "host python is not specified, it is required to execute the pip install command! "
+        "Use current python interpreter as host python."
+    )
+    MSG_REQUIREMENTS_FILE_NOT_FOUND = tr(
+        "The requirements file not found in the source directory!"
+    )
+    MSG_SCRIPT_PYTHON_REQUIRED = tr(
+        "Please specify the python command which will be used in the startup script for starting the "
+        "output zipapp."
+    )
+    MSG_CLEANUP_DEPENDENCIES = tr("Cleaning up dependencies...")
+    MSG_REMOVING = tr("Removing: {}")
+    MSG_CLEANUP_DEPENDENCIES_DONE = tr("Cleanup done!")
+
+    MSG_START_PIP_INSTALL = tr("Installing dependencies with pip...")
+    MSG_PIP_INSTALL_FAILURE = tr("Failed to install dependencies: {}")
+    MSG_PIP_INSTALL_SUCCESS = tr("Dependencies installed successfully!")
+    MSG_PIP_INSTALL_CANCELLED = tr("User cancelled the pip-install process!")
+    MSG_BUILD_CANCELLED = tr("Build cancelled by user.")
+    MSG_LAYER_CACHE_HIT = tr("Reusing cached dependency layer: {}")
+    MSG_LAYER_CREATED = tr("Dependency layer created: {}")
+    MSG_LAYER_INSTALLED = tr("Dependency layer placed at: {}")
+    MSG_LAYER_ENTRY_REQUIRED = tr(
+        "An entry point is required when using a dependency layer, "
+        "a custom __main__.py cannot load the layer!"
+    )
+    MSG_LAYER_SELF_EXTRACT_UNSUPPORTED = tr(
+        "Dependency layers are not supported by self-extracting targets!"
+    )
+
+    MSG_INVALID_EXTRA_TARGETS = tr("Invalid extra targets:")
+    MSG_DUPLICATE_TARGET = tr("The target name is already used!")
+    MSG_INVALID_COMMANDS = tr("Invalid commands:")
+    MSG_COMMANDS_SELF_EXTRACT_UNSUPPORTED = tr(
+        "Commands are not supported by self-extracting targets!"
+    )
+    MSG_COMMANDS_MAIN_FILE_CONFLICT = tr(
+        "A __main__.py file is found in the source directory, "
+        "which conflicts with the generated command dispatcher!"
+    )
+    MSG_INVALID_PLATFORM_MATRIX = tr("Invalid platform matrix:")
+    MSG_MATRIX_LAYER_UNSUPPORTED = tr(
+        "The platform matrix cannot be used with shared dependency layers!"
+    )
+    MSG_MATRIX_PREFLIGHT_FAILURE = tr(
+        "Dependencies cannot be resolved for some target platforms:"
+    )
+    MSG_MATRIX_TARGET_STAGING = tr("Preparing target platform {} in {}")
+    MSG_ZIP64_ARCHIVE = tr(
+        "{} uses Zip64 extensions (more than 65535 entries or larger than 4 GB), "
+        "it can only be run by Python 3.13 or newer!"
+    )
+    MSG_INVALID_SMOKE_TEST_ARGS = tr("Invalid smoke test arguments: {}")
+    MSG_SMOKE_TEST_MATRIX = tr(
+        "Smoke tests are not supported by platform matrix builds!"
+    )
+    MSG_INVALID_MEMORY_LIMIT = tr(
+        "The memory limit must be 0 (unlimited) or at least {} MB!"
+    )
+    MSG_DEPENDENCY_CONFLICT = tr(
+        "Dependency '{}' was not installed because the source directory already contains it."
+    )
+    MSG_STAGING_FALLBACK = tr(
+        "Staging strategy '{}' is not supported here, {} files were copied instead."
+    )
+    MSG_MINIFYING_SOURCE = tr("Minifying {} Python source files...")
+    MSG_MINIFY_DONE = tr("Minified {} files ({} from cache): {} -> {} bytes")
+    MSG_MINIFY_FILE_SKIPPED = tr("Not minified: {} ({})")
+    MSG_STRIPPING_BINARIES = tr(
+        "Stripping debug symbols from {} shared objects with {}..."
+    )
+    MSG_STRIP_DONE = tr(
+        "Stripped {} shared objects ({} from cache): {} -> {} bytes ({} bytes saved)"
+    )
+    MSG_STRIP_FILE_SKIPPED = tr("Not stripped: {} ({})")
+    MSG_STRIP_TOOL_NOT_FOUND = tr(
+        "Neither 'strip' nor 'objcopy' was found, shared objects are left unstripped."
+    )
+
+    MSG_BUILD_STAGES = tr("Build stages:")
+    MSG_BUILD_REPORT_SAVED = tr("Build report saved: {}")
+    MSG_PROFILE_SAVED = tr("Profile data saved to: {}")
+    MSG_PROFILE_HOTSPOTS = tr("Build hotspots:")
+    MSG_WRITE_PROFILE_FAILURE = tr("Failed to save profile data: {}")
+    MSG_WRITE_BUILD_REPORT_FAILURE = tr("Failed to write build report: {}")
+    MSG_PROGRESS_LOG_SAVED = tr("Progress log saved: {}")
+    MSG_WRITE_PROGRESS_LOG_FAILURE = tr("Failed to write progress log: {}")
+    MSG_ARCHIVE_ANALYSIS = tr("Archive analysis of {}:")
+    MSG_ARCHIVE_ANALYSIS_SAVED = tr("Archive analysis saved: {}")
+    MSG_ANALYZE_ARCHIVE_FAILURE = tr("Failed to analyze archive: {}")
+    MSG_TELEMETRY_NOT_EMBEDDED = tr(
+        "Telemetry was not embedded in {} because the source directory has its own __main__.py."
+    )
+    MSG_SMOKE_TEST_RUNNING = tr("Running smoke test of {}...")
+    MSG_SMOKE_TEST_PASSED = tr("Smoke test passed: {}")
+    MSG_SMOKE_TEST_FAILURE = tr("Smoke test failed: {} ({})")
+
+    MSG_WATCHING_SOURCE = tr(
+        "Watching for changes in {}... (click Cancel to stop watching)"
+    )
+    MSG_SOURCE_CHANGED = tr(
+        "Source changed: {} modified or added, {} removed, rebuilding..."
+    )
+    MSG_REQUIREMENTS_CHANGED = tr(
+        "Requirements file changed, running a full rebuild..."
+    )
+    MSG_WATCH_STOPPED = tr("Stopped watching source directory.")
+
+    MSG_PARAM_GROUP_MAIN = tr("Main")
+    MSG_PARAM_GROUP_EXCLUDE = tr("Exclude")
+    MSG_PARAM_GROUP_PACKAGING = tr("Packaging")
+    MSG_PARAM_GROUP_TARGETS = tr("Targets")
+    MSG_PARAM_GROUP_DIAGNOSTICS = tr("Diagnostics")
+
+    MSG_PARAM_SRC_DIR = tr("Source")
+    MSG_PARAM_TARGET = tr("Target")
+    MSG_PARAM_ENTRY = tr("Entry")
+    MSG_PARAM_SHEBANG = tr("Shebang")
+    MSG_PARAM_REQUIREMENTS = tr("Requirements")
+    MSG_PARAM_HOST_PYTHON = tr("Host Python")
+    MSG_PARAM_DEFLATE_COMPRESSION = tr("Deflate Compression")
+    MSG_PARAM_SELF_EXTRACTING = tr("Self-Extracting Mode")
+    MSG_PARAM_START_SCRIPT = tr("Start Script for Windows")
+    MSG_STRAT_SCRIPT_PYTHON = tr("Python for Start Script")
+    MSG_PARMA_EXCLUDE_FROM_COPY = tr("Exclude from Copy")
+    MSG_PARAM_EXCLUDE_FROM_PACKAGING = tr("Exclude from Packaging")
+    MSG_PARAM_PIP_INDEX_URL = tr("PIP Index URL")
+    MSG_PARMA_CLEANUP_DEPENDENCIES = tr("Cleanup dependencies after pip install")
+    MSG_PARAM_STRIP_BINARIES = tr("Strip Debug Symbols")
+    MSG_PARAM_WATCH = tr("Watch and Rebuild")
+    MSG_PARAM_DEPENDENCY_LAYER = tr("Dependencies as Shared Layer")
+    MSG_PARAM_EXTRA_TARGETS = tr("Extra Targets")
+    MSG_PARAM_COMMANDS = tr("Commands")
+    MSG_PARAM_PLATFORM_MATRIX = tr("Platform Matrix")
+    MSG_PARAM_MEMORY_LIMIT = tr("Memory Limit (MB)")
+    MSG_PARAM_STAGING = tr("Staging Strategy")
+    MSG_PARAM_COPY_WORKERS = tr("Copy Workers")
+    MSG_PARAM_MINIFY = tr("Minify Sources")
+    MSG_PARAM_MINIFY_STRIP_ASSERTS = tr("Strip Assert Statements")
+    MSG_PARAM_MINIFY_KEEP_LINE_NUMBERS = tr("Keep Line Numbers")
+    MSG_PARAM_MINIFY_KEEP = tr("Keep Unminified")
+    MSG_PARAM_BUILD_REPORT = tr("Build Report")
+    MSG_PARAM_CHROME_TRACE = tr("Chrome Trace")
+    MSG_PARAM_PROGRESS_LOG = tr("Progress Log")
+    MSG_PARAM_ANALYZE_ARCHIVE = tr("Analyze Archive")
+    MSG_PARAM_TELEMETRY = tr("Embed Telemetry")
+    MSG_PARAM_SMOKE_TEST = tr("Smoke Test")
+    MSG_PARAM_SMOKE_TEST_ARGS = tr("Smoke Test Arguments")
+    MSG_PARAM_SMOKE_TEST_TIMEOUT = tr("Smoke Test Timeout (s)")
+    MSG_PARAM_SMOKE_TEST_MAX_TIME = tr("Smoke Test Time Budget (ms)")
+    MSG_PARAM_SMOKE_TEST_MAX_RSS = tr("Smoke Test Memory Budget (MB)")
+
+    MSG_PARAM_DESC_SRC_DIR = _wrap(
+        tr(
+            "The name of a directory, in which case a new application "
+            "archive will be created from the content of that directory."
+        )
+    )
+    MSG_PARAM_DESC_TARGET = _wrap(
+        tr(
+            "This argument determines where the resulting archive "
+            "will be written. If this argument is omitted, the target "
+            "will be a file with the same name as the source, with a .pyz "
+            "extension added."
+        )
+    )
+    MSG_PARAM_DESC_SHEBANG = _wrap(
+        tr(
+            "This argument specifies the name of python interpreter "
+            "with which the archive will be executed. It is written as a "
+            "“shebang” line at the start of the archive. On POSIX, this will "
+            "be interpreted by the OS, and on Windows it will be handled "
+            "by the Python launcher. Omitting this argument results in no "
+            "shebang line being written. If an shebang is specified, "
+            "and the target is a filename, the executable bit of the target "
+            "file will be set."
+        )
+    )
+    MSG_PARAM_DESC_DEFLATE_COMPRESSION = _wrap(
+        tr(
+            "This argument determines whether files are compressed. If selected, "
+            "files in the archive are compressed with the deflate method; otherwise, "
+            "files are stored uncompressed."
+        )
+    )
+    MSG_PARAM_DESC_SELF_EXTRACTING = _wrap(
+        tr(
+            "This argument determines whether the resulting archive is 'self-extracting'. "
+            "A self-extracting archive contains a auto-generated python script as "
+            "the pre-entry point of the application. When executed, this script will be "
+            "executed first. This script does two things: firstly, it extracts the contents "
+            "of the archive to a temporary directory, and then executes the actual entry point file "
+            "you specified. If this argument is selected, you must specify a valid python script file "
+            "as the entry and make sure that there is no __main__.py file in the source directory. "
+            "If this argument is not selected, you need to provide an entry point in the form of "
+            "'pkg.module:fn' or 'module:fn', or just leave the entry point argument empty if "
+            "there is a __main__.py file in the source directory. An self-extracting archive "
+            "is very useful if you have c extensions in your dependencies."
+        )
+    )
+    MSG_PARAM_DESC_START_SCRIPT = _wrap(
+        tr(
+            "This argument determines whether a startup script will be created for Windows operating "
+            "system. The startup script will be a vbs file with the same name as the target archive, "
+            "For example, if the target archive is 'app.pyz', the startup script will be 'app.vbs'. "
+            "The startup script starts the output zipapp by using the python command you specified, and "
+            "it hides the console window which makes your zipapp look more like a native application. "
+            "If this argument is selected, you must specify the python command being used to execute the "
+            "output zipapp application. "
+        )
+    )
+    MSG_PARAM_DESC_SCRIPT_PYTHON = _wrap(
+        tr(
+            "This argument determines the python command to execute the output zipapp in the startup script. "
+            "For example, if you want to use python 3 to start the output zipapp, you can specify 'python3'."
+            "It is not recommented to specify an absolute path to the python interpreter, it may not work "
+            "in other machines. It is recommended to use 'python', 'python3', 'python.exe', etc., and make "
+            "sure the python interpreter is in the system PATH."
+        )
+    )
+    MSG_PARAM_DESC_EXCLUDE_FROM_COPY = _wrap(
+        tr(
+            "Everytime creating a new zipapp archive, the source directory will be copied to the `zipapp_dist` "
+            "directory to keep your source directory clean and uncompromised. This argument let you exclude the "
+            "files and directories you don't want to be copied to the `zipapp_dist` directory. For example, you "
+            "probably don't want the virtual environment directory(normally named venv or .venv) being copied "
+            "to the zipapp_dist directory. "
+        )
+    )
+    MSG_PARAM_DESC_EXCLUDE_FROM_PACKAGING = _wrap(
+        tr(
+            "Sometimes some files is required for packaging, but not necessary in the runtime. For example, a "
+            "requirements.txt is needed for if you want to installing the dependencies during the packaging "
+            "process, but it is not necessary in the runtime. This argument let you specify the patterns of files "
+            "and directories will be excluded from the target zipapp archive."
+        )
+    )
+    MSG_PARAM_DESC_HOST_PYTHON = _wrap(
+        tr(
+            "This argument specifies the Python interpreter to be used for pip-install during the packaging process."
+        )
+    )
+    MSG_PARAM_DESC_REQUIREMENTS = _wrap(
+        tr(
+            "This argument specifies the requirements file to be used for pip-install during the packaging process. "
+            "The requirements file should be located in the source directory. If it is omitted, zipapp-creator will try "
+            "to find a default requirements file named 'requirements.txt' in the source directory. If it is not found, "
+            "the pip-install process will be skipped."
+        )
+    )
+    MSG_PARAM_DESC_PIP_INDEX_URL = _wrap(
+        tr(
+            "This argument specifies the pip index url to be used for pip-install during the packaging process."
+            "If it is omitted, the pip-install process will use the default pip index url."
+        )
+    )
+    MSG_PARAM_DESC_CLEANUP_DEPENDENCIES = _wrap(
+        tr(
+            "This argument specifies whether to cleanup the dependencies after pip-install. If it is selected, "
+            "zipapp-creator will try to find and delete 'unnecessary' files and directories in the installed "
+            "dependencies, such as *.dist-info, __pycache__, etc., to reduce the size of the final zipapp archive."
+        )
+    )
+    MSG_PARAM_DESC_STRIP_BINARIES = _wrap(
+        tr(
+            "This argument specifies whether to strip debug symbols from the native extensions (ELF shared "
+            "objects, *.so) of the installed dependencies, using the system 'strip' or 'objcopy' tool. Only "
+            "debug sections are removed, so the extensions still load as before. Unstripped extensions are "
+            "often several times larger than stripped ones, which makes the archive larger and slower to "
+            "build and extract. Results are cached by file content. If neither tool is available, the files "
+            "are left unchanged."
+        )
+    )
+    MSG_PARAM_DESC_DEPENDENCY_LAYER = _wrap(
+        tr(
+            "This argument specifies whether to put the dependencies into a separate 'layer' archive "
+            "instead of the zipapp itself. The layer is named after its content (deps-<hash>.zip) and "
+            "placed in the 'layers' directory next to the zipapp, which finds it at runtime in that "
+            "directory, next to itself or in the directories listed in ZIPAPP_LAYERS_PATH, so several "
+            "apps with the same dependencies can share one layer. Layers are cached by the content of "
+            "the requirements file, rebuilds with unchanged requirements skip pip-install and packaging "
+            "of the dependencies. Not supported by self-extracting targets."
+        )
+    )
+    MSG_PARAM_DESC_WATCH = _wrap(
+        tr(
+            "This argument specifies whether to keep watching the source directory after the zipapp "
+            "is created. If it is selected, zipapp-creator polls the source directory (files matching "
+            "the 'Exclude from Copy' patterns are ignored) and rebuilds the zipapp whenever files change. "
+            "Only the changed files are copied and re-compressed, and pip-install is skipped unless the "
+            "requirements file changes. Click the Cancel button to stop watching."
+        )
+    )
+    MSG_PARAM_DESC_EXTRA_TARGETS = _wrap(
+        tr(
+            "This argument lets you create several zipapp archives from the same source in one run. "
+            "The source files are copied and the dependencies are installed only once, then all the "
+            "archives are created in parallel. Each item describes one extra target in the form of "
+            "'<target>; key=value; ...', where the key can be 'entry', 'shebang', 'compressed' or "
+            "'self_extract'. Options that are not specified are taken from the main parameters. For example: "
+            "'{SOURCE}-stored.pyz; compressed=false' or '{SOURCE}-se.pyz; self_extract=true; entry=main.py'."
+        )
+    )
+    MSG_PARAM_DESC_COMMANDS = _wrap(
+        tr(
+            "This argument turns the zipapp into a busybox-style multi-command archive. Each item declares "
+            "one command in the form of '<name>=<module>:<fn>', for example 'serve=app.cli:serve'. The "
+            "generated __main__.py picks the command by the name the archive is invoked as (e.g. a "
+            "symbolic link named 'serve' pointing to the archive) or by the first argument "
+            "('app.pyz serve --port 80'), otherwise it runs the entry (if any) or prints the list of "
+            "commands. All commands share one copy of the dependencies. Not supported by self-extracting "
+            "targets."
+        )
+    )
+    MSG_PARAM_DESC_PLATFORM_MATRIX = _wrap(
+        tr(
+            "This argument builds the zipapp once per target platform, with dependencies resolved for "
+            "that platform by pip (binary wheels only). Each item has the form of "
+            "'<suffix>; python_version=3.11; platform=manylinux2014_x86_64', with optional 'abi', "
+            "'implementation' and 'wheelhouse' (a local directory of wheels used instead of the index) "
+            "options. The suffix is appended to the archive names, e.g. 'app-py311-linux.pyz'. Wheel "
+            "availability is checked for all platforms before anything is installed; the platforms are "
+            "then staged and packaged in parallel. Cannot be used with shared dependency layers."
+        )
+    )
+    MSG_PARAM_DESC_MEMORY_LIMIT = _wrap(
+        tr(
+            "This argument limits the memory used to write the archives, in MB (0 means no limit). Files are "
+            "always streamed into the archives in fixed-size chunks, so very large files never need to fit "
+            "in memory; the limit decides how large the chunks are and how many targets are packaged at the "
+            "same time. Archives with more than 65535 entries or larger than 4 GB use Zip64 extensions, "
+            "which can only be run by Python 3.13 or newer."
+        )
+    )
+    MSG_PARAM_DESC_STAGING = _wrap(
+        tr(
+            "This argument specifies how the source files are placed into the staging directory "
+            "'zipapp_dist/<project>'. 'reflink' creates copy-on-write clones (btrfs, XFS with reflink and "
+            "other filesystems supporting FICLONE), so no data is copied. 'hardlink' creates hard links to "
+            "the source files; the build never modifies staged files in place, but the source files must not "
+            "be modified while a build is running. 'copy' always copies the files. 'auto' (default) uses "
+            "reflinks where supported and copies otherwise. Unsupported methods fall back to copying "
+            "automatically (e.g. when the staging directory is on another filesystem)."
+        )
+    )
+    MSG_PARAM_DESC_COPY_WORKERS = _wrap(
+        tr(
+            "This argument specifies how many threads copy the source files into the staging directory. "
+            "Copying in parallel hides the per-file latency of network filesystems (NFS, SMB), where copying "
+            "many small files one at a time is slow. 0 (default) chooses the number automatically, 1 copies "
+            "the files one at a time. Small projects are always copied one file at a time."
+        )
+    )
+    MSG_PARAM_DESC_MINIFY = _wrap(
+        tr(
+            "This argument specifies whether to minify the Python source files copied from the source "
+            "directory before packaging: docstrings, comments and trailing whitespace are removed. "
+            "Dependencies are never minified. Files are processed in parallel and the results are cached "
+            "by content, so unchanged files are not processed again. Files that cannot be parsed are "
+            "packaged as they are. Code that reads __doc__ at runtime (e.g. command line help built from "
+            "docstrings) should be listed in 'Keep Unminified'."
+        )
+    )
+    MSG_PARAM_DESC_MINIFY_STRIP_ASSERTS = _wrap(
+        tr(
+            "This argument specifies whether to remove assert statements as well when minifying the "
+            "source files, as 'python -O' would do."
+        )
+    )
+    MSG_PARAM_DESC_MINIFY_KEEP_LINE_NUMBERS = _wrap(
+        tr(
+            "This argument specifies whether the minified source files keep their original line numbers, "
+            "so that tracebacks point to the right lines of the original source. Removed code is replaced "
+            "by blank lines. When disabled, the code is regenerated from its syntax tree, which is smaller "
+            "but the line numbers no longer match the source."
+        )
+    )
+    MSG_PARAM_DESC_MINIFY_KEEP = _wrap(
+        tr(
+            "The files matching these patterns (glob patterns, relative to the source directory, same as "
+            "'Exclude from Packaging') are never minified."
+        )
+    )
+    MSG_PARAM_DESC_BUILD_REPORT = _wrap(
+        tr(
+            "This argument specifies whether to write a machine-readable build report next to the target "
+            "archive. The report is a JSON file named '<target>.build.json' which records the wall time, "
+            "CPU time, peak memory usage, the number of files and bytes processed and the throughput of each "
+            "stage of the build (copying, pip-install, cleanup, packaging filter and archive creation)."
+        )
+    )
+    MSG_PARAM_DESC_CHROME_TRACE = _wrap(
+        tr(
+            "This argument specifies whether to export the build stages as a Chrome trace file named "
+            "'<target>.trace.json' next to the target archive. The file can be opened with chrome://tracing "
+            "or https://ui.perfetto.dev to inspect the timeline of the build."
+        )
+    )
+    MSG_PARAM_DESC_PROGRESS_LOG = _wrap(
+        tr(
+            "This argument specifies whether to record the live progress of the build as JSON Lines in a file "
+            "named '<target>.progress.jsonl' next to the target archive. Each line is a progress event with "
+            "the stage name, the number of files and bytes done and expected, the throughput and the "
+            "estimated remaining time (the same information shown by the progress bar)."
+        )
+    )
+    MSG_PARAM_DESC_ANALYZE_ARCHIVE = _wrap(
+        tr(
+            "This argument specifies whether to analyze the created archives. The analysis reads the "
+            "central directory of each archive (without extracting it) and reports the compressed and "
+            "uncompressed size of each top-level package and file type, large entries that cannot be "
+            "compressed effectively, entries that are likely unused at runtime (tests, docs, C sources, "
+            "metadata) and the size changes since the previous build. The result is also saved as "
+            "'<target>.analysis.json' next to the archive."
+        )
+    )
+    MSG_PARAM_DESC_TELEMETRY = _wrap(
+        tr(
+            "This argument specifies whether to embed a small telemetry module in the archives, so that "
+            "performance problems of shipped apps can be diagnosed without rebuilding them. Telemetry is "
+            "off unless the environment variable ZIPAPP_TELEMETRY is set to a value other than 0, false, no or "
+            "off when the app runs; otherwise the module is never imported and costs nothing. When enabled, "
+            "the app records the time spent importing each module, the extraction time (self-extracting "
+            "archives) and a cProfile profile of the whole run, and writes them as "
+            "'<app>-telemetry-<time>-<pid>.json' and '.prof' files to the directory given by the environment "
+            "variable ZIPAPP_TELEMETRY_DIR (or the temporary directory if it is not set). Not available if the "
+            "source directory has its own __main__.py."
+        )
+    )
+    MSG_PARAM_DESC_SMOKE_TEST = _wrap(
+        tr(
+            "This argument specifies whether to run each created archive after the build, to check that it "
+            "actually starts. The archive is run by the host Python interpreter in isolated mode (-I), in a "
+            "new temporary directory that is also used as HOME, so the result does not depend on the local "
+            "environment. Self-extracting archives go through their complete extract-and-start path. The "
+            "exit status, run time, peak memory and the last lines of output are reported and saved as "
+            "'<target>.smoketest.json'. The build fails if the archive exits with a non-zero status, times "
+            "out or exceeds a budget. Not available for platform matrix builds."
+        )
+    )
+    MSG_PARAM_DESC_SMOKE_TEST_ARGS = _wrap(
+        tr(
+            "This argument specifies the command line arguments passed to the archive during the smoke "
+            "test, in shell syntax, e.g. '--version' or '--help'. Choose arguments that make the app exit "
+            "quickly without user interaction."
+        )
+    )
+    MSG_PARAM_DESC_SMOKE_TEST_TIMEOUT = _wrap(
+        tr(
+            "This argument specifies how many seconds the smoke test may run before it is terminated and "
+            "the build fails."
+        )
+    )
+    MSG_PARAM_DESC_SMOKE_TEST_MAX_TIME = _wrap(
+        tr(
+            "This argument specifies the time budget of the smoke test in milliseconds (0 means no budget). "
+            "The build fails if the archive takes longer to run, e.g. because a change made it start slower."
+        )
+    )
+    MSG_PARAM_DESC_SMOKE_TEST_MAX_RSS = _wrap(
+        tr(
+            "This argument specifies the memory budget of the smoke test in MB (0 means no budget). The "
+            "build fails if the peak resident memory of the archive (including the processes it started "
+            "and waited for) exceeds it. On Windows, only the memory of the archive process itself is measured."
+        )
+    )
+    MSG_PARAM_DESC_ENTRY = _wrap(
+        tr(
+            "This argument specifies the entry point of the zipapp. \n\n"
+            "If you are creating a non-self-extracting zipapp: \n"
+            "1) the entry point should be in the form of 'pkg.module:fn' or 'module:fn' or \n"
+            "2) just leave it empty if there is a __main__.py file in the source directory. \n\n"
+            "If you are creating a self-extracting zipapp: \n"
+            "1) the entry point should be the name of the main python file in the source directory and \n"
+            "2) there should be no __main__.py file in the source directory. "
+        )
+    )
+
+    MSG_CONFIRM_EXIT = tr("Are you sure you want to exit?")
+    MSG_CONFIRM_EXIT_TITLE = tr("Confirm Exit")
+
+    MSG_DOCUMENT_TAB_TITLE = tr("Description")
+    MSG_OUTPUT_TAB_TITLE = tr("Output")
+    MSG_START_BTN_TEXT = tr("Start")
+    MSG_CANCEL_BTN_TEXT = tr("Cancel")
+    MSG_CLEAR_BTN_TEXT = tr("Clear")
+    MSG_CLEAR_CHECKBOX_TEXT = tr("clear output before start")
+
+    MSG_LANGUAGE_FIELD = tr("Language")
+    MSG_CONFIRM_EXIT_FIELD = tr("Confirm Exit")
+    MSG_HDPI_MODE_FIELD = tr("High DPI Mode")
+    MSG_PROFILE_BUILD_FIELD = tr("Profile Builds")
+
+    MSG_SETTINGS_SAVED = tr(
+        "Application settings has been saved! Some changes may require a restart of the program."
+    )
+    MSG_SAVE_SETTINGS_ERROR = tr("Failed to save application settings!")
 
 
 _messages = None
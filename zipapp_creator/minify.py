@@ -0,0 +1,294 @@
+import ast
+import dataclasses
+import io
+import os
+import tokenize
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from .cache import ContentCache
+from .cancellation import check_cancelled, wait_cancellable
+from .progress import ProgressCallback
+from .staging import write_private
+
+# 需要重新处理的文件少于该数量时，直接在当前进程中处理（启动进程池的开销比处理本身还大）
+PROCESS_POOL_THRESHOLD = 32
+
+_MINIFY_VERSION = "1"
+# 这些字段中的语句列表可能因为移除文档字符串或assert语句而变为空
+_BODY_FIELDS = ("body", "orelse", "finalbody")
+
+
+@dataclasses.dataclass(frozen=True)
+class MinifyOptions(object):
+    strip_docstrings: bool = True
+    strip_asserts: bool = False
+    # 保留行号：被移除的语句与注释替换为空行，使回溯信息中的行号与源文件一致；
+    # 否则使用ast.unparse()重新生成代码（体积更小，但行号与源文件不再对应）
+    keep_line_numbers: bool = True
+
+    def cache_key(self) -> str:
+        return (
+            f"v{_MINIFY_VERSION}:{int(self.strip_docstrings)}"
+            f"{int(self.strip_asserts)}{int(self.keep_line_numbers)}"
+        )
+
+
+@dataclasses.dataclass
+class MinifyStats(object):
+    files: int = 0
+    cached_files: int = 0
+    kept_files: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+
+
+def _is_docstring(node: ast.AST) -> bool:
+    return (
+        isinstance(node, ast.Expr)
+        and isinstance(node.value, ast.Constant)
+        and isinstance(node.value.value, str)
+    )
+
+
+def _removable_statements(
+    tree: ast.Module, options: MinifyOptions
+) -> List[Tuple[ast.stmt, bool]]:
+    """
+    找出可以移除的语句，返回(语句, 是否需要替换为pass)。
+    语句列表中的语句全部被移除时（模块除外），第一条语句需要替换为pass。
+    """
+    removable = []
+    for node in ast.walk(tree):
+        has_docstring = isinstance(
+            node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)
+        )
+        for field in _BODY_FIELDS:
+            stmts = getattr(node, field, None)
+            if not isinstance(stmts, list) or not stmts:
+                continue
+            selected = []
+            for i, stmt in enumerate(stmts):
+                if (
+                    options.strip_docstrings
+                    and has_docstring
+                    and field == "body"
+                    and i == 0
+                    and _is_docstring(stmt)
+                ):
+                    selected.append(stmt)
+                elif options.strip_asserts and isinstance(stmt, ast.Assert):
+                    selected.append(stmt)
+            if not selected:
+                continue
+            needs_pass = len(selected) == len(stmts) and not isinstance(
+                node, ast.Module
+            )
+            removable.extend(
+                (stmt, needs_pass and i == 0) for i, stmt in enumerate(selected)
+            )
+    return removable
+
+
+def _minify_unparse(tree: ast.Module, options: MinifyOptions) -> bytes:
+    removed = {
+        id(stmt): needs_pass
+        for stmt, needs_pass in _removable_statements(tree, options)
+    }
+    for node in ast.walk(tree):
+        for field in _BODY_FIELDS:
+            stmts = getattr(node, field, None)
+            if not isinstance(stmts, list) or not stmts:
+                continue
+            kept = []
+            for stmt in stmts:
+                if id(stmt) not in removed:
+                    kept.append(stmt)
+                elif removed[id(stmt)]:
+                    kept.append(ast.Pass())
+            setattr(node, field, kept)
+    return (ast.unparse(tree) + "\n").encode("utf-8")
+
+
+def _remove_statement_lines(
+    source: bytes, tree: ast.Module, options: MinifyOptions
+) -> bytes:
+    # ast中的列偏移量是UTF-8字节偏移量，因此这里按字节处理
+    lines = source.splitlines(keepends=True)
+    for stmt, needs_pass in _removable_statements(tree, options):
+        first, last = stmt.lineno - 1, stmt.end_lineno - 1
+        head = lines[first][: stmt.col_offset]
+        tail = lines[last][stmt.end_col_offset :].strip()
+        # 只移除独占若干整行的语句（例如不处理`if x: assert y`或以分号分隔的语句）
+        if head.strip() or (tail and not tail.startswith(b"#")):
+            continue
+        for i in range(first, last + 1):
+            lines[i] = b"\n"
+        if needs_pass:
+            lines[first] = head + b"pass\n"
+    return b"".join(lines)
+
+
+def _strip_comments_and_whitespace(source: bytes) -> bytes:
+    text = source.decode("utf-8")
+    lines = text.splitlines()
+    comments: Dict[int, int] = {}
+    # 位于多行字符串（或其他跨行的token）中间的行，其行尾空白属于字符串的内容
+    protected: Set[int] = set()
+    for token in tokenize.generate_tokens(io.StringIO(text).readline):
+        (start_row, start_col), (end_row, _) = token.start, token.end
+        if token.type == tokenize.COMMENT:
+            comments[start_row - 1] = start_col
+        elif end_row > start_row and token.type not in (
+            tokenize.NEWLINE,
+            tokenize.NL,
+        ):
+            protected.update(range(start_row - 1, end_row - 1))
+    result = []
+    for i, line in enumerate(lines):
+        if i in protected:
+            result.append(line)
+            continue
+        if i in comments:
+            line = line[: comments[i]]
+        result.append(line.rstrip())
+    while result and not result[-1]:
+        result.pop()
+    return ("\n".join(result) + "\n").encode("utf-8") if result else b""
+
+
+def minify_source(
+    source: bytes, options: MinifyOptions, filename: str = "<unknown>"
+) -> bytes:
+    """
+    精简Python源代码：移除文档字符串、注释、行尾空白以及（可选的）assert语句。
+    源文件不是UTF-8编码、无法解析或精简后的代码无法编译时抛出异常。
+    """
+    encoding, _ = tokenize.detect_encoding(io.BytesIO(source).readline)
+    if encoding not in ("utf-8", "utf-8-sig"):
+        raise ValueError(f"unsupported encoding: {encoding}")
+    if source.startswith(b"\xef\xbb\xbf"):
+        source = source[3:]
+    tree = ast.parse(source, filename=filename)
+    if options.keep_line_numbers:
+        result = _remove_statement_lines(source, tree, options)
+        result = _strip_comments_and_whitespace(result)
+    else:
+        result = _minify_unparse(tree, options)
+    compile(result, filename, "exec", dont_inherit=True)
+    return result
+
+
+def _minify_job(args: Tuple[str, bytes, MinifyOptions]) -> Tuple[Optional[bytes], str]:
+    """进程池中执行的任务，返回(精简后的代码, 错误信息)"""
+    filename, source, options = args
+    try:
+        return minify_source(source, options, filename), ""
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def _run_in_pool(
+    jobs: List[Tuple[str, bytes, MinifyOptions]],
+    max_workers: int,
+    cancelled: Optional[Callable[[], bool]],
+    progress: Optional[ProgressCallback],
+) -> List[Tuple[Optional[bytes], str]]:
+    from concurrent.futures import ProcessPoolExecutor
+
+    executor = ProcessPoolExecutor(max_workers=max_workers)
+    try:
+        futures = [executor.submit(_minify_job, job) for job in jobs]
+        for _ in wait_cancellable(futures, cancelled):
+            if progress is not None:
+                progress(1, 0)
+        return [future.result() for future in futures]
+    finally:
+        # 取消时丢弃尚未开始的任务，不等待正在执行的任务（每个任务只处理一个文件）
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _run_jobs(
+    jobs: List[Tuple[str, bytes, MinifyOptions]],
+    max_workers: Optional[int],
+    cancelled: Optional[Callable[[], bool]] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> List[Tuple[Optional[bytes], str]]:
+    max_workers = max_workers or os.cpu_count() or 1
+    if len(jobs) >= PROCESS_POOL_THRESHOLD and max_workers > 1:
+        from concurrent.futures.process import BrokenProcessPool
+
+        try:
+            return _run_in_pool(jobs, max_workers, cancelled, progress)
+        except (OSError, BrokenProcessPool):
+            # 无法创建子进程时（例如受限的运行环境）退回到单进程处理
+            pass
+    results = []
+    for job in jobs:
+        check_cancelled(cancelled)
+        results.append(_minify_job(job))
+        if progress is not None:
+            progress(1, 0)
+    return results
+
+
+def minify_tree(
+    root: Union[str, Path],
+    paths: Iterable[str],
+    options: MinifyOptions,
+    cache: Optional[ContentCache] = None,
+    max_workers: Optional[int] = None,
+    cancelled: Optional[Callable[[], bool]] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> Tuple[MinifyStats, Dict[str, int], Dict[str, str]]:
+    """
+    原地精简root中的Python源文件（paths为相对于root的posix路径）。缓存命中的文件直接使用缓存的结果，
+    其余文件在进程池中并行处理。精简后的文件保留原来的修改时间与权限。
+    精简后的内容写入新的文件后替换原文件，因此root中的文件可以是源文件的硬链接。
+
+    返回(统计信息, 被修改的文件 -> 新的大小, 无法精简的文件 -> 原因)，无法精简的文件保持不变。
+    已请求取消时抛出OperationCancelled，此时所有文件保持不变（精简结果在全部处理完成之后才写回）。
+    progress（若指定）报告处理完成的文件数量（缓存命中的文件在读取时即视为完成）。
+    """
+    root = Path(root)
+    stats = MinifyStats()
+    sizes: Dict[str, int] = {}
+    failures: Dict[str, str] = {}
+    results: Dict[str, Tuple[bytes, Optional[bytes]]] = {}
+    pending: List[Tuple[str, bytes, str]] = []
+    for path in paths:
+        check_cancelled(cancelled)
+        source = (root / path).read_bytes()
+        key = ContentCache.key(source, options.cache_key())
+        cached = cache.get(key) if cache is not None else None
+        if cached is not None:
+            stats.cached_files += 1
+            results[path] = (source, cached)
+            if progress is not None:
+                progress(1, 0)
+        else:
+            pending.append((path, source, key))
+
+    jobs = [(path, source, options) for path, source, _ in pending]
+    for (path, source, key), (minified, err) in zip(
+        pending, _run_jobs(jobs, max_workers, cancelled, progress)
+    ):
+        if minified is None:
+            failures[path] = err
+            results[path] = (source, None)
+            continue
+        if cache is not None:
+            cache.put(key, minified)
+        results[path] = (source, minified)
+
+    for path, (source, minified) in results.items():
+        stats.files += 1
+        stats.bytes_before += len(source)
+        if minified is None or len(minified) >= len(source):
+            stats.kept_files += 1
+            stats.bytes_after += len(source)
+            continue
+        write_private(root / path, minified)
+        sizes[path] = len(minified)
+        stats.bytes_after += len(minified)
+    return stats, sizes, failures
@@ -0,0 +1,234 @@
+import dataclasses
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+# 旧式manylinux标签与glibc版本的对应关系（PEP 600）
+_LEGACY_MANYLINUX = {
+    "manylinux1": (2, 5),
+    "manylinux2010": (2, 12),
+    "manylinux2014": (2, 17),
+}
+# 这些平台的wheel可以安装在版本不低于其标签中版本的系统上
+_VERSIONED_PLATFORMS = ("manylinux", "musllinux", "macosx")
+_VERSIONED_PLATFORM_REGEX = re.compile(
+    r"^(?P<family>[a-z]+)_(?P<major>\d+)_(?P<minor>\d+)_(?P<arch>.+)$"
+)
+_LEGACY_PLATFORM_REGEX = re.compile(r"^(?P<family>manylinux\d+)_(?P<arch>.+)$")
+_REQUIREMENT_NAME_REGEX = re.compile(r"^([A-Za-z0-9][A-Za-z0-9._-]*)")
+_PYTHON_VERSION_REGEX = re.compile(r"^(\d)\.?(\d+)$")
+
+
+@dataclasses.dataclass(frozen=True)
+class MatrixTarget(object):
+    """
+    依赖矩阵中的一个目标平台，对应pip的--python-version、--platform、--abi、--implementation选项。
+    suffix用于区分不同目标平台的压缩包，例如`app-py311-manylinux.pyz`。
+    """
+
+    suffix: str
+    python_version: str
+    platforms: Tuple[str, ...] = ()
+    abi: str = ""
+    implementation: str = "cp"
+    # 本地wheelhouse目录，指定时pip以--no-index --find-links的方式离线安装
+    wheelhouse: str = ""
+
+    def pip_args(self) -> List[str]:
+        args = [
+            "--only-binary=:all:",
+            "--python-version",
+            self.python_version,
+            "--implementation",
+            self.implementation,
+        ]
+        for platform in self.platforms:
+            args.extend(["--platform", platform])
+        if self.abi:
+            args.extend(["--abi", self.abi])
+        if self.wheelhouse:
+            args.extend(["--no-index", "--find-links", self.wheelhouse])
+        return args
+
+    def _python_tag_ok(self, python_tag: str, abi_tag: str) -> bool:
+        major, minor = _parse_python_version(self.python_version)
+        impl = self.implementation
+        if abi_tag == "abi3":
+            # abi3的wheel可以在不低于其标签中版本的CPython上使用
+            m = re.match(rf"^{impl}(\d)(\d+)$", python_tag)
+            return (
+                impl == "cp"
+                and m is not None
+                and int(m.group(1)) == major
+                and int(m.group(2)) <= minor
+            )
+        if abi_tag == "none":
+            return python_tag in (
+                f"py{major}",
+                f"py{major}{minor}",
+                f"{impl}{major}",
+                f"{impl}{major}{minor}",
+            )
+        expected_abi = self.abi or f"{impl}{major}{minor}"
+        return python_tag == f"{impl}{major}{minor}" and abi_tag == expected_abi
+
+    def _platform_tag_ok(self, platform_tag: str) -> bool:
+        if platform_tag == "any":
+            return True
+        return any(_platform_compatible(platform_tag, p) for p in self.platforms)
+
+    def is_compatible(self, wheel_filename: str) -> bool:
+        tags = parse_wheel_tags(wheel_filename)
+        if tags is None:
+            return False
+        python_tags, abi_tags, platform_tags = tags
+        return any(
+            self._python_tag_ok(py, abi) and self._platform_tag_ok(plat)
+            for py in python_tags
+            for abi in abi_tags
+            for plat in platform_tags
+        )
+
+
+def _parse_python_version(version: str) -> Tuple[int, int]:
+    m = _PYTHON_VERSION_REGEX.match(version.strip())
+    if m is None:
+        raise ValueError(f"invalid python version: {version}")
+    return int(m.group(1)), int(m.group(2))
+
+
+def _parse_platform(tag: str) -> Tuple[str, Optional[Tuple[int, int]], str]:
+    m = _LEGACY_PLATFORM_REGEX.match(tag)
+    if m is not None and m.group("family") in _LEGACY_MANYLINUX:
+        return "manylinux", _LEGACY_MANYLINUX[m.group("family")], m.group("arch")
+    m = _VERSIONED_PLATFORM_REGEX.match(tag)
+    if m is not None and m.group("family") in _VERSIONED_PLATFORMS:
+        version = (int(m.group("major")), int(m.group("minor")))
+        return m.group("family"), version, m.group("arch")
+    return tag, None, ""
+
+
+def _platform_compatible(wheel_platform: str, target_platform: str) -> bool:
+    if wheel_platform == target_platform:
+        return True
+    family, version, arch = _parse_platform(wheel_platform)
+    target_family, target_version, target_arch = _parse_platform(target_platform)
+    if version is None or target_version is None or family != target_family:
+        return False
+    if arch != target_arch and not (
+        family == "macosx"
+        and arch == "universal2"
+        and target_arch in ("x86_64", "arm64")
+    ):
+        return False
+    return version <= target_version
+
+
+def parse_wheel_tags(
+    filename: str,
+) -> Optional[Tuple[List[str], List[str], List[str]]]:
+    """解析wheel文件名中的(python标签, abi标签, 平台标签)，文件名不合法时返回None"""
+    if not filename.endswith(".whl"):
+        return None
+    parts = filename[:-4].split("-")
+    if len(parts) not in (5, 6):
+        return None
+    python_tag, abi_tag, platform_tag = parts[-3:]
+    return python_tag.split("."), abi_tag.split("."), platform_tag.split(".")
+
+
+def normalize_name(name: str) -> str:
+    return re.sub(r"[-_.]+", "_", name).lower()
+
+
+def requirement_names(requirements: Union[str, Path]) -> List[str]:
+    """
+    返回requirements文件中直接列出的包名。选项（以“-”开头的行）、URL与本地路径会被忽略。
+    """
+    names = []
+    with open(requirements, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.split(" #", 1)[0].strip()
+            if not line or line.startswith(("#", "-")):
+                continue
+            if "://" in line or "/" in line or "\\" in line:
+                continue
+            m = _REQUIREMENT_NAME_REGEX.match(line)
+            if m is not None:
+                names.append(m.group(1))
+    return names
+
+
+def check_wheelhouse(target: MatrixTarget, requirements: Union[str, Path]) -> List[str]:
+    """
+    检查本地wheelhouse中是否为requirements文件中直接列出的每个包提供了与目标平台兼容的wheel。
+    只检查文件名中的标签（不需要启动pip），返回发现的问题，全部兼容时返回空列表。
+    间接依赖要到pip解析依赖时才能检查。
+    """
+    wheels: Dict[str, List[str]] = {}
+    wheelhouse = Path(target.wheelhouse)
+    if not wheelhouse.is_dir():
+        return [f"wheelhouse not found: {wheelhouse.as_posix()}"]
+    for wheel in wheelhouse.glob("*.whl"):
+        name = normalize_name(wheel.name.split("-", 1)[0])
+        wheels.setdefault(name, []).append(wheel.name)
+    problems = []
+    for name in requirement_names(requirements):
+        candidates = wheels.get(normalize_name(name), [])
+        if not candidates:
+            problems.append(f"{name}: no wheel found in {wheelhouse.as_posix()}")
+        elif not any(target.is_compatible(c) for c in candidates):
+            problems.append(
+                f"{name}: no wheel compatible with {target.suffix} "
+                f"(found: {', '.join(sorted(candidates))})"
+            )
+    return problems
+
+
+def parse_matrix_target(spec: str) -> MatrixTarget:
+    """
+    解析依赖矩阵中的目标平台，格式为：`<suffix>; key=value; ...`，其中key可以是python_version（必须）、
+    platform（多个平台以逗号分隔）、abi、implementation、wheelhouse。例如：
+
+    `py311-manylinux; python_version=3.11; platform=manylinux2014_x86_64`
+    """
+    parts = [part.strip() for part in spec.split(";")]
+    suffix = parts[0]
+    if not suffix or any(c in suffix for c in "/\\{}") or suffix.startswith("."):
+        raise ValueError(f"invalid suffix: {suffix!r}")
+    fields = {}
+    for part in parts[1:]:
+        if not part:
+            continue
+        key, sep, value = part.partition("=")
+        key, value = key.strip(), value.strip()
+        if not sep:
+            raise ValueError(f"invalid option: {part}")
+        if key == "python_version":
+            _parse_python_version(value)
+            fields[key] = value
+        elif key == "platform":
+            fields["platforms"] = tuple(
+                p.strip() for p in value.split(",") if p.strip()
+            )
+        elif key in ("abi", "implementation", "wheelhouse"):
+            fields[key] = value
+        else:
+            raise ValueError(f"unknown option: {key}")
+    if "python_version" not in fields:
+        raise ValueError("python_version is required")
+    return MatrixTarget(suffix=suffix, **fields)
+
+
+def parse_matrix(specs: Iterable[str]) -> List[MatrixTarget]:
+    targets = []
+    suffixes = set()
+    for spec in specs:
+        if not spec.strip():
+            continue
+        target = parse_matrix_target(spec)
+        if target.suffix in suffixes:
+            raise ValueError(f"duplicate suffix: {target.suffix}")
+        suffixes.add(target.suffix)
+        targets.append(target)
+    return targets
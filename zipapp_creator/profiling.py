@@ -0,0 +1,92 @@
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, TypeVar, Union
+
+DEFAULT_TOP_N = 30
+DEFAULT_SORT_KEY = "tottime"
+
+_T = TypeVar("_T")
+
+
+class BuildProfiler(object):
+    """
+    使用cProfile对一次构建过程进行性能分析，并将结果保存为`<output_dir>/<timestamp>.prof`，
+    该文件可以使用pstats、snakeviz等工具查看。
+
+    cProfile只能分析调用它的线程，因此在分析期间启动的线程（例如并行打包多个目标时的工作线程）
+    会各自使用一个独立的Profile对象，最后再将所有结果合并。
+    """
+
+    def __init__(
+        self,
+        output_dir: Union[str, Path],
+        top: int = DEFAULT_TOP_N,
+        sort_key: str = DEFAULT_SORT_KEY,
+    ):
+        self._output_dir = Path(output_dir)
+        self._top = top
+        self._sort_key = sort_key
+        self._lock = threading.Lock()
+        self._thread_profilers: List[cProfile.Profile] = []
+        self._stats: Optional[pstats.Stats] = None
+        self.profile_file: Optional[Path] = None
+        self.dump_error: Optional[Exception] = None
+
+    def _thread_hook(self, frame, event, arg):
+        _ = frame, event, arg
+        sys.setprofile(None)
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+中cProfile基于sys.monitoring实现，同一时间只能启用一个分析器，
+            # 此时主分析器本身即可覆盖所有线程
+            return
+        with self._lock:
+            self._thread_profilers.append(profiler)
+
+    def run(self, func: Callable[..., _T], *args, **kwargs) -> _T:
+        """
+        运行func并对其进行性能分析，无论func是否抛出异常，分析结果都会被保存。
+        保存失败时不会抛出异常，而是将异常记录在dump_error中。
+        """
+        profiler = cProfile.Profile()
+        threading.setprofile(self._thread_hook)
+        try:
+            return profiler.runcall(func, *args, **kwargs)
+        finally:
+            threading.setprofile(None)
+            with self._lock:
+                thread_profilers = list(self._thread_profilers)
+            self._stats = pstats.Stats(profiler)
+            if thread_profilers:
+                self._stats.add(*thread_profilers)
+            try:
+                self.profile_file = self._dump()
+            except OSError as e:
+                self.dump_error = e
+
+    def _dump(self) -> Path:
+        self._output_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = time.strftime("%Y%m%d-%H%M%S")
+        profile_file = self._output_dir / f"{timestamp}.prof"
+        index = 1
+        while profile_file.exists():
+            profile_file = self._output_dir / f"{timestamp}-{index}.prof"
+            index += 1
+        self._stats.dump_stats(profile_file)
+        return profile_file
+
+    def summary(self) -> str:
+        """返回耗时最多的前N个函数"""
+        if self._stats is None:
+            return ""
+        stream = io.StringIO()
+        self._stats.stream = stream
+        self._stats.strip_dirs().sort_stats(self._sort_key).print_stats(self._top)
+        return stream.getvalue().strip("\n")
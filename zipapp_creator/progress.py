@@ -0,0 +1,213 @@
+import dataclasses
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable, Optional, TextIO, Union
+
+# 同一阶段两次进度事件之间的最小间隔（秒），开始与结束事件不受限制
+EVENT_INTERVAL = 0.1
+# 状态行的最小刷新间隔（秒）
+STATUS_LINE_INTERVAL = 0.5
+
+# 底层函数（拷贝、打包等）报告进度的回调，参数为新完成的文件数量与字节数（增量）
+ProgressCallback = Callable[[int, int], None]
+
+
+@dataclasses.dataclass(frozen=True)
+class ProgressEvent(object):
+    stage: str
+    files_done: int = 0
+    files_total: int = 0
+    bytes_done: int = 0
+    bytes_total: int = 0
+    elapsed: float = 0.0
+    finished: bool = False
+
+    @property
+    def fraction(self) -> Optional[float]:
+        """完成的比例，总量未知时为None。有字节总数时按字节计算，否则按文件数量计算"""
+        if self.finished:
+            return 1.0
+        if self.bytes_total > 0:
+            return min(1.0, self.bytes_done / self.bytes_total)
+        if self.files_total > 0:
+            return min(1.0, self.files_done / self.files_total)
+        return None
+
+    @property
+    def rate(self) -> float:
+        """每秒处理的字节数"""
+        if self.elapsed <= 0:
+            return 0.0
+        return self.bytes_done / self.elapsed
+
+    @property
+    def eta(self) -> Optional[float]:
+        """预计的剩余时间（秒），无法估计时为None"""
+        fraction = self.fraction
+        if fraction is None or fraction <= 0 or self.elapsed <= 0:
+            return None
+        return self.elapsed * (1 - fraction) / fraction
+
+    def to_dict(self) -> dict:
+        data = dataclasses.asdict(self)
+        data.update(fraction=self.fraction, rate=self.rate, eta=self.eta)
+        return data
+
+    def format(self) -> str:
+        from .instrument import format_size
+
+        parts = [self.stage]
+        if self.files_total > 0:
+            parts.append(f"{self.files_done}/{self.files_total} files")
+        elif self.files_done:
+            parts.append(f"{self.files_done} files")
+        if self.bytes_total > 0:
+            parts.append(
+                f"{format_size(self.bytes_done)}/{format_size(self.bytes_total)}"
+            )
+        if self.rate > 0:
+            parts.append(f"{format_size(self.rate)}/s")
+        if self.finished:
+            parts.append(f"done in {self.elapsed:.1f}s")
+        elif self.eta is not None:
+            parts.append(f"ETA {self.eta:.0f}s")
+        return ", ".join(parts)
+
+
+ProgressListener = Callable[[ProgressEvent], None]
+
+
+class StageProgress(object):
+    """
+    记录一个阶段的进度并（节流后）发送给监听器。可以在多个线程中调用advance()。
+    """
+
+    def __init__(
+        self,
+        stage: str,
+        listener: ProgressListener,
+        interval: float = EVENT_INTERVAL,
+    ):
+        self._stage = stage
+        self._listener = listener
+        self._interval = interval
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self._last_emit = 0.0
+        self._files_done = 0
+        self._files_total = 0
+        self._bytes_done = 0
+        self._bytes_total = 0
+        self._finished = False
+
+    def _event(self, now: float) -> ProgressEvent:
+        return ProgressEvent(
+            stage=self._stage,
+            files_done=self._files_done,
+            files_total=self._files_total,
+            bytes_done=self._bytes_done,
+            bytes_total=self._bytes_total,
+            elapsed=now - self._start,
+            finished=self._finished,
+        )
+
+    def _emit(self, force: bool = False):
+        now = time.perf_counter()
+        with self._lock:
+            if not force and now - self._last_emit < self._interval:
+                return
+            self._last_emit = now
+            event = self._event(now)
+        self._listener(event)
+
+    def start(self):
+        self._emit(force=True)
+
+    def expect(self, files: int = 0, bytes: int = 0):
+        """设置（或增加）阶段的总量，通常由快照计算得到"""
+        with self._lock:
+            self._files_total += files
+            self._bytes_total += bytes
+        self._emit(force=True)
+
+    def advance(self, files: int = 0, bytes: int = 0):
+        with self._lock:
+            self._files_done += files
+            self._bytes_done += bytes
+        self._emit()
+
+    def finish(self):
+        with self._lock:
+            if self._finished:
+                return
+            self._finished = True
+        self._emit(force=True)
+
+
+def broadcast(listeners: Iterable[Optional[ProgressListener]]) -> ProgressListener:
+    """把进度事件依次转发给多个监听器（忽略其中的None）"""
+    listeners = [listener for listener in listeners if listener is not None]
+
+    def _broadcast(event: ProgressEvent):
+        for listener in listeners:
+            listener(event)
+
+    return _broadcast
+
+
+class StatusLinePrinter(object):
+    """
+    将进度事件输出为（节流后的）单行状态。输出到终端时原地刷新同一行，否则每次输出一行。
+    """
+
+    def __init__(
+        self, stream: Optional[TextIO] = None, interval: float = STATUS_LINE_INTERVAL
+    ):
+        self._stream = stream or sys.stderr
+        self._interval = interval
+        self._lock = threading.Lock()
+        self._last_print = 0.0
+        self._width = 0
+        isatty = getattr(self._stream, "isatty", None)
+        self._inplace = bool(isatty and isatty())
+
+    def __call__(self, event: ProgressEvent):
+        now = time.perf_counter()
+        with self._lock:
+            if not event.finished and now - self._last_print < self._interval:
+                return
+            self._last_print = now
+            line = event.format()
+            if self._inplace:
+                padding = " " * max(0, self._width - len(line))
+                self._width = 0 if event.finished else len(line)
+                end = "\n" if event.finished else ""
+                self._stream.write(f"\r{line}{padding}{end}")
+            else:
+                self._stream.write(f"{line}\n")
+            self._stream.flush()
+
+
+class JsonLinesWriter(object):
+    """将每个进度事件（附带时间戳）以JSON Lines格式写入文件，每行一个事件"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = open(self.path, "w", encoding="utf-8")
+
+    def __call__(self, event: ProgressEvent):
+        line = json.dumps({"time": time.time(), **event.to_dict()}, ensure_ascii=False)
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
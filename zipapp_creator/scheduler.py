@@ -0,0 +1,80 @@
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from .cancellation import OperationCancelled
+
+# 阶段函数接收已完成的阶段的结果（阶段名 -> 返回值），返回本阶段的结果
+StageFunc = Callable[[Dict[str, Any]], Any]
+
+
+class StageFailed(RuntimeError):
+    """某个阶段失败，stage为阶段名，error（同时也是__cause__）为原始异常"""
+
+    def __init__(self, stage: str, error: BaseException):
+        super().__init__(f"{stage}: {error}")
+        self.stage = stage
+        self.error = error
+
+
+class StageGraph(object):
+    """
+    简单的阶段调度器：阶段及其依赖关系构成有向无环图，依赖全部完成的阶段立即在线程池中开始执行，
+    因此相互独立的阶段（例如安装依赖与拷贝源文件）可以同时进行，总耗时取决于最长的路径而不是所有阶段之和。
+
+    某个阶段失败后不再启动新的阶段，等待正在执行的阶段结束后抛出StageFailed；
+    若失败的原因是取消（OperationCancelled），则直接抛出该异常。
+    """
+
+    def __init__(self):
+        self._stages: Dict[str, Tuple[StageFunc, Tuple[str, ...]]] = {}
+
+    def add(self, name: str, func: StageFunc, after: Iterable[str] = ()):
+        """添加阶段，after中的阶段必须已经添加（因此不会出现环）"""
+        after = tuple(after)
+        if name in self._stages:
+            raise ValueError(f"duplicate stage: {name}")
+        for dependency in after:
+            if dependency not in self._stages:
+                raise ValueError(f"unknown dependency of {name}: {dependency}")
+        self._stages[name] = (func, after)
+
+    def _ready(self, started: set, results: Dict[str, Any]) -> Iterable[str]:
+        for name, (_, after) in self._stages.items():
+            if name not in started and all(d in results for d in after):
+                yield name
+
+    def run(self, max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """执行所有阶段，返回每个阶段的结果"""
+        from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+        results: Dict[str, Any] = {}
+        started = set()
+        running = {}
+        failure: Optional[Tuple[str, BaseException]] = None
+        max_workers = max_workers or max(1, len(self._stages))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while True:
+                if failure is None:
+                    for name in list(self._ready(started, results)):
+                        started.add(name)
+                        func = self._stages[name][0]
+                        running[executor.submit(func, dict(results))] = name
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        # 取消优先于其他错误：其余阶段通常也会因为取消而失败
+                        if failure is None or (
+                            isinstance(e, OperationCancelled)
+                            and not isinstance(failure[1], OperationCancelled)
+                        ):
+                            failure = (name, e)
+        if failure is not None:
+            name, error = failure
+            if isinstance(error, OperationCancelled):
+                raise error
+            raise StageFailed(name, error) from error
+        return results
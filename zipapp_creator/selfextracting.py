@@ -1,33 +1,47 @@
 import random
 from pathlib import Path
 from string import Template
-from typing import Union
+from typing import Tuple, Union
+
+from .telemetry import ENV_TELEMETRY, ENV_TELEMETRY_EXTRACT_TIME, TELEMETRY_OFF_VALUES
 
 STARTUP_SCRIPT_TEMPLATE = Template(
     """
 # THIS FILE IS AUTOMATICALLY GENERATED BY zipapp-creator
 # DO NOT MODIFY IT MANUALLY!!!
+import os
 import shutil
 import subprocess
 import sys
+import time
 from pathlib import Path
 from tempfile import TemporaryDirectory
 from zipfile import ZipFile
 
+TELEMETRY_SCRIPT = "${telemetry_script}"
+
 
 def main():
     with TemporaryDirectory() as temp_dir:
         temp_dir = Path(temp_dir)
         #print(f"Extracting files to {temp_dir.absolute()}")
         self_path = sys.argv[0]
+        started = time.perf_counter()
         with ZipFile(self_path, "r") as zip_file:
             zip_file.extractall(temp_dir)
+        extract_time = time.perf_counter() - started
         sys.path.append(temp_dir.absolute().as_posix())
         main_script = "${main_script}"
         main_script = (temp_dir / main_script).absolute().as_posix()
         try:
             cmd = [sys.executable, main_script]
-            subprocess.run(cmd, check=True)
+            env = None
+            telemetry = os.environ.get("${telemetry_env}", "").strip().lower()
+            if TELEMETRY_SCRIPT and telemetry not in ${telemetry_off_values}:
+                telemetry_script = (temp_dir / TELEMETRY_SCRIPT).absolute().as_posix()
+                cmd = [sys.executable, telemetry_script, main_script]
+                env = dict(os.environ, ${extract_time_env}=str(extract_time))
+            subprocess.run(cmd, check=True, env=env)
         except BaseException as e:
             print(f"Error: {e}", file=sys.stderr)
             sys.exit(-1)
@@ -41,17 +55,27 @@ def main():
 
 
 def create_startup_script(
-    target_dir: Union[str, Path], main_script: Union[str, Path]
-) -> Path:
+    target_dir: Union[str, Path],
+    main_script: Union[str, Path],
+    telemetry_script: str = "",
+) -> Tuple[str, str]:
+    """
+    生成自解压启动脚本，返回(脚本文件名, 脚本内容)。脚本不会写入target_dir，而是在打包时
+    直接写入压缩包中，因此同一个目录可以同时用于打包多个不同的目标。
+    若指定了telemetry_script（压缩包内的遥测模块），则启用了ZIPAPP_TELEMETRY时通过它运行main_script，
+    并把解压耗时传给它。
+    """
     target_dir = Path(target_dir)
     main_script = target_dir / main_script
     startup_script_name = "__startup__.py"
     if (target_dir / startup_script_name).exists():
         startup_script_name = f"__startup{hex(random.randint(999, 999999))[2:]}__.py"
-    startup_script = target_dir / startup_script_name
     main_script_rel = main_script.relative_to(target_dir).as_posix()
     startup_script_content = STARTUP_SCRIPT_TEMPLATE.substitute(
-        main_script=main_script_rel
+        main_script=main_script_rel,
+        telemetry_script=telemetry_script,
+        telemetry_env=ENV_TELEMETRY,
+        telemetry_off_values=repr(TELEMETRY_OFF_VALUES),
+        extract_time_env=ENV_TELEMETRY_EXTRACT_TIME,
     )
-    startup_script.write_text(startup_script_content, encoding="utf-8")
-    return startup_script
+    return startup_script_name, startup_script_content
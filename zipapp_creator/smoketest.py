@@ -0,0 +1,209 @@
+import collections
+import dataclasses
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple, Union
+
+from .cancellation import check_cancelled
+from .instrument import format_size, peak_working_set
+
+SMOKE_TEST_VERSION = 1
+# 记录的输出（标准输出与标准错误输出合并）的最后若干行
+OUTPUT_TAIL_LINES = 20
+_POLL_INTERVAL = 0.01
+
+
+@dataclasses.dataclass(frozen=True)
+class SmokeTestBudget(object):
+    """冒烟测试的预算，0表示不限制"""
+
+    # 从启动到退出的最长时间（秒）
+    max_time: float = 0.0
+    # 常驻内存峰值的上限（字节）
+    max_rss: int = 0
+
+
+@dataclasses.dataclass
+class SmokeTestResult(object):
+    archive: str
+    command: List[str]
+    # 超时（被终止）时为None
+    exit_code: Optional[int] = None
+    timed_out: bool = False
+    # 从启动到退出的时间（秒）
+    elapsed: float = 0.0
+    # 常驻内存峰值（字节），无法获取时为0
+    peak_rss: int = 0
+    output_tail: List[str] = dataclasses.field(default_factory=list)
+    # 不满足的预算（或其他失败原因），为空表示通过
+    violations: List[str] = dataclasses.field(default_factory=list)
+
+    @property
+    def passed(self) -> bool:
+        return not self.violations
+
+    def check(self, budget: SmokeTestBudget):
+        """根据退出状态与预算填充violations"""
+        violations = []
+        if self.timed_out:
+            violations.append(f"timed out after {self.elapsed:.1f}s")
+        elif self.exit_code != 0:
+            violations.append(f"exit code {self.exit_code}")
+        if budget.max_time > 0 and self.elapsed > budget.max_time:
+            violations.append(
+                f"time {self.elapsed:.3f}s exceeds budget {budget.max_time:.3f}s"
+            )
+        if budget.max_rss > 0 and self.peak_rss > budget.max_rss:
+            violations.append(
+                f"peak RSS {format_size(self.peak_rss)} exceeds budget "
+                f"{format_size(budget.max_rss)}"
+            )
+        self.violations = violations
+
+    def to_dict(self) -> dict:
+        data = dataclasses.asdict(self)
+        data.update(version=SMOKE_TEST_VERSION, passed=self.passed)
+        return data
+
+    def write_json(self, path: Union[str, Path]):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+
+    def summary_lines(self) -> List[str]:
+        status = "timeout" if self.timed_out else f"exit code {self.exit_code}"
+        lines = [
+            f"{status}, {self.elapsed:.3f}s, peak RSS "
+            f"{format_size(self.peak_rss) if self.peak_rss else 'n/a'}"
+        ]
+        lines.extend(f"| {line}" for line in self.output_tail)
+        return lines
+
+
+def _isolated_env(home: str) -> dict:
+    """以临时目录作为HOME（以及各个XDG目录）的环境变量，避免读取或写入用户的配置与缓存"""
+    env = dict(os.environ)
+    env.update(
+        HOME=home,
+        USERPROFILE=home,
+        XDG_CONFIG_HOME=os.path.join(home, ".config"),
+        XDG_CACHE_HOME=os.path.join(home, ".cache"),
+        XDG_DATA_HOME=os.path.join(home, ".local", "share"),
+    )
+    if sys.platform == "win32":
+        env.update(
+            APPDATA=os.path.join(home, "AppData", "Roaming"),
+            LOCALAPPDATA=os.path.join(home, "AppData", "Local"),
+        )
+    return env
+
+
+def _kill(process: subprocess.Popen):
+    # 自解压模式下启动脚本还会启动子进程，因此终止整个进程组
+    if sys.platform != "win32":
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+            return
+        except OSError:
+            pass
+    if process.returncode is None:
+        process.kill()
+
+
+def _wait(process: subprocess.Popen, timeout: float) -> Tuple[Optional[int], int]:
+    """
+    等待进程在timeout秒内结束，返回(退出码, 常驻内存峰值)，尚未结束时退出码为None。
+    POSIX下通过wait4()获取子进程（及其已结束的子进程）的内存峰值，Windows下读取进程的PeakWorkingSetSize。
+    """
+    if sys.platform == "win32":
+        try:
+            exit_code = process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            return None, 0
+        return exit_code, peak_working_set(int(process._handle))
+
+    deadline = time.perf_counter() + timeout
+    while True:
+        pid, status, rusage = os.wait4(process.pid, os.WNOHANG)
+        if pid != 0:
+            process.returncode = os.waitstatus_to_exitcode(status)
+            # Linux下ru_maxrss的单位为KB，macOS下为字节
+            max_rss = rusage.ru_maxrss
+            peak = max_rss if sys.platform == "darwin" else max_rss * 1024
+            return process.returncode, peak
+        if time.perf_counter() >= deadline:
+            return None, 0
+        time.sleep(_POLL_INTERVAL)
+
+
+def run_smoke_test(
+    python: str,
+    archive: Union[str, Path],
+    args: List[str],
+    timeout: float,
+    budget: Optional[SmokeTestBudget] = None,
+    cancelled: Optional[Callable[[], bool]] = None,
+) -> SmokeTestResult:
+    """
+    在隔离的解释器（-I：忽略PYTHON*环境变量与用户site-packages，不把当前目录加入sys.path）中运行压缩包，
+    工作目录与HOME都是一个新的临时目录（运行结束后删除），因此结果不受本机环境的影响。
+    自解压模式的压缩包同样直接运行，即测试完整的解压、启动过程。
+
+    超过timeout秒仍未结束时终止进程（及其子进程）。已请求取消时终止进程并抛出OperationCancelled。
+    """
+    archive = Path(archive).absolute()
+    command = [python, "-I", archive.as_posix(), *args]
+    result = SmokeTestResult(archive=archive.as_posix(), command=command)
+    tail = collections.deque(maxlen=OUTPUT_TAIL_LINES)
+    with tempfile.TemporaryDirectory(prefix="zipapp-smoke-") as home:
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            command,
+            cwd=home,
+            env=_isolated_env(home),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            universal_newlines=True,
+            errors="replace",
+            start_new_session=sys.platform != "win32",
+        )
+
+        def _read_output():
+            for line in process.stdout:
+                tail.append(line.rstrip("\n"))
+
+        reader = threading.Thread(target=_read_output, daemon=True)
+        reader.start()
+        try:
+            # 分段等待，以便及时响应取消
+            deadline = start + timeout
+            while True:
+                remaining = deadline - time.perf_counter()
+                exit_code, peak = _wait(process, max(0.0, min(remaining, 0.1)))
+                if exit_code is not None:
+                    result.elapsed = time.perf_counter() - start
+                    result.exit_code, result.peak_rss = exit_code, peak
+                    break
+                check_cancelled(cancelled)
+                if remaining <= 0:
+                    result.elapsed = time.perf_counter() - start
+                    result.timed_out = True
+                    break
+        finally:
+            # 除了超时的进程，压缩包启动之后没有结束的子进程也一并终止（否则它们会一直占用输出管道）
+            _kill(process)
+            if process.returncode is None:
+                process.wait()
+            reader.join(timeout=1.0)
+            if not reader.is_alive():
+                process.stdout.close()
+    result.output_tail = list(tail)
+    result.check(budget or SmokeTestBudget())
+    return result
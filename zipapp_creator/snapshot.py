@@ -0,0 +1,301 @@
+import fnmatch
+import os
+import re
+import shutil
+import stat
+from array import array
+from pathlib import Path
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Pattern,
+    Set,
+    Tuple,
+    Union,
+)
+
+from .cancellation import check_cancelled
+
+
+class TreeSnapshot(object):
+    """
+    目录树的不可变快照：记录目录中所有条目（包括子目录）的相对路径（posix格式）、大小、修改时间与模式。
+
+    大小、修改时间与模式使用array紧凑存储。一次构建中，每个阶段边界只需扫描一次磁盘，
+    之后的拷贝、过滤、打包、清理等步骤都可以直接使用快照，而不必再次遍历目录
+    （在网络文件系统上，大量的stat调用开销很大）。
+
+    条目按照先序遍历（同一目录下按名称排序）的顺序存储，目录总是出现在其子条目之前。
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        paths: Iterable[str] = (),
+        sizes: Iterable[int] = (),
+        mtimes: Iterable[int] = (),
+        modes: Iterable[int] = (),
+    ):
+        self._root = Path(root)
+        self._paths: Tuple[str, ...] = tuple(paths)
+        self._sizes = array("q", sizes)
+        self._mtimes = array("q", mtimes)
+        self._modes = array("L", modes)
+        self._index: Optional[Dict[str, int]] = None
+        if not (
+            len(self._paths)
+            == len(self._sizes)
+            == len(self._mtimes)
+            == len(self._modes)
+        ):
+            raise ValueError("paths, sizes, mtimes and modes must have the same length")
+
+    @classmethod
+    def capture(
+        cls,
+        root_dir: Union[str, Path],
+        ignore_patterns: Iterable[str] = (),
+        cancelled: Optional[Callable[[], bool]] = None,
+    ) -> "TreeSnapshot":
+        """
+        扫描目录树并生成快照。ignore_patterns的语义与shutil.copytree(ignore=shutil.ignore_patterns(...))
+        相同，因此源目录的快照与copy_source_tree()实际拷贝的文件一致。
+        与copytree一样，符号链接会被解析（记录的是其指向的文件或目录）。
+        每扫描一个目录检查一次cancelled，已请求取消时抛出OperationCancelled。
+        """
+        root_dir = os.path.normpath(Path(root_dir).absolute().as_posix())
+        ignore_patterns = list(ignore_patterns)
+        ignore = shutil.ignore_patterns(*ignore_patterns) if ignore_patterns else None
+        paths, sizes, mtimes, modes = [], array("q"), array("q"), array("L")
+
+        def _scan(current_dir: str, rel_dir: str):
+            check_cancelled(cancelled)
+            try:
+                with os.scandir(current_dir) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except OSError:
+                return
+            ignored = ignore(current_dir, [e.name for e in entries]) if ignore else ()
+            for entry in entries:
+                if entry.name in ignored:
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    # 例如失效的符号链接
+                    continue
+                rel_path = f"{rel_dir}{entry.name}"
+                paths.append(rel_path)
+                sizes.append(st.st_size)
+                mtimes.append(st.st_mtime_ns)
+                modes.append(st.st_mode)
+                if stat.S_ISDIR(st.st_mode):
+                    _scan(entry.path, rel_path + "/")
+
+        _scan(root_dir, "")
+        return cls(root_dir, paths, sizes, mtimes, modes)
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._paths)
+
+    def __contains__(self, path: str) -> bool:
+        return self._lookup(path) is not None
+
+    def _lookup(self, path: str) -> Optional[int]:
+        if self._index is None:
+            self._index = {p: i for i, p in enumerate(self._paths)}
+        return self._index.get(path, None)
+
+    def _require(self, path: str) -> int:
+        index = self._lookup(path)
+        if index is None:
+            raise FileNotFoundError(f"not in snapshot: {path}")
+        return index
+
+    def is_dir(self, path: str) -> bool:
+        index = self._lookup(path)
+        return index is not None and stat.S_ISDIR(self._modes[index])
+
+    def is_file(self, path: str) -> bool:
+        index = self._lookup(path)
+        return index is not None and not stat.S_ISDIR(self._modes[index])
+
+    def size(self, path: str) -> int:
+        return self._sizes[self._require(path)]
+
+    def mtime_ns(self, path: str) -> int:
+        return self._mtimes[self._require(path)]
+
+    def mode(self, path: str) -> int:
+        return self._modes[self._require(path)]
+
+    def entries(self) -> Iterator[Tuple[str, bool]]:
+        """依次返回(相对路径, 是否为目录)"""
+        for path, mode in zip(self._paths, self._modes):
+            yield path, stat.S_ISDIR(mode)
+
+    def files(self) -> Iterator[Tuple[str, int, int]]:
+        """依次返回所有文件的(相对路径, 大小, 修改时间)"""
+        for i, path in enumerate(self._paths):
+            if not stat.S_ISDIR(self._modes[i]):
+                yield path, self._sizes[i], self._mtimes[i]
+
+    def total_size(self) -> int:
+        return sum(size for _, size, _ in self.files())
+
+    def totals(
+        self, include: Optional[Callable[[str], bool]] = None
+    ) -> Tuple[int, int]:
+        """返回（满足include条件的）文件数量与总字节数，用于预先计算进度的总量"""
+        files = total_bytes = 0
+        for path, size, _ in self.files():
+            if include is None or include(path):
+                files += 1
+                total_bytes += size
+        return files, total_bytes
+
+    def rebase(self, root: Union[str, Path]) -> "TreeSnapshot":
+        """返回内容相同但根目录不同的快照，例如源目录被完整拷贝到另一个目录之后"""
+        return TreeSnapshot(root, self._paths, self._sizes, self._mtimes, self._modes)
+
+    def with_sizes(self, sizes: Dict[str, int]) -> "TreeSnapshot":
+        """返回更新了部分文件大小之后的快照，例如文件被原地改写（但保留了修改时间）之后"""
+        if not sizes:
+            return self
+        new_sizes = array("q", self._sizes)
+        for path, size in sizes.items():
+            new_sizes[self._require(path)] = size
+        return TreeSnapshot(
+            self._root, self._paths, new_sizes, self._mtimes, self._modes
+        )
+
+    def without(self, paths: Iterable[str]) -> "TreeSnapshot":
+        """返回移除了paths（及其下所有子条目）之后的快照"""
+        removed = set(paths)
+        if not removed:
+            return self
+        keep = [
+            i for i, path in enumerate(self._paths) if not _is_removed(path, removed)
+        ]
+        return TreeSnapshot(
+            self._root,
+            (self._paths[i] for i in keep),
+            (self._sizes[i] for i in keep),
+            (self._mtimes[i] for i in keep),
+            (self._modes[i] for i in keep),
+        )
+
+    def _top_level_ranges(self) -> Iterator[Tuple[str, int, int]]:
+        # 先序遍历保证每个顶层条目及其子条目在快照中是连续的
+        start, current = 0, None
+        for i, path in enumerate(self._paths):
+            top = path.split("/", 1)[0]
+            if top != current:
+                if current is not None:
+                    yield current, start, i
+                start, current = i, top
+        if current is not None:
+            yield current, start, len(self._paths)
+
+    def top_level(self) -> List[str]:
+        """返回顶层条目的名称"""
+        return [name for name, _, _ in self._top_level_ranges()]
+
+    def merge(self, other: "TreeSnapshot") -> "TreeSnapshot":
+        """
+        返回合并了other中的条目之后的快照（根目录不变），例如把另一个目录中的内容移动到本目录之后。
+        两者都有的顶层条目保留本快照中的版本。合并后的快照仍按先序遍历的顺序存储。
+        """
+        ranges = {
+            name: (other, start, end) for name, start, end in other._top_level_ranges()
+        }
+        ranges.update(
+            (name, (self, start, end)) for name, start, end in self._top_level_ranges()
+        )
+        paths, sizes, mtimes, modes = [], array("q"), array("q"), array("L")
+        for name in sorted(ranges):
+            snapshot, start, end = ranges[name]
+            paths.extend(snapshot._paths[start:end])
+            sizes.extend(snapshot._sizes[start:end])
+            mtimes.extend(snapshot._mtimes[start:end])
+            modes.extend(snapshot._modes[start:end])
+        return TreeSnapshot(self._root, paths, sizes, mtimes, modes)
+
+    def glob(self, pattern: str) -> List[str]:
+        """
+        返回与Path(root).rglob(pattern)相同的匹配结果（相对路径），但不访问磁盘。
+        与pathlib一样，以“/”结尾的pattern只匹配目录，“**”匹配零个或多个目录。
+        """
+        parts, dirs_only = _split_pattern(pattern)
+        matchers = ["**", *(_compile_part(part) for part in parts)]
+        matched = []
+        if len(parts) == 1 and parts[0] != "**":
+            # 最常见的情况（例如"*.pyc"、"build/"）：只需要匹配最后一个路径分量
+            regex = matchers[1]
+            for path, is_dir in self.entries():
+                if dirs_only and not is_dir:
+                    continue
+                if regex.match(path[path.rfind("/") + 1 :]) is not None:
+                    matched.append(path)
+            return matched
+        for path, is_dir in self.entries():
+            if dirs_only and not is_dir:
+                continue
+            if _match_parts(matchers, path.split("/")):
+                matched.append(path)
+        return matched
+
+
+def _is_removed(path: str, removed: Set[str]) -> bool:
+    if path in removed:
+        return True
+    index = path.rfind("/")
+    while index > 0:
+        if path[:index] in removed:
+            return True
+        index = path.rfind("/", 0, index)
+    return False
+
+
+def _split_pattern(pattern: str) -> Tuple[List[str], bool]:
+    pattern = pattern.replace("\\", "/")
+    parts = [part for part in pattern.split("/") if part and part != "."]
+    if not parts:
+        raise ValueError(f"unacceptable pattern: {pattern!r}")
+    dirs_only = pattern.endswith("/") or parts[-1] == "**"
+    return parts, dirs_only
+
+
+def _compile_part(part: str) -> Union[str, Pattern]:
+    if part == "**":
+        return part
+    # 与pathlib一样，在Windows上不区分大小写
+    flags = re.IGNORECASE if os.path.normcase("A") == "a" else 0
+    return re.compile(fnmatch.translate(part), flags)
+
+
+def _match_parts(matchers: List[Union[str, Pattern]], parts: List[str]) -> bool:
+    if not matchers:
+        return not parts
+    head = matchers[0]
+    if head == "**":
+        # “**”只能匹配目录，因此不能吞掉最后一个路径分量（除非它本身就是最后一个匹配项）
+        if len(matchers) == 1:
+            return True
+        return any(_match_parts(matchers[1:], parts[i:]) for i in range(len(parts)))
+    return (
+        bool(parts)
+        and head.match(parts[0]) is not None
+        and _match_parts(matchers[1:], parts[1:])
+    )
@@ -0,0 +1,174 @@
+import errno
+import os
+import shutil
+import sys
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional, Set, Union
+
+from .cancellation import check_cancelled
+from .progress import ProgressCallback
+
+STAGING_AUTO = "auto"
+STAGING_REFLINK = "reflink"
+STAGING_HARDLINK = "hardlink"
+STAGING_COPY = "copy"
+STAGING_STRATEGIES = (STAGING_AUTO, STAGING_REFLINK, STAGING_HARDLINK, STAGING_COPY)
+
+# linux/fs.h: _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+
+# 大于该大小的文件分块拷贝，以便在拷贝过程中响应取消、报告进度
+CHUNKED_COPY_THRESHOLD = 8 * 1024 * 1024
+COPY_CHUNK_SIZE = 1024 * 1024
+# 文件数量少于该值时，并行拷贝的线程开销超过收益，仍然逐个拷贝
+PARALLEL_COPY_THRESHOLD = 64
+
+# 这些错误表示文件系统（或平台）不支持该操作，出现后不再对其余文件尝试该操作
+_UNSUPPORTED_ERRNOS = {
+    errno.EXDEV,
+    errno.EOPNOTSUPP,
+    errno.ENOTSUP,
+    errno.EINVAL,
+    errno.ENOTTY,
+    errno.ENOSYS,
+    errno.EPERM,
+    errno.EACCES,
+}
+# 这些错误只与单个文件有关（例如硬链接数量达到上限），该文件退回到拷贝
+_FILE_ERRNOS = {errno.EMLINK}
+
+
+def _fallback_chain(strategy: str):
+    if strategy == STAGING_HARDLINK:
+        return STAGING_HARDLINK, STAGING_COPY
+    if strategy in (STAGING_AUTO, STAGING_REFLINK):
+        return STAGING_REFLINK, STAGING_COPY
+    if strategy == STAGING_COPY:
+        return (STAGING_COPY,)
+    raise ValueError(f"unknown staging strategy: {strategy}")
+
+
+def reflink_file(src: Union[str, Path], dst: Union[str, Path]):
+    """
+    通过FICLONE（btrfs、启用了reflink的XFS等）创建src的写时复制副本，只复制元数据，不复制数据。
+    不支持时抛出OSError，此时不会留下dst。
+    """
+    if not sys.platform.startswith("linux"):
+        raise OSError(errno.ENOTSUP, "reflink is only supported on Linux")
+    import fcntl
+
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        except OSError:
+            fdst.close()
+            os.unlink(dst)
+            raise
+    shutil.copystat(src, dst)
+
+
+def copy_file(
+    src: Union[str, Path],
+    dst: Union[str, Path],
+    size: int,
+    cancelled: Optional[Callable[[], bool]] = None,
+    progress: Optional[ProgressCallback] = None,
+):
+    """
+    与shutil.copy2()相同，但大文件分块拷贝，每拷贝一块检查一次cancelled并报告进度。
+    通过progress报告拷贝的字节数（不包括文件数量）。
+    """
+    if (cancelled is None and progress is None) or size < CHUNKED_COPY_THRESHOLD:
+        shutil.copy2(src, dst)
+        if progress is not None:
+            progress(0, size)
+        return
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        while True:
+            check_cancelled(cancelled)
+            chunk = fsrc.read(COPY_CHUNK_SIZE)
+            if not chunk:
+                break
+            fdst.write(chunk)
+            if progress is not None:
+                progress(0, len(chunk))
+    shutil.copystat(src, dst)
+
+
+class Stager(object):
+    """
+    按照暂存策略把文件放入暂存目录：
+
+    - reflink：创建写时复制副本，失败时退回到拷贝；
+    - hardlink：创建硬链接，失败时（例如跨文件系统）退回到拷贝。暂存目录中的文件与源文件共享数据，
+      因此不能原地修改暂存目录中的文件：应使用write_private()写入，或先删除再重新暂存；
+    - copy：拷贝文件；
+    - auto：与reflink相同，文件系统不支持reflink时退化为普通拷贝，因此总是安全的。
+
+    某种方式因文件系统不支持而失败后，同一个Stager不再尝试该方式。可以在多个线程中使用。
+    """
+
+    def __init__(self, strategy: str = STAGING_AUTO):
+        self.strategy = strategy
+        self._chain = _fallback_chain(strategy)
+        self._lock = threading.Lock()
+        self._disabled: Set[str] = set()
+        # 每种方式暂存的文件数量
+        self.counts: Dict[str, int] = {}
+
+    def _try(self, method: str, src: str, dst: str) -> bool:
+        try:
+            if method == STAGING_REFLINK:
+                reflink_file(src, dst)
+            else:
+                os.link(src, dst)
+        except OSError as e:
+            if e.errno in _UNSUPPORTED_ERRNOS:
+                with self._lock:
+                    self._disabled.add(method)
+                return False
+            if e.errno in _FILE_ERRNOS:
+                return False
+            raise
+        return True
+
+    def stage(
+        self,
+        src: Union[str, Path],
+        dst: Union[str, Path],
+        size: int,
+        cancelled: Optional[Callable[[], bool]] = None,
+        progress: Optional[ProgressCallback] = None,
+    ) -> str:
+        """把src放到dst（dst不能已存在），返回实际使用的方式，通过progress报告字节数"""
+        for method in self._chain:
+            if method == STAGING_COPY:
+                copy_file(src, dst, size, cancelled, progress)
+                break
+            if method in self._disabled or not self._try(method, src, dst):
+                continue
+            if progress is not None:
+                progress(0, size)
+            break
+        with self._lock:
+            self.counts[method] = self.counts.get(method, 0) + 1
+        return method
+
+
+def write_private(path: Union[str, Path], content: bytes):
+    """
+    写入文件内容，保留原来的权限与修改时间。先写入临时文件再替换原文件，
+    因此不会修改与path共享数据的其他文件（硬链接）。
+    """
+    path = Path(path)
+    st = path.stat()
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        tmp.write_bytes(content)
+        os.chmod(tmp, st.st_mode)
+        os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
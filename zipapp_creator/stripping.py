@@ -0,0 +1,183 @@
+import dataclasses
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from .cache import ContentCache
+from .cancellation import check_cancelled, wait_cancellable
+from .progress import ProgressCallback
+from .staging import write_private
+
+_STRIP_VERSION = "1"
+_ELF_MAGIC = b"\x7fELF"
+# e_type（位于ELF头的第16个字节）为ET_DYN时表示共享对象
+_ET_DYN = 3
+
+
+@dataclasses.dataclass(frozen=True)
+class StripTool(object):
+    """剥离调试信息的工具：name为工具名称（strip或objcopy），path为可执行文件的路径"""
+
+    name: str
+    path: str
+
+    def command(self, src: str, dst: str) -> List[str]:
+        # 只移除调试信息（.debug_*等），不移除动态链接所需的符号
+        if self.name == "objcopy":
+            return [self.path, "--strip-debug", src, dst]
+        return [self.path, "--strip-debug", "-o", dst, src]
+
+    def cache_key(self) -> str:
+        """以工具的路径、大小与修改时间标识工具，升级工具之后缓存自动失效"""
+        try:
+            st = os.stat(self.path)
+            return f"v{_STRIP_VERSION}:{self.name}:{self.path}:{st.st_size}:{st.st_mtime_ns}"
+        except OSError:
+            return f"v{_STRIP_VERSION}:{self.name}:{self.path}"
+
+
+@dataclasses.dataclass
+class StripStats(object):
+    files: int = 0
+    cached_files: int = 0
+    kept_files: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_before - self.bytes_after
+
+
+def find_strip_tool() -> Optional[StripTool]:
+    """查找系统中的strip（优先）或objcopy，都不存在时返回None"""
+    for name in ("strip", "objcopy"):
+        path = shutil.which(name)
+        if path:
+            return StripTool(name, path)
+    return None
+
+
+def is_shared_object_name(path: str) -> bool:
+    """根据文件名判断是否可能是共享对象（foo.so、foo.cpython-311-x86_64-linux-gnu.so、libfoo.so.1等）"""
+    name = path.rsplit("/", 1)[-1]
+    return name.endswith(".so") or ".so." in name
+
+
+def is_elf_shared_object(path: Union[str, Path]) -> bool:
+    """根据ELF头判断文件是否为ELF共享对象"""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(18)
+    except OSError:
+        return False
+    if len(header) < 18 or not header.startswith(_ELF_MAGIC):
+        return False
+    # EI_DATA：1为小端，2为大端
+    byteorder = "big" if header[5] == 2 else "little"
+    return int.from_bytes(header[16:18], byteorder) == _ET_DYN
+
+
+def strip_file(tool: StripTool, src: Union[str, Path], work_dir: str) -> bytes:
+    """用tool剥离src的调试信息，返回剥离后的内容，src保持不变。工具执行失败时抛出RuntimeError"""
+    fd, dst = tempfile.mkstemp(suffix=".so", dir=work_dir)
+    os.close(fd)
+    try:
+        result = subprocess.run(
+            tool.command(os.fspath(src), dst),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            universal_newlines=True,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(
+                result.stdout.strip() or f"{tool.name} exited with {result.returncode}"
+            )
+        return Path(dst).read_bytes()
+    finally:
+        os.unlink(dst)
+
+
+def strip_tree(
+    root: Union[str, Path],
+    paths: Iterable[str],
+    tool: StripTool,
+    cache: Optional[ContentCache] = None,
+    max_workers: Optional[int] = None,
+    cancelled: Optional[Callable[[], bool]] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> Tuple[StripStats, Dict[str, int], Dict[str, str]]:
+    """
+    原地剥离root中ELF共享对象的调试信息（paths为相对于root的posix路径，不是ELF共享对象的文件被忽略）。
+    缓存命中的文件直接使用缓存的结果，其余文件在线程池中并行调用tool（每个文件一个子进程）。
+    剥离后的文件保留原来的修改时间与权限，剥离后没有变小的文件保持不变。
+
+    返回(统计信息, 被修改的文件 -> 新的大小, 无法剥离的文件 -> 原因)，无法剥离的文件保持不变。
+    已请求取消时抛出OperationCancelled，此时所有文件保持不变（剥离结果在全部处理完成之后才写回）。
+    progress（若指定）报告处理完成的文件数量与（处理前的）字节数。
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    root = Path(root)
+    stats = StripStats()
+    sizes: Dict[str, int] = {}
+    failures: Dict[str, str] = {}
+    results: Dict[str, Tuple[bytes, Optional[bytes]]] = {}
+    pending: Dict[str, Tuple[bytes, str]] = {}
+    for path in paths:
+        check_cancelled(cancelled)
+        if not is_elf_shared_object(root / path):
+            continue
+        content = (root / path).read_bytes()
+        key = ContentCache.key(content, tool.cache_key())
+        cached = cache.get(key) if cache is not None else None
+        if cached is not None:
+            stats.cached_files += 1
+            results[path] = (content, cached)
+            if progress is not None:
+                progress(1, len(content))
+        else:
+            pending[path] = (content, key)
+
+    if pending:
+        max_workers = max_workers or os.cpu_count() or 1
+        with tempfile.TemporaryDirectory() as work_dir, ThreadPoolExecutor(
+            max_workers=max_workers
+        ) as executor:
+            futures = {
+                executor.submit(strip_file, tool, root / path, work_dir): path
+                for path in pending
+            }
+            try:
+                for future in wait_cancellable(futures, cancelled):
+                    path = futures[future]
+                    content, key = pending[path]
+                    try:
+                        stripped = future.result()
+                    except (OSError, RuntimeError) as e:
+                        failures[path] = str(e)
+                        stripped = None
+                    if stripped is not None and cache is not None:
+                        cache.put(key, stripped)
+                    results[path] = (content, stripped)
+                    if progress is not None:
+                        progress(1, len(content))
+            finally:
+                # 取消时丢弃尚未开始的任务（正在执行的子进程各自只处理一个文件）
+                for future in futures:
+                    future.cancel()
+
+    for path, (content, stripped) in results.items():
+        stats.files += 1
+        stats.bytes_before += len(content)
+        if stripped is None or len(stripped) >= len(content):
+            stats.kept_files += 1
+            stats.bytes_after += len(content)
+            continue
+        write_private(root / path, stripped)
+        sizes[path] = len(stripped)
+        stats.bytes_after += len(stripped)
+    return stats, sizes, failures
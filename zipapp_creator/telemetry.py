@@ -0,0 +1,166 @@
+from string import Template
+from typing import Tuple
+
+# 设置该环境变量后，生成的压缩包在运行时记录性能数据。值为空或0（false、no、off）时视为未设置
+ENV_TELEMETRY = "ZIPAPP_TELEMETRY"
+# 性能数据的输出目录，未设置时输出到临时目录
+ENV_TELEMETRY_DIR = "ZIPAPP_TELEMETRY_DIR"
+# 自解压模式下，启动脚本通过该环境变量把解压耗时（秒）传给实际运行程序的子进程
+ENV_TELEMETRY_EXTRACT_TIME = "ZIPAPP_TELEMETRY_EXTRACT_TIME"
+TELEMETRY_MODULE = "__zipapp_telemetry__"
+# 表示关闭遥测的环境变量值（不区分大小写）
+TELEMETRY_OFF_VALUES = ("", "0", "false", "no", "off")
+# 报告中列出的（按累计耗时排序的）函数与导入的数量
+TELEMETRY_TOP_ENTRIES = 50
+
+TELEMETRY_TEMPLATE = Template("""\
+# THIS FILE IS AUTOMATICALLY GENERATED BY zipapp-creator
+# DO NOT MODIFY IT MANUALLY!!!
+# Only imported when ${env_var} is enabled (see __main__.py), so it costs nothing otherwise.
+import atexit
+import builtins
+import cProfile
+import json
+import os
+import pstats
+import sys
+import tempfile
+import threading
+import time
+
+TOP_ENTRIES = ${top_entries}
+
+_started = time.perf_counter()
+_started_at = time.time()
+_original_import = builtins.__import__
+_local = threading.local()
+_imports = []
+_profiler = None
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    loaded = len(sys.modules)
+    stack.append(0.0)
+    start = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = time.perf_counter() - start
+        nested = stack.pop()
+        if stack:
+            stack[-1] += elapsed
+        # only imports that actually loaded modules are interesting
+        if len(sys.modules) > loaded:
+            _imports.append(("." * level + name, elapsed, elapsed - nested))
+
+
+def _output_dir():
+    return os.environ.get("${env_dir}", "").strip() or tempfile.gettempdir()
+
+
+def _report():
+    stats = pstats.Stats(_profiler)
+    functions = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+    imports = sorted(_imports, key=lambda item: item[1], reverse=True)
+    extract_time = os.environ.get("${env_extract_time}", "")
+    return {
+        "app": os.path.abspath(sys.argv[0]) if sys.argv and sys.argv[0] else "",
+        "argv": sys.argv[1:],
+        "pid": os.getpid(),
+        "python": sys.version,
+        "platform": sys.platform,
+        "started_at": _started_at,
+        "total_time": time.perf_counter() - _started,
+        "extract_time": float(extract_time) if extract_time else None,
+        "import_time": sum(self_time for _, _, self_time in _imports),
+        "imports": [
+            {"name": name, "cumulative": cumulative, "self": self_time}
+            for name, cumulative, self_time in imports[:TOP_ENTRIES]
+        ],
+        "functions": [
+            {
+                "function": "%s:%d(%s)" % key,
+                "calls": calls,
+                "total_time": total_time,
+                "cumulative_time": cumulative_time,
+            }
+            for key, (_, calls, total_time, cumulative_time, _) in functions[
+                :TOP_ENTRIES
+            ]
+        ],
+    }
+
+
+def _write():
+    _profiler.disable()
+    builtins.__import__ = _original_import
+    try:
+        out_dir = _output_dir()
+        os.makedirs(out_dir, exist_ok=True)
+        name = os.path.splitext(os.path.basename(sys.argv[0] or "app"))[0] or "app"
+        base = os.path.join(
+            out_dir,
+            "%s-telemetry-%s-%d" % (name, time.strftime("%Y%m%d-%H%M%S"), os.getpid()),
+        )
+        # the .prof file can be opened by pstats, snakeviz, etc.
+        _profiler.dump_stats(base + ".prof")
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(_report(), f, indent=2)
+        print("telemetry written to %s.json" % base, file=sys.stderr)
+    except Exception as e:
+        # telemetry must never break the app
+        print("failed to write telemetry: %s" % e, file=sys.stderr)
+
+
+def start():
+    global _profiler
+    if _profiler is not None:
+        return
+    builtins.__import__ = _timed_import
+    _profiler = cProfile.Profile()
+    _profiler.enable()
+    atexit.register(_write)
+
+
+def _run_script(path, args):
+    # used by self-extracting archives: run the extracted main script with telemetry
+    import runpy
+
+    path = os.path.abspath(path)
+    sys.argv = [path, *args]
+    sys.path[0] = os.path.dirname(path)
+    start()
+    runpy.run_path(path, run_name="__main__")
+
+
+if __name__ == "__main__":
+    _run_script(sys.argv[1], sys.argv[2:])
+
+# END OF GENERATED CODE
+""")
+
+TELEMETRY_PROLOGUE = f"""\
+import os as _os
+if _os.environ.get("{ENV_TELEMETRY}", "").strip().lower() not in {TELEMETRY_OFF_VALUES!r}:
+    import {TELEMETRY_MODULE}
+    {TELEMETRY_MODULE}.start()
+del _os
+"""
+
+
+def telemetry_module() -> Tuple[str, str, str]:
+    """
+    生成在运行时记录性能数据（模块导入耗时、解压耗时以及cProfile的结果）的模块，
+    返回(压缩包内的文件名, 文件内容, 需要插入__main__.py开头的代码)。
+    插入的代码只检查一次环境变量，未设置（或设置为0等表示关闭的值）时不会导入该模块，因此没有额外开销。
+    """
+    content = TELEMETRY_TEMPLATE.substitute(
+        env_var=ENV_TELEMETRY,
+        env_dir=ENV_TELEMETRY_DIR,
+        env_extract_time=ENV_TELEMETRY_EXTRACT_TIME,
+        top_entries=TELEMETRY_TOP_ENTRIES,
+    )
+    return f"{TELEMETRY_MODULE}.py", content, TELEMETRY_PROLOGUE